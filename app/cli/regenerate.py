@@ -0,0 +1,279 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from sqlmodel import Session, func, select
+from app.controllers.analyze_controller import (
+    analisis_financial_to_dict,
+    analyze_common_params,
+    informasi_teknis_to_dict
+)
+from app.database import engine
+from app.models.analisis_financial import AnalisisFinancial
+from app.models.informasi_teknis import InformasiTeknis
+from app.models.project import Project
+from app.models.ringkasan_awal import RingkasanAwal
+from app.service.analysis_persistence import save_analysis_sections
+from app.service.generative.prompt_analisis_financial import generate_analisis_financial_async
+from app.service.generative.prompt_informasi_teknis import generate_informasi_teknis_async
+from app.service.generative.prompt_roadmap import generate_roadmap_async
+
+logger = logging.getLogger(__name__)
+
+SECTIONS = ["informasi_teknis", "analisis_financial", "roadmap"]
+
+class Checkpoint:
+    """Posisi keyset terakhir yang aman untuk resume, disimpan atomik sebagai file JSON
+
+    `last_id` adalah id RingkasanAwal terbesar yang semua id sebelumnya sudah selesai
+    (berhasil atau gagal), sehingga item yang masih in-flight saat crash diproses ulang.
+    """
+
+    def __init__(self, path: str, sections: List[str]):
+        self.path = path
+        self.sections = sections
+        self.last_id: Optional[str] = None
+        self.processed = 0
+        self.failed: List[str] = []
+
+    @classmethod
+    def load(cls, path: str, sections: List[str]) -> "Checkpoint":
+        checkpoint = cls(path, sections)
+        if not os.path.exists(path):
+            return checkpoint
+
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("sections") != sections:
+            logger.warning(f"⚠️ Checkpoint dibuat untuk section {data.get('sections')}, dilanjutkan dengan {sections}")
+        checkpoint.last_id = data.get("last_id")
+        checkpoint.processed = data.get("processed", 0)
+        checkpoint.failed = data.get("failed", [])
+        return checkpoint
+
+    def save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "sections": self.sections,
+                "last_id": self.last_id,
+                "processed": self.processed,
+                "failed": self.failed,
+                "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S")
+            }, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class Progress:
+    """Hitung throughput dan ETA dari item yang sudah selesai pada run ini"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+
+    def add(self, success: bool):
+        self.done += 1
+        if not success:
+            self.failed += 1
+
+    def line(self) -> str:
+        elapsed = time.monotonic() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        remaining = max(self.total - self.done, 0)
+        eta = f"{remaining / rate:.0f}s" if rate > 0 else "-"
+        return (
+            f"🔢 {self.done}/{self.total} selesai ({self.failed} gagal) | "
+            f"{rate * 60:.1f} item/menit | ETA {eta}"
+        )
+
+
+def _fetch_batch(after_id: Optional[str], batch_size: int) -> List[str]:
+    """Ambil id RingkasanAwal berikutnya secara keyset (id > after_id), bukan OFFSET"""
+    with Session(engine) as db:
+        statement = select(RingkasanAwal.id).order_by(RingkasanAwal.id).limit(batch_size)
+        if after_id is not None:
+            statement = statement.where(RingkasanAwal.id > after_id)
+        return list(db.exec(statement).all())
+
+
+def _count_remaining(after_id: Optional[str]) -> int:
+    with Session(engine) as db:
+        statement = select(func.count()).select_from(RingkasanAwal)
+        if after_id is not None:
+            statement = statement.where(RingkasanAwal.id > after_id)
+        return db.exec(statement).one()
+
+
+async def regenerate_one(id_ringkasan: str, sections: List[str], use_cache: bool):
+    """Generate ulang section terpilih untuk satu ringkasan dan simpan hasilnya
+
+    Section yang tidak dipilih tetapi dibutuhkan sebagai input (mis. informasi teknis untuk
+    roadmap) diambil dari database; jika belum ada, ikut di-generate. Koneksi database tidak
+    dipegang selama menunggu Gemini supaya concurrency tidak dibatasi ukuran pool.
+    """
+    with Session(engine) as db:
+        ringkasan_awal = db.get(RingkasanAwal, id_ringkasan)
+        project = db.get(Project, ringkasan_awal.project_id) if ringkasan_awal else None
+        if project is None:
+            raise ValueError(f"Project untuk ringkasan {id_ringkasan} tidak ditemukan")
+
+        project_id = project.id
+        common_params = analyze_common_params(project, ringkasan_awal, use_cache)
+
+        informasi_teknis = None
+        if "informasi_teknis" not in sections:
+            stored = db.exec(select(InformasiTeknis).where(InformasiTeknis.project_id == project_id)).first()
+            informasi_teknis = informasi_teknis_to_dict(stored) if stored else None
+
+        analisis_financial = None
+        if "analisis_financial" not in sections:
+            stored = db.exec(select(AnalisisFinancial).where(AnalisisFinancial.project_id == project_id)).first()
+            analisis_financial = analisis_financial_to_dict(stored) if stored else None
+
+    results: Dict[str, Any] = {}
+    if informasi_teknis is None:
+        informasi_teknis = results["informasi_teknis"] = await generate_informasi_teknis_async(**common_params)
+
+    needs_financial = "analisis_financial" in sections or "roadmap" in sections
+    if needs_financial and analisis_financial is None:
+        analisis_financial = results["analisis_financial"] = await generate_analisis_financial_async(
+            **common_params,
+            informasi_teknis=informasi_teknis
+        )
+
+    if "roadmap" in sections:
+        results["roadmap"] = await generate_roadmap_async(
+            **common_params,
+            informasi_teknis=informasi_teknis,
+            analisis_financial=analisis_financial
+        )
+
+    with Session(engine) as db:
+        save_analysis_sections(db, project_id, results)
+        db.commit()
+
+
+async def run(
+    sections: List[str],
+    concurrency: int,
+    batch_size: int,
+    checkpoint_path: str,
+    use_cache: bool = False,
+    retry_failed: bool = False,
+    limit: Optional[int] = None
+):
+    """Iterasi semua RingkasanAwal secara keyset dengan maksimal `concurrency` item in-flight"""
+    checkpoint = Checkpoint.load(checkpoint_path, sections)
+    # Id gagal tetap tercatat di checkpoint sampai berhasil diproses ulang
+    retry_ids = list(checkpoint.failed) if retry_failed else []
+
+    total = len(retry_ids) + _count_remaining(checkpoint.last_id)
+    if limit is not None:
+        total = min(total, limit)
+    progress = Progress(total)
+    logger.info(f"🔍 Regenerate {sections} untuk {total} ringkasan, mulai setelah id {checkpoint.last_id}")
+
+    # Urutan keyset item in-flight; watermark checkpoint hanya maju melewati item yang sudah selesai
+    window: "OrderedDict[str, bool]" = OrderedDict()
+    in_flight: Dict[asyncio.Task, str] = {}
+
+    def finish(id_ringkasan: str, error: Optional[BaseException]):
+        progress.add(error is None)
+        checkpoint.processed += 1
+        if error is not None:
+            logger.error(f"❌ Regenerate ringkasan {id_ringkasan} gagal: {error}")
+            if id_ringkasan not in checkpoint.failed:
+                checkpoint.failed.append(id_ringkasan)
+        elif id_ringkasan in checkpoint.failed:
+            checkpoint.failed.remove(id_ringkasan)
+
+        if id_ringkasan in window:
+            window[id_ringkasan] = True
+            while window and next(iter(window.values())):
+                checkpoint.last_id, _ = window.popitem(last=False)
+        checkpoint.save()
+        print(progress.line(), flush=True)
+
+    async def drain(until: int):
+        while len(in_flight) > until:
+            done, _ = await asyncio.wait(in_flight.keys(), return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                finish(in_flight.pop(task), task.exception())
+
+    def submit(id_ringkasan: str):
+        task = asyncio.create_task(regenerate_one(id_ringkasan, sections, use_cache))
+        in_flight[task] = id_ringkasan
+
+    submitted = 0
+    for id_ringkasan in retry_ids:
+        if limit is not None and submitted >= limit:
+            break
+        await drain(concurrency - 1)
+        submit(id_ringkasan)
+        submitted += 1
+
+    cursor = checkpoint.last_id
+    while limit is None or submitted < limit:
+        batch = _fetch_batch(cursor, batch_size)
+        if not batch:
+            break
+        for id_ringkasan in batch:
+            if limit is not None and submitted >= limit:
+                break
+            await drain(concurrency - 1)
+            window[id_ringkasan] = False
+            submit(id_ringkasan)
+            submitted += 1
+        cursor = batch[-1]
+
+    await drain(0)
+    checkpoint.save()
+    logger.info(f"✅ Regenerate selesai: {progress.line()}")
+    if checkpoint.failed:
+        logger.warning(f"⚠️ {len(checkpoint.failed)} ringkasan gagal, jalankan ulang dengan --retry-failed")
+
+
+def _parse_sections(value: str) -> List[str]:
+    sections = [section.strip() for section in value.split(",") if section.strip()]
+    unknown = [section for section in sections if section not in SECTIONS]
+    if unknown or not sections:
+        raise argparse.ArgumentTypeError(f"Section tidak dikenal: {unknown}, pilihan: {SECTIONS}")
+    # Urutkan sesuai dependensi supaya checkpoint konsisten antar run
+    return [section for section in SECTIONS if section in sections]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Generate ulang analisis AI untuk semua project secara offline")
+    parser.add_argument("--sections", type=_parse_sections, default=list(SECTIONS),
+                        help="Section yang di-generate ulang, dipisah koma (default: semua)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Jumlah ringkasan yang diproses bersamaan")
+    parser.add_argument("--batch-size", type=int, default=100, help="Jumlah id yang diambil per query keyset")
+    parser.add_argument("--checkpoint", default="regenerate_checkpoint.json", help="File checkpoint untuk resume")
+    parser.add_argument("--use-cache", action="store_true", help="Pakai cache response AI (default: generate ulang)")
+    parser.add_argument("--retry-failed", action="store_true", help="Proses ulang id yang gagal pada run sebelumnya")
+    parser.add_argument("--limit", type=int, default=None, help="Batasi jumlah ringkasan yang diproses")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    # Log SQL per query terlalu ramai untuk ribuan project
+    engine.echo = False
+
+    asyncio.run(run(
+        sections=args.sections,
+        concurrency=max(1, args.concurrency),
+        batch_size=max(1, args.batch_size),
+        checkpoint_path=args.checkpoint,
+        use_cache=args.use_cache,
+        retry_failed=args.retry_failed,
+        limit=args.limit
+    ))
+
+
+if __name__ == "__main__":
+    main()
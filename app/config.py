@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import List, Any
+from typing import Dict, List, Any
 
 from pydantic import field_validator
 from pydantic_settings import BaseSettings
@@ -18,6 +18,102 @@ class Settings(BaseSettings):
     bcrypt_rounds: int = 12 
     qdrant_url: Optional[str] = None
     google_maps_api_key: Optional[str] = None
+    gemini_model_names: List[str] = ["gemini-2.5-pro", "gemini-1.5-flash", "gemini-pro"]
+    # "gemini" untuk produksi, "local" untuk stand-in deterministik (load test / benchmark / CI)
+    gemini_backend: str = "gemini"
+    local_backend_latency_median_ms: float = 800.0
+    local_backend_latency_p99_ms: float = 4000.0
+    local_backend_model_latency_scale: Dict[str, float] = {"gemini-1.5-flash": 0.4}
+    local_backend_stream_chunk_chars: int = 80
+    local_backend_stream_interval_ms: float = 50.0
+    local_backend_error_rate: float = 0.0
+    local_backend_rate_limit_rate: float = 0.0
+    local_backend_safety_block_rate: float = 0.0
+    local_backend_seed: int = 0
+    # Tier model per section, model pertama yang sehat (p95 latency & error rate) dipakai
+    gemini_section_models: Dict[str, List[str]] = {
+        "ringkasan": ["gemini-2.5-pro", "gemini-1.5-flash", "gemini-pro"],
+        "informasi_teknis": ["gemini-2.5-pro", "gemini-1.5-flash", "gemini-pro"],
+        "analisis_financial": ["gemini-2.5-pro", "gemini-1.5-flash", "gemini-pro"],
+        "roadmap": ["gemini-2.5-pro", "gemini-1.5-flash", "gemini-pro"],
+        "analyze_combined": ["gemini-2.5-pro", "gemini-1.5-flash", "gemini-pro"],
+        "substep": ["gemini-1.5-flash", "gemini-2.5-pro", "gemini-pro"],
+    }
+    gemini_section_latency_budget_ms: Dict[str, float] = {
+        "ringkasan": 30000,
+        "informasi_teknis": 45000,
+        "analisis_financial": 45000,
+        "roadmap": 60000,
+        "analyze_combined": 90000,
+        "substep": 8000,
+    }
+    gemini_default_latency_budget_ms: float = 30000
+    gemini_router_max_error_rate: float = 0.3
+    gemini_router_min_samples: int = 5
+    # Hedged request (opt-in): request cadangan dikirim setelah p90 latency section
+    gemini_hedging_enabled: bool = False
+    gemini_hedge_sections: List[str] = ["analisis_financial", "roadmap"]
+    gemini_hedge_budget_ratio: float = 0.1
+    gemini_hedge_min_samples: int = 20
+    gemini_hedge_alternate_model: bool = True
+    gemini_max_concurrency: int = 16
+    gemini_initial_concurrency: int = 4
+    gemini_min_concurrency: int = 1
+    gemini_admission_queue_size: int = 64
+    gemini_admission_timeout_seconds: float = 30.0
+    # Retry dengan jittered exponential backoff, dibatasi deadline per request Gemini
+    gemini_retry_max_attempts: int = 4
+    gemini_retry_base_delay_seconds: float = 0.5
+    gemini_retry_max_delay_seconds: float = 8.0
+    gemini_request_deadline_seconds: float = 90.0
+    gemini_circuit_failure_threshold: int = 5
+    gemini_circuit_reset_seconds: float = 30.0
+    llm_cache_enabled: bool = True
+    llm_cache_persistent: bool = True
+    llm_cache_max_entries: int = 512
+    llm_cache_ttl_seconds: int = 7 * 24 * 3600
+    llm_single_flight_enabled: bool = True
+    # Prompt ringkas untuk analisis financial & roadmap (hanya field upstream yang dipakai)
+    llm_prompt_compaction: bool = False
+    # Stream section upstream pipeline analyze supaya section downstream mulai begitu field-nya lengkap
+    llm_pipeline_stream_fields: bool = True
+    # Mode /analyze: "pipeline" (tiga panggilan berantai) atau "combined" (satu generate untuk ketiga section)
+    analyze_mode: str = "pipeline"
+    # Prefetch informasi teknis di background setelah ringkasan awal dibuat, diambil oleh /analyze
+    analyze_prefetch_enabled: bool = True
+    analyze_prefetch_workers: int = 2
+    analyze_prefetch_ttl_seconds: float = 600
+    analyze_prefetch_max_pending: int = 50
+    # Prefetch dilewati jika slot limiter Gemini yang terpakai sudah melewati (1 - reserve) x limit
+    analyze_prefetch_limiter_reserve: float = 0.5
+    similarity_cache_enabled: bool = True
+    similarity_threshold: float = 0.97
+    similarity_cache_personalize: bool = True
+    # Selisih relatif modal maksimum terhadap project tersimpan; skor dan estimasi balik modal bergantung pada modal
+    similarity_modal_tolerance: float = 0.05
+    similarity_search_limit: int = 5
+    similarity_cache_max_entries: int = 5000
+    similarity_collection_name: str = "ringkasan_awal"
+    vector_store_backend: str = "numpy"
+    # Job analyze di background (antrean Postgres, diambil worker dengan SKIP LOCKED)
+    analyze_job_workers: int = 2
+    analyze_job_poll_seconds: float = 1.0
+    analyze_job_heartbeat_seconds: float = 30.0
+    analyze_job_stale_seconds: float = 300
+    analyze_job_max_attempts: int = 3
+    analyze_job_stream_poll_seconds: float = 0.5
+    # Saat client SSE terputus: batalkan sisa section (default) atau selesaikan & simpan di background
+    sse_finish_in_background: bool = False
+    sse_disconnect_poll_seconds: float = 1.0
+    # Stream analyze yang bisa dilanjutkan: jumlah event yang disimpan per run, lama run ditunggu
+    # setelah semua client putus, dan lama run yang sudah selesai tetap bisa di-replay
+    sse_event_log_size: int = 200
+    sse_resume_grace_seconds: float = 30.0
+    sse_resume_retention_seconds: float = 300.0
+    # Engine async untuk route async (driver asyncpg); kosong berarti diturunkan dari database_url
+    async_database_url: Optional[str] = None
+    async_database_pool_size: int = 10
+    async_database_max_overflow: int = 10
     
     class Config:
         env_file = ".env"
@@ -1,24 +1,38 @@
 import logging
-import asyncio
 import copy
+import hashlib
 import json
-from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Tuple
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from fastapi import HTTPException, status
 from app.models.project import Project
 from app.models.ringkasan_awal import RingkasanAwal
 from app.models.informasi_teknis import InformasiTeknis
 from app.models.analisis_financial import AnalisisFinancial
 from app.models.roadmap import Roadmap
-from app.service.generative.prompt_informasi_teknis import generate_informasi_teknis_with_gemini
-from app.service.generative.prompt_analisis_financial import generate_analisis_financial_with_gemini
-from app.service.generative.prompt_roadmap import generate_roadmap_with_gemini
-from app.service.generative.prompt_roadmap.substep_generator import SubStepGenerator
+from app.models.analyze_run import AnalyzeRun, AnalyzeRunStatus
+from app.service.generative.prompt_roadmap.substep_generator import get_substep_generator
+from app.config import get_settings
+from app.database import new_async_session
+from app.service.generative.pipeline import PipelineEvent, PipelineExecutor, build_analyze_pipeline
+from app.service.generative.prefetch import get_analyze_prefetcher
+from app.service.generative.prompt_analyze_combined import generate_analyze_combined_async
+from app.service.generative.errors import GeminiSafetyBlockedError, GeminiUnavailableError, GenerationCancelledError
+from app.service.analysis_persistence import SECTION_WRITERS, save_analysis_sections
+from app.service.generative.metrics import metrics
+from app.service.generative.token_usage import current_token_usage
 
 logger = logging.getLogger(__name__)
 
-# Thread pool untuk menjalankan synchronous Gemini calls secara parallel
-executor = ThreadPoolExecutor(max_workers=3)
+SECTION_LABELS = {
+    "informasi_teknis": "informasi teknis",
+    "analisis_financial": "analisis financial",
+    "roadmap": "roadmap"
+}
+
+ANALYZE_MODES = ("pipeline", "combined")
 
 def get_enum_value(enum_obj):
     """Helper untuk mendapatkan value dari enum atau string"""
@@ -30,17 +44,234 @@ def get_enum_value(enum_obj):
         return enum_obj.value
     return str(enum_obj)
 
+def analyze_common_params(project: Project, ringkasan_awal: RingkasanAwal, use_cache: bool = True) -> dict:
+    """Parameter project & ringkasan yang dipakai bersama oleh semua section analyze"""
+    return {
+        "project_name": project.project_name,
+        "jenis_ikan": get_enum_value(project.jenis_ikan),
+        "modal": project.modal,
+        "kabupaten_id": project.kabupaten_id,
+        "resiko": get_enum_value(project.resiko),
+        "skor_kelayakan": ringkasan_awal.skor_kelayakan,
+        "potensi_pasar": get_enum_value(ringkasan_awal.potensi_pasar),
+        "estimasi_balik_modal": ringkasan_awal.estimasi_balik_modal,
+        "kesimpulan_ringkasan": ringkasan_awal.kesimpulan_ringkasan,
+        "lang": project.lang,
+        "lat": project.lat,
+        "use_cache": use_cache
+    }
+
+def analyze_params_fingerprint(common_params: dict) -> str:
+    """Fingerprint input analyze tanpa `use_cache`; berubah jika project atau ringkasan berubah"""
+    params = {name: value for name, value in common_params.items() if name != "use_cache"}
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+def schedule_analyze_prefetch(project: Project, ringkasan_awal: RingkasanAwal, use_cache: bool = True):
+    """Mulai generate informasi teknis di background begitu ringkasan awal tersimpan"""
+    prefetcher = get_analyze_prefetcher()
+    # Mode combined men-generate ketiga section sekaligus, hasil prefetch tidak akan dipakai
+    if prefetcher is None or get_settings().analyze_mode == "combined":
+        return
+    try:
+        prefetcher.schedule(ringkasan_awal.id, analyze_common_params(project, ringkasan_awal, use_cache))
+    except Exception as e:
+        # Prefetch hanya optimasi, tidak boleh menggagalkan pembuatan project
+        logger.warning(f"⚠️ Gagal menjadwalkan prefetch analyze: {str(e)}")
+
+def take_prefetched_sections(id_ringkasan: str, common_params: dict) -> dict:
+    """Hasil prefetch untuk ringkasan ini per section; kosong jika tidak ada atau regenerate"""
+    prefetcher = get_analyze_prefetcher()
+    if prefetcher is None:
+        return {}
+    if not common_params["use_cache"]:
+        prefetcher.discard(id_ringkasan)
+        return {}
+    future = prefetcher.take(id_ringkasan, common_params)
+    return {"informasi_teknis": future} if future is not None else {}
+
+def discard_prefetched_sections(id_ringkasan: str):
+    """Batalkan prefetch ringkasan ini jika analyze tidak memakainya (mode combined, section sudah dilanjutkan)"""
+    prefetcher = get_analyze_prefetcher()
+    if prefetcher is not None:
+        prefetcher.discard(id_ringkasan)
+
+def informasi_teknis_to_dict(informasi_teknis: InformasiTeknis) -> dict:
+    """Convert dari snake_case (database) ke camelCase (response)"""
+    return {
+        "spesifikasiKolam": informasi_teknis.spesifikasi_kolam,
+        "kualitasAir": informasi_teknis.kualitas_air,
+        "spesifikasiBenih": informasi_teknis.spesifikasi_benih,
+        "spesifikasiPakan": informasi_teknis.spesifikasi_pakan,
+        "manajemenKesehatan": informasi_teknis.manajemen_kesehatan,
+        "teknologiPendukung": informasi_teknis.teknologi_pendukung
+    }
+
+def analisis_financial_to_dict(analisis_financial: AnalisisFinancial) -> dict:
+    """Convert dari snake_case (database) ke camelCase (response)"""
+    return {
+        "rincianModalAwal": analisis_financial.rincian_modal_awal,
+        "biayaOperasional": analisis_financial.biaya_operasional,
+        "analisisROI": analisis_financial.analisis_roi,
+        "analisisBEP": analisis_financial.analisis_bep,
+        "proyeksiPendapatan": analisis_financial.proyeksi_pendapatan
+    }
+
+def load_stored_sections(db: Session, project_id: str) -> dict:
+    """Hasil section analyze yang sudah tersimpan untuk project, dipakai sebagai input upstream"""
+    stored = {}
+    informasi_teknis = db.exec(
+        select(InformasiTeknis).where(InformasiTeknis.project_id == project_id)
+    ).first()
+    if informasi_teknis:
+        stored["informasi_teknis"] = informasi_teknis_to_dict(informasi_teknis)
+    
+    analisis_financial = db.exec(
+        select(AnalisisFinancial).where(AnalisisFinancial.project_id == project_id)
+    ).first()
+    if analisis_financial:
+        stored["analisis_financial"] = analisis_financial_to_dict(analisis_financial)
+    return stored
+
+def begin_analyze_run(db: Session, project_id: str, fingerprint: str, resume: bool = True) -> dict:
+    """
+    Mulai (atau lanjutkan) run analyze project dan commit statusnya.
+    Return hasil section yang sudah tersimpan dari run partial sebelumnya jika `resume` dan
+    input analyze-nya (`fingerprint`) sama; section dari input lama tidak dipakai ulang.
+    """
+    run = db.get(AnalyzeRun, project_id)
+    resumed = {}
+    if (
+        run is not None
+        and run.status == AnalyzeRunStatus.PARTIAL.value
+        and run.params_fingerprint == fingerprint
+        and resume
+    ):
+        stored = load_stored_sections(db, project_id)
+        resumed = {section: stored[section] for section in run.completed_sections if section in stored}
+    
+    if run is None:
+        run = AnalyzeRun(project_id=project_id)
+    run.completed_sections = list(resumed)
+    run.params_fingerprint = fingerprint
+    run.status = (AnalyzeRunStatus.PARTIAL if resumed else AnalyzeRunStatus.PENDING).value
+    run.failed_section = None
+    run.error = None
+    run.updated_at = datetime.utcnow()
+    db.add(run)
+    db.commit()
+    
+    for section in resumed:
+        metrics.incr("analyze_sections_resumed", section)
+    if resumed:
+        logger.info(f"♻️ Melanjutkan analyze project {project_id}, section tersimpan: {', '.join(resumed)}")
+    return resumed
+
+def checkpoint_sections(db: Session, project_id: str, sections: dict, fingerprint: str):
+    """Simpan section yang sudah tervalidasi beserta status run dalam satu commit, sehingga tidak ikut hilang jika section lain gagal"""
+    save_analysis_sections(db, project_id, sections)
+    run = db.get(AnalyzeRun, project_id)
+    if run is None:
+        run = AnalyzeRun(project_id=project_id)
+    # Section yang tersimpan dari input lain tidak dihitung selesai untuk input ini
+    previous = run.completed_sections if run.params_fingerprint == fingerprint else []
+    completed = [name for name in SECTION_WRITERS if name in previous or name in sections]
+    run.params_fingerprint = fingerprint
+    run.completed_sections = completed
+    run.status = (AnalyzeRunStatus.COMPLETE if len(completed) == len(SECTION_WRITERS) else AnalyzeRunStatus.PARTIAL).value
+    run.updated_at = datetime.utcnow()
+    db.add(run)
+    db.commit()
+
+def fail_analyze_run(db: Session, project_id: str, error: BaseException):
+    """Catat section tempat run berhenti; section yang sudah tersimpan tetap dipakai saat retry"""
+    try:
+        db.rollback()
+        run = db.get(AnalyzeRun, project_id)
+        if run is None:
+            return
+        run.failed_section = next((name for name in SECTION_WRITERS if name not in run.completed_sections), None)
+        run.error = str(error)
+        run.updated_at = datetime.utcnow()
+        db.add(run)
+        db.commit()
+        logger.warning(
+            f"⚠️ Analyze project {project_id} berhenti di {run.failed_section}, "
+            f"{len(run.completed_sections)} section tersimpan untuk dilanjutkan"
+        )
+    except Exception as e:
+        logger.error(f"❌ Gagal mencatat status analyze project {project_id}: {str(e)}")
+
+async def checkpointed_analyze_events(
+    db: AsyncSession,
+    project_id: str,
+    id_ringkasan: str,
+    common_params: dict,
+    results: dict,
+    mode: str = "pipeline"
+) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Generate section analyze dan simpan (commit) tiap section begitu tervalidasi; yield progress (event, data).
+    Run sebelumnya yang berhenti di tengah (partial) dilanjutkan dari section yang belum tersimpan,
+    kecuali regenerate atau mode combined. Hasil semua section, termasuk yang dilanjutkan, masuk `results`.
+    """
+    fingerprint = analyze_params_fingerprint(common_params)
+    resumed = await db.run_sync(
+        begin_analyze_run, project_id, fingerprint, common_params["use_cache"] and mode != "combined"
+    )
+    results.update(resumed)
+    try:
+        if mode == "combined":
+            discard_prefetched_sections(id_ringkasan)
+            yield "progress", {
+                "status": "processing",
+                "message": "Memulai generate informasi teknis, analisis financial, dan roadmap...",
+                "progress": 10
+            }
+            combined = await generate_analyze_combined_async(**common_params)
+            await db.run_sync(checkpoint_sections, project_id, combined, fingerprint)
+            results.update(combined)
+            return
+        
+        # Prefetch hanya diambil (dan dihitung hit) jika section-nya benar-benar akan dijalankan
+        if "informasi_teknis" in resumed:
+            discard_prefetched_sections(id_ringkasan)
+            prefetched = {}
+        else:
+            prefetched = take_prefetched_sections(id_ringkasan, common_params)
+        pipeline = build_analyze_pipeline(common_params, prefetched=prefetched)
+        if resumed:
+            pipeline = pipeline.subset([name for name in pipeline.order if name not in resumed], completed=resumed)
+        
+        async def checkpoint(section: str, result: dict):
+            await db.run_sync(checkpoint_sections, project_id, {section: result}, fingerprint)
+        
+        async for event in analyze_progress_events(pipeline, results, on_complete=checkpoint):
+            yield event
+    except Exception as e:
+        await db.run_sync(fail_analyze_run, project_id, e)
+        raise
+
 async def analyze_project_data(
-    db: Session,
+    db: AsyncSession,
     id_ringkasan: str,
-    user_id: str
+    user_id: str,
+    use_cache: bool = True,
+    mode: str = None
 ) -> dict:
     """
-    Generate informasi teknis, analisis financial, dan roadmap secara parallel
+    Generate informasi teknis, analisis financial, dan roadmap lewat pipeline dependency graph,
+    atau dalam satu panggilan Gemini jika mode "combined" (per request atau `analyze_mode`)
     """
+    mode = mode or get_settings().analyze_mode
+    if mode not in ANALYZE_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Mode analyze tidak dikenal: {mode} (pilihan: {', '.join(ANALYZE_MODES)})"
+        )
+    
     try:
         # 1. Cari ringkasan_awal berdasarkan ID
-        ringkasan_awal = db.get(RingkasanAwal, id_ringkasan)
+        ringkasan_awal = await db.get(RingkasanAwal, id_ringkasan)
         if not ringkasan_awal:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -48,7 +279,7 @@ async def analyze_project_data(
             )
         
         # 2. Cari project berdasarkan project_id dari ringkasan_awal
-        project = db.get(Project, ringkasan_awal.project_id)
+        project = await db.get(Project, ringkasan_awal.project_id)
         if not project:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -62,192 +293,175 @@ async def analyze_project_data(
                 detail="Anda tidak memiliki akses untuk menganalisis project ini"
             )
         
-        jenis_ikan_str = get_enum_value(project.jenis_ikan)
-        resiko_str = get_enum_value(project.resiko)
-        potensi_pasar_str = get_enum_value(ringkasan_awal.potensi_pasar)
-        
-        logger.info(f"🔍 Memulai generate informasi teknis untuk project: {project.project_name}")
-        
-        informasi_teknis_result = await asyncio.get_event_loop().run_in_executor(
-            executor,
-            lambda: generate_informasi_teknis_with_gemini(
-                project_name=project.project_name,
-                jenis_ikan=jenis_ikan_str,
-                modal=project.modal,
-                kabupaten_id=project.kabupaten_id,
-                resiko=resiko_str,
-                skor_kelayakan=ringkasan_awal.skor_kelayakan,
-                potensi_pasar=potensi_pasar_str,
-                estimasi_balik_modal=ringkasan_awal.estimasi_balik_modal,
-                kesimpulan_ringkasan=ringkasan_awal.kesimpulan_ringkasan,
-                lang=project.lang,
-                lat=project.lat
-            )
-        )
+        # 4. Generate semua section lewat dependency graph (section downstream dimulai begitu
+        #    field upstream yang dibacanya tersedia), atau sekaligus dalam satu generate
+        logger.info(f"🔍 Memulai generate analisis ({mode}) untuk project: {project.project_name}")
         
-        logger.info(f"✅ Informasi teknis berhasil di-generate")
-        
-        # 6. Generate analisis_financial terlebih dahulu (karena diperlukan untuk roadmap)
-        logger.info(f"🔍 Memulai generate analisis financial")
-        
-        analisis_financial_result = await asyncio.get_event_loop().run_in_executor(
-            executor,
-            lambda: generate_analisis_financial_with_gemini(
-                project_name=project.project_name,
-                jenis_ikan=jenis_ikan_str,
-                modal=project.modal,
-                kabupaten_id=project.kabupaten_id,
-                resiko=resiko_str,
-                skor_kelayakan=ringkasan_awal.skor_kelayakan,
-                potensi_pasar=potensi_pasar_str,
-                estimasi_balik_modal=ringkasan_awal.estimasi_balik_modal,
-                kesimpulan_ringkasan=ringkasan_awal.kesimpulan_ringkasan,
-                informasi_teknis=informasi_teknis_result,
-                lang=project.lang,
-                lat=project.lat
-            )
-        )
+        # 5. Setiap section langsung disimpan begitu tervalidasi, run yang terhenti dilanjutkan
+        common_params = analyze_common_params(project, ringkasan_awal, use_cache)
+        results = {}
+        async for _ in checkpointed_analyze_events(db, project.id, id_ringkasan, common_params, results, mode):
+            pass
+        informasi_teknis_result = results["informasi_teknis"]
+        analisis_financial_result = results["analisis_financial"]
+        roadmap_result = results["roadmap"]
         
-        logger.info(f"✅ Analisis financial berhasil di-generate")
-        
-        # 7. Generate roadmap dengan informasi_teknis dan analisis_financial yang lengkap
-        logger.info(f"🔍 Memulai generate roadmap")
-        
-        roadmap_result = await asyncio.get_event_loop().run_in_executor(
-            executor,
-            lambda: generate_roadmap_with_gemini(
-                project_name=project.project_name,
-                jenis_ikan=jenis_ikan_str,
-                modal=project.modal,
-                kabupaten_id=project.kabupaten_id,
-                resiko=resiko_str,
-                skor_kelayakan=ringkasan_awal.skor_kelayakan,
-                potensi_pasar=potensi_pasar_str,
-                estimasi_balik_modal=ringkasan_awal.estimasi_balik_modal,
-                kesimpulan_ringkasan=ringkasan_awal.kesimpulan_ringkasan,
-                informasi_teknis=informasi_teknis_result,
-                analisis_financial=analisis_financial_result,
-                lang=project.lang,
-                lat=project.lat
-            )
-        )
+        # 6. Prepare response
+        response_data = {
+            "informasi_teknis": informasi_teknis_result,
+            "analisis_financial": analisis_financial_result,
+            "roadmap": roadmap_result
+        }
         
-        logger.info(f"✅ Roadmap berhasil di-generate")
+        logger.info(f"✅ Semua data berhasil di-generate dan disimpan untuk project: {project.id}")
         
-        # 8. Save ke database
-        # Cek apakah sudah ada informasi_teknis
-        existing_informasi_teknis = db.exec(
-            select(InformasiTeknis).where(InformasiTeknis.project_id == project.id)
-        ).first()
+        return {
+            "success": True,
+            "message": "data received",
+            "data": response_data,
+            "token_usage": current_token_usage()
+        }
         
-        if existing_informasi_teknis:
-            existing_informasi_teknis.spesifikasi_kolam = informasi_teknis_result.get("spesifikasiKolam")
-            existing_informasi_teknis.kualitas_air = informasi_teknis_result.get("kualitasAir")
-            existing_informasi_teknis.spesifikasi_benih = informasi_teknis_result.get("spesifikasiBenih")
-            existing_informasi_teknis.spesifikasi_pakan = informasi_teknis_result.get("spesifikasiPakan")
-            existing_informasi_teknis.manajemen_kesehatan = informasi_teknis_result.get("manajemenKesehatan")
-            existing_informasi_teknis.teknologi_pendukung = informasi_teknis_result.get("teknologiPendukung")
-            db.add(existing_informasi_teknis)
-            logger.info(f"✅ Informasi teknis updated untuk project: {project.id}")
-        else:
-            new_informasi_teknis = InformasiTeknis(
-                project_id=project.id,
-                spesifikasi_kolam=informasi_teknis_result.get("spesifikasiKolam"),
-                kualitas_air=informasi_teknis_result.get("kualitasAir"),
-                spesifikasi_benih=informasi_teknis_result.get("spesifikasiBenih"),
-                spesifikasi_pakan=informasi_teknis_result.get("spesifikasiPakan"),
-                manajemen_kesehatan=informasi_teknis_result.get("manajemenKesehatan"),
-                teknologi_pendukung=informasi_teknis_result.get("teknologiPendukung")
+    except HTTPException:
+        await db.rollback()
+        raise
+    except GeminiUnavailableError as e:
+        logger.warning(f"⚠️ Layanan AI sedang tidak tersedia: {str(e)}")
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+    except GeminiSafetyBlockedError as e:
+        logger.warning(f"⚠️ Request AI diblokir safety filter: {str(e)}")
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except ValueError as e:
+        logger.error(f"❌ Validation error: {str(e)}")
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error validasi data: {str(e)}"
+        )
+    except Exception as e:
+        logger.error(f"❌ Error saat generate data: {str(e)}", exc_info=True)
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Gagal generate data: {str(e)}"
+        )
+
+async def regenerate_analyze_section(
+    db: AsyncSession,
+    id_ringkasan: str,
+    section: str,
+    user_id: str,
+    cascade: bool = False
+) -> dict:
+    """
+    Generate ulang satu section analyze memakai hasil upstream yang tersimpan di database.
+    Jika `cascade`, section yang bergantung padanya ikut di-generate ulang.
+    """
+    if section not in SECTION_WRITERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Section tidak dikenal: {section} (pilihan: {', '.join(SECTION_WRITERS)})"
+        )
+    
+    try:
+        ringkasan_awal = await db.get(RingkasanAwal, id_ringkasan)
+        if not ringkasan_awal:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Ringkasan awal tidak ditemukan"
             )
-            db.add(new_informasi_teknis)
-            logger.info(f"✅ Informasi teknis created untuk project: {project.id}")
         
-        # Cek apakah sudah ada analisis_financial
-        existing_analisis_financial = db.exec(
-            select(AnalisisFinancial).where(AnalisisFinancial.project_id == project.id)
-        ).first()
-        
-        if existing_analisis_financial:
-            existing_analisis_financial.rincian_modal_awal = analisis_financial_result.get("rincianModalAwal")
-            existing_analisis_financial.biaya_operasional = analisis_financial_result.get("biayaOperasional")
-            existing_analisis_financial.analisis_roi = analisis_financial_result.get("analisisROI")
-            existing_analisis_financial.analisis_bep = analisis_financial_result.get("analisisBEP")
-            existing_analisis_financial.proyeksi_pendapatan = analisis_financial_result.get("proyeksiPendapatan")
-            db.add(existing_analisis_financial)
-            logger.info(f"✅ Analisis financial updated untuk project: {project.id}")
-        else:
-            new_analisis_financial = AnalisisFinancial(
-                project_id=project.id,
-                rincian_modal_awal=analisis_financial_result.get("rincianModalAwal"),
-                biaya_operasional=analisis_financial_result.get("biayaOperasional"),
-                analisis_roi=analisis_financial_result.get("analisisROI"),
-                analisis_bep=analisis_financial_result.get("analisisBEP"),
-                proyeksi_pendapatan=analisis_financial_result.get("proyeksiPendapatan")
+        project = await db.get(Project, ringkasan_awal.project_id)
+        if not project:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Project tidak ditemukan"
             )
-            db.add(new_analisis_financial)
-            logger.info(f"✅ Analisis financial created untuk project: {project.id}")
         
-        # Hapus roadmap lama jika ada (karena roadmap hanya 1 data row per project)
-        existing_roadmaps = db.exec(
-            select(Roadmap).where(Roadmap.project_id == project.id)
-        ).all()
+        if project.user_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Anda tidak memiliki akses untuk menganalisis project ini"
+            )
         
-        for roadmap in existing_roadmaps:
-            db.delete(roadmap)
+        # Regenerate selalu melewati cache response AI, kalau tidak hasil lama yang kembali
+        common_params = analyze_common_params(project, ringkasan_awal, use_cache=False)
+        pipeline = build_analyze_pipeline(common_params)
+        targets = [section] + (pipeline.dependents(section) if cascade else [])
+        stored = await db.run_sync(load_stored_sections, project.id)
+        
+        missing = [
+            upstream
+            for target in targets
+            for upstream in pipeline.sections[target].requires
+            if upstream not in targets and upstream not in stored
+        ]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"{SECTION_LABELS[missing[0]].capitalize()} belum tersedia, jalankan analyze lengkap terlebih dahulu"
+            )
         
-        # Create roadmap baru
-        # Pastikan step adalah float
-        roadmap_step = roadmap_result.get("step", 1.0)
-        if not isinstance(roadmap_step, (int, float)):
-            roadmap_step = 1.0
-        else:
-            roadmap_step = float(roadmap_step)
-        
-        new_roadmap = Roadmap(
-            project_id=project.id,
-            response=roadmap_result.get("response"),
-            request=roadmap_result.get("request"),
-            step=roadmap_step,
-            is_request=roadmap_result.get("isRequest", False),
-            roadmap_id=roadmap_result.get("roadmapId")
-        )
-        db.add(new_roadmap)
-        logger.info(f"✅ Roadmap created untuk project: {project.id}")
+        logger.info(f"🔍 Regenerate {', '.join(targets)} untuk project: {project.project_name}")
         
-        # Commit semua perubahan
-        db.commit()
+        project_id = project.id
+        fingerprint = analyze_params_fingerprint(common_params)
+        results = {}
+        async def checkpoint(name: str, result: dict):
+            await db.run_sync(checkpoint_sections, project_id, {name: result}, fingerprint)
         
-        # 9. Prepare response
-        response_data = {
-            "informasi_teknis": informasi_teknis_result,
-            "analisis_financial": analisis_financial_result,
-            "roadmap": roadmap_result
-        }
+        async for _ in analyze_progress_events(pipeline.subset(targets, completed=stored), results, on_complete=checkpoint):
+            pass
         
-        logger.info(f"✅ Semua data berhasil di-generate dan disimpan untuk project: {project.id}")
+        logger.info(f"✅ Section {', '.join(targets)} berhasil di-generate ulang untuk project: {project.id}")
         
         return {
             "success": True,
             "message": "data received",
-            "data": response_data
+            "data": results,
+            "token_usage": current_token_usage()
         }
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
+    except GeminiUnavailableError as e:
+        logger.warning(f"⚠️ Layanan AI sedang tidak tersedia: {str(e)}")
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+    except GeminiSafetyBlockedError as e:
+        logger.warning(f"⚠️ Request AI diblokir safety filter: {str(e)}")
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
     except ValueError as e:
         logger.error(f"❌ Validation error: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error validasi data: {str(e)}"
         )
     except Exception as e:
-        logger.error(f"❌ Error saat generate data: {str(e)}", exc_info=True)
-        db.rollback()
+        logger.error(f"❌ Error saat generate ulang section {section}: {str(e)}", exc_info=True)
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Gagal generate data: {str(e)}"
+            detail=f"Gagal generate ulang data: {str(e)}"
         )
 
 def get_analyze_data(
@@ -289,15 +503,7 @@ def get_analyze_data(
         
         informasi_teknis_data = None
         if informasi_teknis:
-            # Convert dari snake_case (database) ke camelCase (response)
-            informasi_teknis_data = {
-                "spesifikasiKolam": informasi_teknis.spesifikasi_kolam,
-                "kualitasAir": informasi_teknis.kualitas_air,
-                "spesifikasiBenih": informasi_teknis.spesifikasi_benih,
-                "spesifikasiPakan": informasi_teknis.spesifikasi_pakan,
-                "manajemenKesehatan": informasi_teknis.manajemen_kesehatan,
-                "teknologiPendukung": informasi_teknis.teknologi_pendukung
-            }
+            informasi_teknis_data = informasi_teknis_to_dict(informasi_teknis)
         
         # 5. Ambil analisis_financial
         analisis_financial = db.exec(
@@ -306,14 +512,7 @@ def get_analyze_data(
         
         analisis_financial_data = None
         if analisis_financial:
-            # Convert dari snake_case (database) ke camelCase (response)
-            analisis_financial_data = {
-                "rincianModalAwal": analisis_financial.rincian_modal_awal,
-                "biayaOperasional": analisis_financial.biaya_operasional,
-                "analisisROI": analisis_financial.analisis_roi,
-                "analisisBEP": analisis_financial.analisis_bep,
-                "proyeksiPendapatan": analisis_financial.proyeksi_pendapatan
-            }
+            analisis_financial_data = analisis_financial_to_dict(analisis_financial)
         
         # 6. Ambil roadmap (hanya yang pertama jika ada banyak)
         roadmap = db.exec(
@@ -349,6 +548,15 @@ def get_analyze_data(
         else:
             response_data["roadmap"] = None
         
+        # Status analyze (pending, partial, complete) supaya client tahu perlu retry atau tidak
+        analyze_run = db.get(AnalyzeRun, project.id)
+        response_data["analyze_run"] = {
+            "status": analyze_run.status,
+            "completed_sections": analyze_run.completed_sections,
+            "failed_section": analyze_run.failed_section,
+            "error": analyze_run.error
+        } if analyze_run else None
+        
         logger.info(f"✅ Data berhasil diambil untuk project: {project.id}")
         
         return {
@@ -367,11 +575,12 @@ def get_analyze_data(
         )
 
 async def update_roadmap_step(
-    db: Session,
+    db: AsyncSession,
     id_ringkasan: str,
     user_request: str,
     step_number: int,
-    user_id: str
+    user_id: str,
+    use_cache: bool = True
 ) -> dict:
     """
     Update roadmap dengan menambahkan sub-step untuk step tertentu berdasarkan request user
@@ -386,7 +595,7 @@ async def update_roadmap_step(
     """
     try:
         # 1. Cari ringkasan_awal berdasarkan ID
-        ringkasan_awal = db.get(RingkasanAwal, id_ringkasan)
+        ringkasan_awal = await db.get(RingkasanAwal, id_ringkasan)
         if not ringkasan_awal:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -394,7 +603,7 @@ async def update_roadmap_step(
             )
         
         # 2. Cari project berdasarkan project_id dari ringkasan_awal
-        project = db.get(Project, ringkasan_awal.project_id)
+        project = await db.get(Project, ringkasan_awal.project_id)
         if not project:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -409,9 +618,9 @@ async def update_roadmap_step(
             )
         
         # 4. Ambil roadmap
-        roadmap = db.exec(
+        roadmap = (await db.exec(
             select(Roadmap).where(Roadmap.project_id == project.id)
-        ).first()
+        )).first()
         
         if not roadmap or not roadmap.response:
             raise HTTPException(
@@ -485,35 +694,26 @@ async def update_roadmap_step(
         logger.info(f"🔍 Generate sub-step {new_sub_step_num} dari user request untuk step {int(parent_step_num)}")
         
         # Ambil informasi_teknis untuk context
-        informasi_teknis = db.exec(
+        informasi_teknis = (await db.exec(
             select(InformasiTeknis).where(InformasiTeknis.project_id == project.id)
-        ).first()
+        )).first()
         
         informasi_teknis_dict = None
         if informasi_teknis:
-            informasi_teknis_dict = {
-                "spesifikasiKolam": informasi_teknis.spesifikasi_kolam,
-                "kualitasAir": informasi_teknis.kualitas_air,
-                "spesifikasiBenih": informasi_teknis.spesifikasi_benih,
-                "spesifikasiPakan": informasi_teknis.spesifikasi_pakan,
-                "manajemenKesehatan": informasi_teknis.manajemen_kesehatan,
-                "teknologiPendukung": informasi_teknis.teknologi_pendukung
-            }
+            informasi_teknis_dict = informasi_teknis_to_dict(informasi_teknis)
         
         jenis_ikan_str = get_enum_value(project.jenis_ikan)
         
         # Generate sub-step menggunakan Gemini
-        substep_generator = SubStepGenerator()
-        substep_content = await asyncio.get_event_loop().run_in_executor(
-            executor,
-            lambda: substep_generator.generate_substep_from_request(
-                user_request=user_request,
-                parent_step_title=parent_step.get("title", ""),
-                parent_step_deskripsi=parent_step.get("deskripsi", ""),
-                project_name=project.project_name,
-                jenis_ikan=jenis_ikan_str,
-                informasi_teknis=informasi_teknis_dict
-            )
+        substep_generator = get_substep_generator()
+        substep_content = await substep_generator.generate_substep_from_request_async(
+            user_request=user_request,
+            parent_step_title=parent_step.get("title", ""),
+            parent_step_deskripsi=parent_step.get("deskripsi", ""),
+            project_name=project.project_name,
+            jenis_ikan=jenis_ikan_str,
+            informasi_teknis=informasi_teknis_dict,
+            use_cache=use_cache
         )
         
         logger.info(f"✅ Sub-step content berhasil di-generate")
@@ -552,8 +752,8 @@ async def update_roadmap_step(
         
         # 13. Save ke database
         db.add(roadmap)
-        db.commit()
-        db.refresh(roadmap)
+        await db.commit()
+        await db.refresh(roadmap)
         
         logger.info(f"✅ Sub-step {new_sub_step_num} berhasil ditambahkan ke step {int(parent_step_num)} untuk project: {project.id}")
         
@@ -576,258 +776,164 @@ async def update_roadmap_step(
         }
         
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
+    except GeminiUnavailableError as e:
+        logger.warning(f"⚠️ Layanan AI sedang tidak tersedia: {str(e)}")
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+    except GeminiSafetyBlockedError as e:
+        logger.warning(f"⚠️ Request AI diblokir safety filter: {str(e)}")
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
     except ValueError as e:
         logger.error(f"❌ Validation error: {str(e)}")
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Error validasi data: {str(e)}"
         )
     except Exception as e:
         logger.error(f"❌ Error saat update roadmap step: {str(e)}", exc_info=True)
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Gagal update roadmap step: {str(e)}"
         )
 
+async def analyze_progress_events(
+    pipeline: PipelineExecutor,
+    results: dict,
+    on_complete: Callable[[str, dict], Awaitable[None]] = None
+) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    Jalankan pipeline dan yield (event, data) progress per section; hasil section masuk ke `results`
+    (yang boleh sudah berisi section hasil run sebelumnya) dan diteruskan ke `on_complete`.
+    """
+    total = len(results) + len(pipeline.order)
+    async for event in pipeline.events():
+        label = SECTION_LABELS[event.section]
+        if event.kind == PipelineEvent.PUBLISHED:
+            # Field yang sudah final dikirim lebih dulu selama section masih di-generate
+            yield "progress", {
+                "status": "partial_field",
+                "message": f"Sebagian {label} sudah tersedia",
+                "progress": 10 + 80 * len(results) // total,
+                "data": {
+                    event.section: event.result
+                }
+            }
+            continue
+        
+        if event.kind == PipelineEvent.STARTED:
+            yield "progress", {
+                "status": "processing",
+                "message": f"Memulai generate {label}...",
+                "progress": 10 + 80 * len(results) // total
+            }
+            continue
+        
+        if on_complete is not None:
+            await on_complete(event.section, event.result)
+        results[event.section] = event.result
+        yield "progress", {
+            "status": "partial_complete",
+            "message": f"{label[0].upper()}{label[1:]} berhasil di-generate",
+            "progress": 10 + 80 * len(results) // total,
+            "data": {
+                event.section: event.result
+            }
+        }
+
 async def analyze_project_data_stream(
-    db: Session,
     id_ringkasan: str,
-    user_id: str
+    user_id: str,
+    use_cache: bool = True
 ):
     """
     Generate informasi teknis, analisis financial, dan roadmap dengan stream response
-    Menggunakan parallel processing untuk optimasi kecepatan
+    Section dijalankan lewat pipeline dependency graph, bukan berurutan satu per satu.
+    Session dibuka sendiri oleh generator karena stream bisa berjalan lebih lama dari
+    request yang memulainya (resume lewat Last-Event-ID, selesai di background).
     """
-    try:
-        def send_event(event_type: str, data: dict):
-            """Helper untuk format SSE event"""
-            return f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
-        
-        # 1. Validasi dan setup
-        yield send_event("progress", {
-            "status": "started",
-            "message": "Memulai analisis project...",
-            "progress": 0
-        })
-        
-        ringkasan_awal = db.get(RingkasanAwal, id_ringkasan)
-        if not ringkasan_awal:
-            yield send_event("error", {
-                "message": "Ringkasan awal tidak ditemukan"
+    async with new_async_session() as db:
+        try:
+            def send_event(event_type: str, data: dict):
+                """Helper untuk format SSE event"""
+                return f"event: {event_type}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+            
+            # 1. Validasi dan setup
+            yield send_event("progress", {
+                "status": "started",
+                "message": "Memulai analisis project...",
+                "progress": 0
             })
-            return
-        
-        project = db.get(Project, ringkasan_awal.project_id)
-        if not project:
+            
+            ringkasan_awal = await db.get(RingkasanAwal, id_ringkasan)
+            if not ringkasan_awal:
+                yield send_event("error", {
+                    "message": "Ringkasan awal tidak ditemukan"
+                })
+                return
+            
+            project = await db.get(Project, ringkasan_awal.project_id)
+            if not project:
+                yield send_event("error", {
+                    "message": "Project tidak ditemukan"
+                })
+                return
+            
+            if project.user_id != user_id:
+                yield send_event("error", {
+                    "message": "Anda tidak memiliki akses untuk menganalisis project ini"
+                })
+                return
+            
+            # 2. Jalankan pipeline; tiap section dilaporkan saat dimulai dan langsung disimpan saat selesai
+            common_params = analyze_common_params(project, ringkasan_awal, use_cache)
+            results = {}
+            
+            async for event_type, data in checkpointed_analyze_events(db, project.id, id_ringkasan, common_params, results):
+                yield send_event(event_type, data)
+            
+            informasi_teknis_result = results["informasi_teknis"]
+            analisis_financial_result = results["analisis_financial"]
+            roadmap_result = results["roadmap"]
+            
+            # 3. Final response
+            response_data = {
+                "informasi_teknis": informasi_teknis_result,
+                "analisis_financial": analisis_financial_result,
+                "roadmap": roadmap_result
+            }
+            
+            yield send_event("complete", {
+                "status": "completed",
+                "message": "Semua data berhasil di-generate dan disimpan",
+                "progress": 100,
+                "data": response_data
+            })
+            
+        except GenerationCancelledError:
+            logger.info(f"⚠️ Client terputus, analisis untuk ringkasan {id_ringkasan} dibatalkan")
+            await db.rollback()
+        except HTTPException as e:
+            await db.rollback()
             yield send_event("error", {
-                "message": "Project tidak ditemukan"
+                "message": e.detail,
+                "status_code": e.status_code
             })
-            return
-        
-        if project.user_id != user_id:
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"❌ Error saat generate data dengan stream: {str(e)}", exc_info=True)
             yield send_event("error", {
-                "message": "Anda tidak memiliki akses untuk menganalisis project ini"
+                "message": f"Gagal generate data: {str(e)}"
             })
-            return
-        
-        jenis_ikan_str = get_enum_value(project.jenis_ikan)
-        resiko_str = get_enum_value(project.resiko)
-        potensi_pasar_str = get_enum_value(ringkasan_awal.potensi_pasar)
-        
-        # 2. Prepare common parameters untuk parallel execution
-        common_params = {
-            "project_name": project.project_name,
-            "jenis_ikan": jenis_ikan_str,
-            "modal": project.modal,
-            "kabupaten_id": project.kabupaten_id,
-            "resiko": resiko_str,
-            "skor_kelayakan": ringkasan_awal.skor_kelayakan,
-            "potensi_pasar": potensi_pasar_str,
-            "estimasi_balik_modal": ringkasan_awal.estimasi_balik_modal,
-            "kesimpulan_ringkasan": ringkasan_awal.kesimpulan_ringkasan,
-            "lang": project.lang,
-            "lat": project.lat
-        }
-        
-        # 3. Generate informasi_teknis terlebih dahulu
-        yield send_event("progress", {
-            "status": "processing",
-            "message": "Memulai generate informasi teknis...",
-            "progress": 10
-        })
-        
-        informasi_teknis_result = await asyncio.get_event_loop().run_in_executor(
-            executor,
-            lambda: generate_informasi_teknis_with_gemini(**common_params)
-        )
-        
-        yield send_event("progress", {
-            "status": "partial_complete",
-            "message": "Informasi teknis berhasil di-generate",
-            "progress": 40,
-            "data": {
-                "informasi_teknis": informasi_teknis_result
-            }
-        })
-        
-        # 4. Generate analisis_financial setelah informasi_teknis selesai
-        yield send_event("progress", {
-            "status": "processing",
-            "message": "Memulai generate analisis financial...",
-            "progress": 45
-        })
-        
-        analisis_financial_result = await asyncio.get_event_loop().run_in_executor(
-            executor,
-            lambda: generate_analisis_financial_with_gemini(
-                **common_params,
-                informasi_teknis=informasi_teknis_result
-            )
-        )
-        
-        yield send_event("progress", {
-            "status": "partial_complete",
-            "message": "Analisis financial berhasil di-generate",
-            "progress": 70,
-            "data": {
-                "analisis_financial": analisis_financial_result
-            }
-        })
-        
-        # 5. Generate roadmap setelah informasi_teknis dan analisis_financial selesai
-        yield send_event("progress", {
-            "status": "processing",
-            "message": "Memulai generate roadmap...",
-            "progress": 75
-        })
-        
-        roadmap_result = await asyncio.get_event_loop().run_in_executor(
-            executor,
-            lambda: generate_roadmap_with_gemini(
-                **common_params,
-                informasi_teknis=informasi_teknis_result,
-                analisis_financial=analisis_financial_result
-            )
-        )
-        
-        yield send_event("progress", {
-            "status": "partial_complete",
-            "message": "Roadmap berhasil di-generate",
-            "progress": 90,
-            "data": {
-                "roadmap": roadmap_result
-            }
-        })
-        
-        # 6. Save ke database
-        yield send_event("progress", {
-            "status": "processing",
-            "message": "Menyimpan data ke database...",
-            "progress": 95
-        })
-        
-        # Save informasi_teknis
-        existing_informasi_teknis = db.exec(
-            select(InformasiTeknis).where(InformasiTeknis.project_id == project.id)
-        ).first()
-        
-        if existing_informasi_teknis:
-            existing_informasi_teknis.spesifikasi_kolam = informasi_teknis_result.get("spesifikasiKolam")
-            existing_informasi_teknis.kualitas_air = informasi_teknis_result.get("kualitasAir")
-            existing_informasi_teknis.spesifikasi_benih = informasi_teknis_result.get("spesifikasiBenih")
-            existing_informasi_teknis.spesifikasi_pakan = informasi_teknis_result.get("spesifikasiPakan")
-            existing_informasi_teknis.manajemen_kesehatan = informasi_teknis_result.get("manajemenKesehatan")
-            existing_informasi_teknis.teknologi_pendukung = informasi_teknis_result.get("teknologiPendukung")
-            db.add(existing_informasi_teknis)
-        else:
-            new_informasi_teknis = InformasiTeknis(
-                project_id=project.id,
-                spesifikasi_kolam=informasi_teknis_result.get("spesifikasiKolam"),
-                kualitas_air=informasi_teknis_result.get("kualitasAir"),
-                spesifikasi_benih=informasi_teknis_result.get("spesifikasiBenih"),
-                spesifikasi_pakan=informasi_teknis_result.get("spesifikasiPakan"),
-                manajemen_kesehatan=informasi_teknis_result.get("manajemenKesehatan"),
-                teknologi_pendukung=informasi_teknis_result.get("teknologiPendukung")
-            )
-            db.add(new_informasi_teknis)
-        
-        # Save analisis_financial
-        existing_analisis_financial = db.exec(
-            select(AnalisisFinancial).where(AnalisisFinancial.project_id == project.id)
-        ).first()
-        
-        if existing_analisis_financial:
-            existing_analisis_financial.rincian_modal_awal = analisis_financial_result.get("rincianModalAwal")
-            existing_analisis_financial.biaya_operasional = analisis_financial_result.get("biayaOperasional")
-            existing_analisis_financial.analisis_roi = analisis_financial_result.get("analisisROI")
-            existing_analisis_financial.analisis_bep = analisis_financial_result.get("analisisBEP")
-            existing_analisis_financial.proyeksi_pendapatan = analisis_financial_result.get("proyeksiPendapatan")
-            db.add(existing_analisis_financial)
-        else:
-            new_analisis_financial = AnalisisFinancial(
-                project_id=project.id,
-                rincian_modal_awal=analisis_financial_result.get("rincianModalAwal"),
-                biaya_operasional=analisis_financial_result.get("biayaOperasional"),
-                analisis_roi=analisis_financial_result.get("analisisROI"),
-                analisis_bep=analisis_financial_result.get("analisisBEP"),
-                proyeksi_pendapatan=analisis_financial_result.get("proyeksiPendapatan")
-            )
-            db.add(new_analisis_financial)
-        
-        # Delete dan create roadmap baru
-        existing_roadmaps = db.exec(
-            select(Roadmap).where(Roadmap.project_id == project.id)
-        ).all()
-        
-        for roadmap in existing_roadmaps:
-            db.delete(roadmap)
-        
-        roadmap_step = roadmap_result.get("step", 1.0)
-        if not isinstance(roadmap_step, (int, float)):
-            roadmap_step = 1.0
-        else:
-            roadmap_step = float(roadmap_step)
-        
-        new_roadmap = Roadmap(
-            project_id=project.id,
-            response=roadmap_result.get("response"),
-            request=roadmap_result.get("request"),
-            step=roadmap_step,
-            is_request=roadmap_result.get("isRequest", False),
-            roadmap_id=roadmap_result.get("roadmapId")
-        )
-        db.add(new_roadmap)
-        
-        db.commit()
-        
-        # 7. Final response
-        response_data = {
-            "informasi_teknis": informasi_teknis_result,
-            "analisis_financial": analisis_financial_result,
-            "roadmap": roadmap_result
-        }
-        
-        yield send_event("complete", {
-            "status": "completed",
-            "message": "Semua data berhasil di-generate dan disimpan",
-            "progress": 100,
-            "data": response_data
-        })
-        
-    except HTTPException as e:
-        db.rollback()
-        yield send_event("error", {
-            "message": e.detail,
-            "status_code": e.status_code
-        })
-    except Exception as e:
-        db.rollback()
-        logger.error(f"❌ Error saat generate data dengan stream: {str(e)}", exc_info=True)
-        yield send_event("error", {
-            "message": f"Gagal generate data: {str(e)}"
-        })
 
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import logging
+from typing import Optional
+from sqlmodel import Session
+from fastapi import HTTPException, status
+from app.config import get_settings
+from app.database import new_async_session
+from app.models.analyze_job import AnalyzeJob
+from app.models.project import Project
+from app.models.ringkasan_awal import RingkasanAwal
+from app.controllers.analyze_controller import ANALYZE_MODES, analyze_common_params, checkpointed_analyze_events
+from app.schemas.job import AnalyzeJobData, AnalyzeJobResponse
+from app.service.job_queue import TERMINAL_EVENTS, Emit, get_analyze_job_queue
+
+logger = logging.getLogger(__name__)
+
+def job_to_data(job: AnalyzeJob) -> AnalyzeJobData:
+    """Convert model job ke schema response"""
+    return AnalyzeJobData(
+        id=job.id,
+        ringkasan_id=job.ringkasan_id,
+        status=job.status,
+        mode=job.mode,
+        attempts=job.attempts,
+        created_at=job.created_at,
+        finished_at=job.finished_at,
+        result=job.result,
+        error=job.error
+    )
+
+def create_analyze_job(
+    db: Session,
+    id_ringkasan: str,
+    user_id: str,
+    use_cache: bool = True,
+    mode: str = None
+) -> AnalyzeJobResponse:
+    """
+    Masukkan analyze ke antrean job dan langsung return id job-nya
+    """
+    mode = mode or get_settings().analyze_mode
+    if mode not in ANALYZE_MODES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Mode analyze tidak dikenal: {mode} (pilihan: {', '.join(ANALYZE_MODES)})"
+        )
+    
+    ringkasan_awal = db.get(RingkasanAwal, id_ringkasan)
+    if not ringkasan_awal:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Ringkasan awal tidak ditemukan"
+        )
+    
+    project = db.get(Project, ringkasan_awal.project_id)
+    if not project:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Project tidak ditemukan"
+        )
+    
+    if project.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Anda tidak memiliki akses untuk menganalisis project ini"
+        )
+    
+    job = get_analyze_job_queue().enqueue(db, id_ringkasan, user_id, mode, use_cache)
+    return AnalyzeJobResponse(
+        success=True,
+        message="Job analyze masuk antrean",
+        data=job_to_data(job)
+    )
+
+def get_owned_job(db: Session, job_id: str, user_id: str) -> AnalyzeJob:
+    """Ambil job milik user, 404/403 jika tidak ada atau bukan miliknya"""
+    job = db.get(AnalyzeJob, job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job tidak ditemukan"
+        )
+    if job.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Anda tidak memiliki akses untuk melihat job ini"
+        )
+    return job
+
+def get_analyze_job(db: Session, job_id: str, user_id: str) -> AnalyzeJobResponse:
+    """
+    Status job analyze beserta hasil (jika succeeded) atau error (jika failed)
+    """
+    job = get_owned_job(db, job_id, user_id)
+    return AnalyzeJobResponse(
+        success=True,
+        message="data received",
+        data=job_to_data(job)
+    )
+
+async def stream_analyze_job_events(job_id: str, last_event_id: Optional[int] = None):
+    """
+    Stream event job sebagai SSE dengan polling tabel event, sehingga subscriber bisa
+    terhubung ke replica mana pun. Selesai setelah event complete/error terkirim.
+    """
+    queue = get_analyze_job_queue()
+    poll_seconds = get_settings().analyze_job_stream_poll_seconds
+    last_id = last_event_id or 0
+    while True:
+        events = await asyncio.to_thread(queue.events_after, job_id, last_id)
+        for event in events:
+            last_id = event.id
+            yield f"id: {event.id}\nevent: {event.event}\ndata: {json.dumps(event.data, ensure_ascii=False, default=str)}\n\n"
+            if event.event in TERMINAL_EVENTS:
+                return
+        await asyncio.sleep(poll_seconds)
+
+async def run_analyze_job(job: AnalyzeJob, emit: Emit) -> dict:
+    """
+    Handler worker: jalankan analyze untuk job; setiap section disimpan begitu tervalidasi
+    sehingga retry job melanjutkan dari section yang belum tersimpan
+    """
+    async with new_async_session() as db:
+        ringkasan_awal = await db.get(RingkasanAwal, job.ringkasan_id)
+        project = await db.get(Project, ringkasan_awal.project_id) if ringkasan_awal else None
+        if project is None:
+            raise ValueError(f"Project untuk ringkasan {job.ringkasan_id} tidak ditemukan")
+        project_id = project.id
+        common_params = analyze_common_params(project, ringkasan_awal, job.use_cache)
+        
+        # Session hanya memegang koneksi saat commit checkpoint, tidak selama menunggu Gemini
+        results = {}
+        async for event_type, data in checkpointed_analyze_events(
+            db, project_id, job.ringkasan_id, common_params, results, job.mode
+        ):
+            await emit(event_type, data)
+    
+    return {
+        "informasi_teknis": results["informasi_teknis"],
+        "analisis_financial": results["analisis_financial"],
+        "roadmap": results["roadmap"]
+    }
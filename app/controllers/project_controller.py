@@ -5,13 +5,16 @@ from app.models.project import Project
 from app.models.ringkasan_awal import RingkasanAwal, PotensiPasar
 from app.schemas.project import ProjectCreate, ProjectResponse, ProjectData, RingkasanAwalData, RingkasanAwalDataSimple, AIAnalysisInfo, ProjectUpdate, ProjectUpdateResponse, ProjectDetailResponse, ProjectListResponse, ProjectListItem
 from app.service.generative.prompt_ringkasan_awal import analyze_project_with_gemini
+from app.service.generative.errors import GeminiSafetyBlockedError, GeminiUnavailableError
+from app.controllers.analyze_controller import schedule_analyze_prefetch
 
 logger = logging.getLogger(__name__)
 
 def create_project_with_analysis(
     db: Session,
     project_data: ProjectCreate,
-    user_id: str
+    user_id: str,
+    use_cache: bool = True
 ) -> ProjectResponse:
 
     try:
@@ -29,7 +32,8 @@ def create_project_with_analysis(
             kabupaten_id=project_data.kabupaten_id,
             resiko=project_data.resiko,
             lang=project_data.lang,
-            lat=project_data.lat
+            lat=project_data.lat,
+            use_cache=use_cache
         )
         
         new_project = Project(
@@ -60,6 +64,8 @@ def create_project_with_analysis(
         db.commit()
         db.refresh(new_ringkasan)
         
+        # User hampir selalu lanjut ke /analyze, informasi teknis mulai di-generate sekarang
+        schedule_analyze_prefetch(new_project, new_ringkasan, use_cache)
     
         def get_enum_value(enum_obj):
             """Helper untuk mendapatkan value dari enum atau string"""
@@ -104,6 +110,21 @@ def create_project_with_analysis(
             ringkasan_awal=ringkasan_response_data
         )
         
+    except GeminiUnavailableError as e:
+        logger.warning(f"⚠️ Layanan AI sedang tidak tersedia: {str(e)}")
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+    except GeminiSafetyBlockedError as e:
+        logger.warning(f"⚠️ Request AI diblokir safety filter: {str(e)}")
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
     except ValueError as e:
         logger.error(f"❌ Validation error: {str(e)}")
         db.rollback()
@@ -123,7 +144,8 @@ def update_project_partial(
     db: Session,
     project_id: str,
     update_data: ProjectUpdate,
-    user_id: str
+    user_id: str,
+    use_cache: bool = True
 ) -> ProjectUpdateResponse:
     """
     Update sebagian field project (PATCH) dan re-analyze dengan AI
@@ -225,7 +247,8 @@ def update_project_partial(
             kabupaten_id=project.kabupaten_id,
             resiko=resiko_enum,
             lang=project.lang,
-            lat=project.lat
+            lat=project.lat,
+            use_cache=use_cache
         )
         
         # 6. Update atau create ringkasan_awal dengan hasil analisis baru
@@ -318,6 +341,21 @@ def update_project_partial(
     except HTTPException:
         db.rollback()
         raise
+    except GeminiUnavailableError as e:
+        logger.warning(f"⚠️ Layanan AI sedang tidak tersedia: {str(e)}")
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+    except GeminiSafetyBlockedError as e:
+        logger.warning(f"⚠️ Request AI diblokir safety filter: {str(e)}")
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
     except ValueError as e:
         logger.error(f"❌ Validation error: {str(e)}")
         db.rollback()
@@ -5,14 +5,18 @@ from fastapi import HTTPException, status
 from app.models.project import Project
 from app.models.ringkasan_awal import RingkasanAwal, PotensiPasar
 from app.schemas.project import ProjectCreate, ProjectData, RingkasanAwalData, AIAnalysisInfo
-from app.service.generative.prompt_ringkasan_awal.project_analyzer import ProjectAnalyzer
+from app.controllers.analyze_controller import schedule_analyze_prefetch
+from app.service.generative.cancellation import cancellable_section
+from app.service.generative.errors import GenerationCancelledError
+from app.service.generative.prompt_ringkasan_awal.project_analyzer import get_project_analyzer
 
 logger = logging.getLogger(__name__)
 
 def create_project_with_streaming(
     db: Session,
     project_data: ProjectCreate,
-    user_id: str
+    user_id: str,
+    use_cache: bool = True
 ):
     """Create project dengan streaming response dari AI analysis
     
@@ -24,29 +28,31 @@ def create_project_with_streaming(
         if not project_name:
             project_name = f"Project {project_data.jenis_ikan.value} - {project_data.kabupaten_id}"
         
-        analyzer = ProjectAnalyzer()
+        analyzer = get_project_analyzer()
         
         full_result = None
-        for chunk in analyzer.analyze_project_stream(
-            project_name=project_name,
-            jenis_ikan=project_data.jenis_ikan,
-            modal=project_data.modal,
-            kabupaten_id=project_data.kabupaten_id,
-            resiko=project_data.resiko,
-            lang=project_data.lang,
-            lat=project_data.lat
-        ):
-            # Forward semua chunks ke client
-            chunk_json = json.dumps(chunk, ensure_ascii=False)
-            yield f"data: {chunk_json}\n\n"
+        with cancellable_section(analyzer.SECTION):
+            for chunk in analyzer.analyze_project_stream(
+                project_name=project_name,
+                jenis_ikan=project_data.jenis_ikan,
+                modal=project_data.modal,
+                kabupaten_id=project_data.kabupaten_id,
+                resiko=project_data.resiko,
+                lang=project_data.lang,
+                lat=project_data.lat,
+                use_cache=use_cache
+            ):
+                # Forward semua chunks ke client
+                chunk_json = json.dumps(chunk, ensure_ascii=False)
+                yield f"data: {chunk_json}\n\n"
             
-            # Simpan result untuk digunakan setelah streaming selesai
-            if chunk.get("type") == "result":
-                full_result = chunk.get("data")
-            elif chunk.get("type") == "error":
-                # Jika ada error, stop streaming
-                db.rollback()
-                return
+                # Simpan result untuk digunakan setelah streaming selesai
+                if chunk.get("type") == "result":
+                    full_result = chunk.get("data")
+                elif chunk.get("type") == "error":
+                    # Jika ada error, stop streaming
+                    db.rollback()
+                    return
         
         if not full_result:
             raise ValueError("Tidak ada hasil dari analisis AI")
@@ -83,6 +89,9 @@ def create_project_with_streaming(
         db.commit()
         db.refresh(new_ringkasan)
         
+        # User hampir selalu lanjut ke /analyze, informasi teknis mulai di-generate sekarang
+        schedule_analyze_prefetch(new_project, new_ringkasan, use_cache)
+        
         # Helper function
         def get_enum_value(enum_obj):
             if hasattr(enum_obj, 'value'):
@@ -152,6 +161,9 @@ def create_project_with_streaming(
         
         logger.info(f"✅ Project created dengan streaming: {new_project.id}")
         
+    except GenerationCancelledError:
+        logger.info("⚠️ Client terputus, pembuatan project dibatalkan")
+        db.rollback()
     except ValueError as e:
         logger.error(f"❌ Validation error: {str(e)}")
         db.rollback()
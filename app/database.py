@@ -1,4 +1,6 @@
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from app.config import get_settings
 
 from app.models.user import User
@@ -9,6 +11,9 @@ from app.models.informasi_teknis import InformasiTeknis
 from app.models.roadmap import Roadmap
 from app.models.suplier import Suplier
 from app.models.produk import Produk
+from app.models.llm_response_cache import LLMResponseCache
+from app.models.analyze_job import AnalyzeJob, AnalyzeJobEvent
+from app.models.analyze_run import AnalyzeRun
 
 import logging
 
@@ -17,6 +22,27 @@ logger = logging.getLogger(__name__)
 settings = get_settings()
 engine = create_engine(settings.database_url, echo=True) 
 
+# Driver async untuk tiap driver sync yang dipakai database_url
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite"
+}
+
+def async_database_url(database_url: str) -> str:
+    """Ubah URL database sync (mis. postgresql://) menjadi URL driver async (postgresql+asyncpg://)"""
+    scheme, separator, rest = database_url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{separator}{rest}"
+
+async_engine = create_async_engine(
+    settings.async_database_url or async_database_url(settings.database_url),
+    echo=True,
+    pool_size=settings.async_database_pool_size,
+    max_overflow=settings.async_database_max_overflow,
+    pool_pre_ping=True
+)
+
 def init_db():
     """Initialize database - Create all tables"""
     logger.info("Initializing database...")
@@ -30,4 +56,13 @@ def init_db():
 
 def get_session():
     with Session(engine) as session:
-        yield session
\ No newline at end of file
+        yield session
+
+def new_async_session() -> AsyncSession:
+    """AsyncSession di luar request (worker job); objek tetap bisa dibaca setelah commit tanpa query ulang"""
+    return AsyncSession(async_engine, expire_on_commit=False)
+
+async def get_async_session():
+    """Dependency session async untuk route async, supaya query tidak memblok event loop"""
+    async with new_async_session() as session:
+        yield session
@@ -1,35 +1,53 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlmodel import Session
-from app.database import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import get_async_session, get_session
 from app.models.user import User
 from app.utils.security import verify_token
 
 security = HTTPBearer()
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_session)
-) -> User:
-    """Middleware untuk authentication dengan JWT - Tidak ada authorization"""
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    
-    token = credentials.credentials
-    payload = verify_token(token)
-    
+
+def _user_id_from_credentials(credentials: HTTPAuthorizationCredentials) -> str:
+    """Ambil user id (claim `sub`) dari JWT; raise 401 jika token tidak valid"""
+    payload = verify_token(credentials.credentials)
     if payload is None:
-        raise credentials_exception
-    
+        raise _credentials_exception()
+
     user_id: str = payload.get("sub")
     if user_id is None:
-        raise credentials_exception
-    
-    user = db.get(User, user_id)
+        raise _credentials_exception()
+    return user_id
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_session)
+) -> User:
+    """Middleware untuk authentication dengan JWT - Tidak ada authorization
+
+    Untuk route sync: memakai Session yang sama dengan route (dependency di-cache per
+    request), sehingga tidak membuka koneksi tambahan dari pool async.
+    """
+    user = db.get(User, _user_id_from_credentials(credentials))
+    if user is None:
+        raise _credentials_exception()
+
+    return user
+
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_session)
+) -> User:
+    """Versi async dari get_current_user untuk route async yang memakai AsyncSession"""
+    user = await db.get(User, _user_id_from_credentials(credentials))
     if user is None:
-        raise credentials_exception
-    
-    return user
\ No newline at end of file
+        raise _credentials_exception()
+
+    return user
@@ -6,6 +6,9 @@ from app.models.informasi_teknis import InformasiTeknis
 from app.models.roadmap import Roadmap
 from app.models.suplier import Suplier
 from app.models.produk import Produk, TipeProduk
+from app.models.llm_response_cache import LLMResponseCache
+from app.models.analyze_job import AnalyzeJob, AnalyzeJobEvent, AnalyzeJobStatus
+from app.models.analyze_run import AnalyzeRun, AnalyzeRunStatus
 
 __all__ = [
     "User",
@@ -19,5 +22,11 @@ __all__ = [
     "Roadmap",
     "Suplier",
     "Produk",
-    "TipeProduk"
+    "TipeProduk",
+    "LLMResponseCache",
+    "AnalyzeJob",
+    "AnalyzeJobEvent",
+    "AnalyzeJobStatus",
+    "AnalyzeRun",
+    "AnalyzeRunStatus"
 ]
\ No newline at end of file
@@ -0,0 +1,65 @@
+import uuid
+from datetime import datetime
+from enum import Enum
+from sqlmodel import SQLModel, Field, Column, String
+from typing import Optional, Any
+from sqlalchemy import JSON, Text
+
+class AnalyzeJobStatus(str, Enum):
+    """Enum untuk status job analyze"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class AnalyzeJob(SQLModel, table=True):
+    """Model untuk job analyze di background - antrean Postgres yang diambil worker dengan SKIP LOCKED"""
+    __tablename__ = "analyze_jobs"
+    
+    id: Optional[str] = Field(
+        default_factory=lambda: str(uuid.uuid4()),
+        primary_key=True
+    )
+    ringkasan_id: str = Field(
+        foreign_key="ringkasan_awal.id",
+        index=True
+    )
+    user_id: str = Field(
+        foreign_key="users.id",
+        index=True
+    )
+    status: AnalyzeJobStatus = Field(
+        default=AnalyzeJobStatus.QUEUED,
+        sa_column=Column(String, index=True, nullable=False)
+    )
+    mode: str = "pipeline"
+    use_cache: bool = True
+    attempts: int = 0
+    result: Optional[Any] = Field(
+        default=None,
+        sa_column=Column(JSON)
+    )
+    error: Optional[str] = Field(
+        default=None,
+        sa_column=Column(Text)
+    )
+    locked_by: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    heartbeat_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+class AnalyzeJobEvent(SQLModel, table=True):
+    """Model untuk event progress job analyze, dibaca oleh subscriber SSE dari replica mana pun"""
+    __tablename__ = "analyze_job_events"
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    job_id: str = Field(
+        foreign_key="analyze_jobs.id",
+        index=True
+    )
+    event: str
+    data: Optional[Any] = Field(
+        default=None,
+        sa_column=Column(JSON)
+    )
+    created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,40 @@
+from datetime import datetime
+from enum import Enum
+from sqlmodel import SQLModel, Field, Column, String
+from typing import List, Optional
+from sqlalchemy import JSON, Text
+
+class AnalyzeRunStatus(str, Enum):
+    """Enum untuk status analyze project"""
+    PENDING = "pending"
+    PARTIAL = "partial"
+    COMPLETE = "complete"
+
+class AnalyzeRun(SQLModel, table=True):
+    """Model untuk status analyze per project - One to One dengan Project
+
+    Setiap section disimpan begitu tervalidasi; run yang berhenti di tengah (partial)
+    dilanjutkan dari section yang belum tersimpan.
+    """
+    __tablename__ = "analyze_runs"
+    
+    project_id: str = Field(
+        foreign_key="projects.id",
+        primary_key=True
+    )
+    status: AnalyzeRunStatus = Field(
+        default=AnalyzeRunStatus.PENDING,
+        sa_column=Column(String, nullable=False)
+    )
+    completed_sections: List[str] = Field(
+        default_factory=list,
+        sa_column=Column(JSON, nullable=False)
+    )
+    # Fingerprint input analyze (project & ringkasan); section tersimpan hanya dilanjutkan jika sama
+    params_fingerprint: Optional[str] = None
+    failed_section: Optional[str] = None
+    error: Optional[str] = Field(
+        default=None,
+        sa_column=Column(Text)
+    )
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,14 @@
+from datetime import datetime
+from sqlmodel import SQLModel, Field, Column
+from sqlalchemy import Text
+
+class LLMResponseCache(SQLModel, table=True):
+    """Model untuk tier persisten cache response LLM (content-addressed)"""
+    __tablename__ = "llm_response_cache"
+    
+    cache_key: str = Field(primary_key=True, description="sha256 dari (model, prompt, generation config)")
+    section: str = Field(index=True)
+    model_name: str
+    response_text: str = Field(sa_column=Column(Text, nullable=False))
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
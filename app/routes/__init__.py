@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.routes import user_routes, project_routes, supplier_routes
+from app.routes import user_routes, project_routes, supplier_routes, generative_routes, job_routes
 
 api_router = APIRouter()
 
@@ -19,4 +19,16 @@ api_router.include_router(
     supplier_routes.router,
     prefix="/api/v1",
     tags=["suppliers"]
+)
+
+api_router.include_router(
+    generative_routes.router,
+    prefix="/api/v1",
+    tags=["generative"]
+)
+
+api_router.include_router(
+    job_routes.router,
+    prefix="/api/v1",
+    tags=["jobs"]
 )
\ No newline at end of file
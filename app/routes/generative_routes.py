@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends, status
+from app.middleware.auth_middleware import get_current_user
+from app.models.user import User
+from app.service.generative.metrics import metrics
+
+router = APIRouter()
+
+@router.get(
+    "/generative/metrics",
+    status_code=status.HTTP_200_OK,
+    tags=["generative"]
+)
+def get_generative_metrics(
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Counter layer generative per section (cache hit/miss, jumlah call Gemini, dll)
+    """
+    return {
+        "success": True,
+        "data": metrics.snapshot()
+    }
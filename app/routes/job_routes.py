@@ -0,0 +1,64 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+from app.database import get_session
+from app.schemas.job import AnalyzeJobResponse
+from app.controllers.job_controller import get_analyze_job, get_owned_job, stream_analyze_job_events
+from app.middleware.auth_middleware import get_current_user
+from app.models.user import User
+from app.service.generative.resumable_stream import parse_last_event_id
+
+router = APIRouter()
+
+@router.get(
+    "/jobs/{job_id}",
+    response_model=AnalyzeJobResponse,
+    status_code=status.HTTP_200_OK,
+    tags=["jobs"]
+)
+def get_job(
+    job_id: str,
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Status job analyze (queued, running, succeeded, failed) beserta hasil atau error-nya
+    
+    Menggunakan path parameter: GET /api/v1/jobs/{job_id}
+    """
+    return get_analyze_job(db, job_id, current_user.id)
+
+@router.get(
+    "/jobs/{job_id}/stream",
+    status_code=status.HTTP_200_OK,
+    tags=["jobs"]
+)
+def stream_job(
+    job_id: str,
+    last_event_id: Optional[str] = Header(None, description="Id event terakhir yang diterima, untuk melanjutkan stream"),
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Subscribe event job analyze dengan Server-Sent Events (SSE)
+    
+    Event yang sudah terjadi dikirim ulang dari awal (atau setelah header Last-Event-ID),
+    lalu event baru menyusul:
+    - event: queued / running - Status job berubah
+    - event: progress - Progress per section (sama seperti /analyze/{id_ringkasan}/stream)
+    - event: complete - Job selesai, berisi hasil analyze
+    - event: error - Job gagal
+    
+    Menggunakan path parameter: GET /api/v1/jobs/{job_id}/stream
+    """
+    get_owned_job(db, job_id, current_user.id)
+    return StreamingResponse(
+        stream_analyze_job_events(job_id, parse_last_event_id(last_event_id)),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "X-Accel-Buffering": "no"
+        }
+    )
@@ -1,12 +1,18 @@
-from fastapi import APIRouter, Depends, status
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Query, Request, status
 from fastapi.responses import StreamingResponse
 from sqlmodel import Session
-from app.database import get_session
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import get_async_session, get_session
 from app.schemas.project import ProjectCreate, ProjectResponse, ProjectUpdate, ProjectUpdateResponse, ProjectDetailResponse, ProjectListResponse, AnalyzeResponse, RoadmapStepRequest, RoadmapStepUpdateResponse
 from app.controllers.project_controller import create_project_with_analysis, update_project_partial, get_project_by_id, get_projects
-from app.controllers.analyze_controller import analyze_project_data, get_analyze_data, update_roadmap_step, analyze_project_data_stream
-from app.middleware.auth_middleware import get_current_user
+from app.controllers.analyze_controller import analyze_project_data, get_analyze_data, update_roadmap_step, analyze_project_data_stream, regenerate_analyze_section
+from app.controllers.job_controller import create_analyze_job
+from app.schemas.job import AnalyzeJobResponse
+from app.middleware.auth_middleware import get_current_user, get_current_user_async
 from app.models.user import User
+from app.service.generative.cancellation import stream_until_disconnect
+from app.service.generative.resumable_stream import stream_resumable
 
 router = APIRouter()
 
@@ -18,11 +24,12 @@ router = APIRouter()
 )
 def create_project(
     project_data: ProjectCreate,
+    regenerate: bool = Query(False, description="Paksa generate ulang tanpa memakai cache response AI"),
     db: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """Create project dengan analisis AI (non-streaming)"""
-    return create_project_with_analysis(db, project_data, current_user.id)
+    return create_project_with_analysis(db, project_data, current_user.id, use_cache=not regenerate)
 
 @router.post(
     "/projects/stream",
@@ -30,14 +37,20 @@ def create_project(
     tags=["projects"]
 )
 async def create_project_stream(
+    request: Request,
     project_data: ProjectCreate,
+    regenerate: bool = Query(False, description="Paksa generate ulang tanpa memakai cache response AI"),
     db: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     from app.controllers.project_controller_stream import create_project_with_streaming
     
     return StreamingResponse(
-        create_project_with_streaming(db, project_data, current_user.id),
+        stream_until_disconnect(
+            request,
+            create_project_with_streaming(db, project_data, current_user.id, use_cache=not regenerate),
+            name="projects_stream"
+        ),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -54,11 +67,12 @@ async def create_project_stream(
 def update_project(
     project_id: str,
     update_data: ProjectUpdate,
+    regenerate: bool = Query(False, description="Paksa generate ulang tanpa memakai cache response AI"),
     db: Session = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
 
-    return update_project_partial(db, project_id, update_data, current_user.id)
+    return update_project_partial(db, project_id, update_data, current_user.id, use_cache=not regenerate)
 
 @router.get(
     "/projects",
@@ -97,15 +111,20 @@ def get_project(
 )
 async def analyze(
     id_ringkasan: str,
-    db: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    regenerate: bool = Query(False, description="Paksa generate ulang tanpa memakai cache response AI"),
+    mode: Optional[str] = Query(
+        None,
+        description="pipeline (tiga panggilan berantai) atau combined (satu panggilan); default dari setting analyze_mode"
+    ),
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Generate informasi teknis, analisis financial, dan roadmap menggunakan Gemini AI (non-streaming)
     
     Menggunakan path parameter: POST /api/v1/analyze/{id_ringkasan}
     """
-    return await analyze_project_data(db, id_ringkasan, current_user.id)
+    return await analyze_project_data(db, id_ringkasan, current_user.id, use_cache=not regenerate, mode=mode)
 
 @router.post(
     "/analyze/{id_ringkasan}/stream",
@@ -113,9 +132,11 @@ async def analyze(
     tags=["projects"]
 )
 async def analyze_stream(
+    request: Request,
     id_ringkasan: str,
-    db: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    regenerate: bool = Query(False, description="Paksa generate ulang tanpa memakai cache response AI"),
+    last_event_id: Optional[str] = Header(None, description="Id event terakhir yang diterima, untuk melanjutkan stream"),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Generate informasi teknis, analisis financial, dan roadmap menggunakan Gemini AI dengan stream response
@@ -127,10 +148,21 @@ async def analyze_stream(
     - event: complete - Semua data selesai dan disimpan
     - event: error - Error yang terjadi
     
+    Setiap event memiliki id. Jika client terputus, generate tetap berjalan selama
+    SSE_RESUME_GRACE_SECONDS; reconnect dengan header Last-Event-ID menerima ulang event
+    yang terlewat lalu mengikuti generate yang sama. Tanpa reconnect, section yang belum
+    di-generate dibatalkan (atau diselesaikan di background jika SSE_FINISH_IN_BACKGROUND aktif).
+    
     Menggunakan path parameter: POST /api/v1/analyze/{id_ringkasan}/stream
     """
     return StreamingResponse(
-        analyze_project_data_stream(db, id_ringkasan, current_user.id),
+        stream_resumable(
+            request,
+            ("analyze_stream", current_user.id, id_ringkasan),
+            lambda: analyze_project_data_stream(id_ringkasan, current_user.id, use_cache=not regenerate),
+            name="analyze_stream",
+            last_event_id=last_event_id
+        ),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -139,6 +171,52 @@ async def analyze_stream(
         }
     )
 
+@router.post(
+    "/analyze/{id_ringkasan}/jobs",
+    response_model=AnalyzeJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["projects"]
+)
+def create_analyze_job_route(
+    id_ringkasan: str,
+    regenerate: bool = Query(False, description="Paksa generate ulang tanpa memakai cache response AI"),
+    mode: Optional[str] = Query(
+        None,
+        description="pipeline (tiga panggilan berantai) atau combined (satu panggilan); default dari setting analyze_mode"
+    ),
+    db: Session = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Jalankan analyze sebagai job background dan langsung return id job
+    
+    Pantau hasilnya lewat GET /api/v1/jobs/{job_id} atau GET /api/v1/jobs/{job_id}/stream.
+    
+    Menggunakan path parameter: POST /api/v1/analyze/{id_ringkasan}/jobs
+    """
+    return create_analyze_job(db, id_ringkasan, current_user.id, use_cache=not regenerate, mode=mode)
+
+@router.post(
+    "/analyze/{id_ringkasan}/{section}",
+    response_model=AnalyzeResponse,
+    status_code=status.HTTP_200_OK,
+    tags=["projects"]
+)
+async def regenerate_section(
+    id_ringkasan: str,
+    section: str,
+    cascade: bool = Query(False, description="Ikut generate ulang section yang bergantung pada section ini"),
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user_async)
+):
+    """
+    Generate ulang satu section (informasi_teknis, analisis_financial, atau roadmap)
+    memakai hasil section upstream yang sudah tersimpan
+    
+    Menggunakan path parameter: POST /api/v1/analyze/{id_ringkasan}/{section}
+    """
+    return await regenerate_analyze_section(db, id_ringkasan, section, current_user.id, cascade=cascade)
+
 @router.get(
     "/analyze/{id_ringkasan}",
     response_model=AnalyzeResponse,
@@ -166,8 +244,8 @@ def get_analyze(
 async def patch_roadmap_step(
     id_ringkasan: str,
     step_request: RoadmapStepRequest,
-    db: Session = Depends(get_session),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_session),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     Update roadmap dengan menambahkan sub-step untuk step tertentu berdasarkan request user
@@ -0,0 +1,21 @@
+from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+
+class AnalyzeJobData(BaseModel):
+    """Schema untuk data job analyze"""
+    id: str
+    ringkasan_id: str
+    status: str = Field(..., description="queued, running, succeeded, atau failed")
+    mode: str
+    attempts: int
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = Field(None, description="Hasil analyze jika job succeeded")
+    error: Optional[str] = Field(None, description="Pesan error jika job failed")
+
+class AnalyzeJobResponse(BaseModel):
+    """Schema untuk response endpoint job analyze"""
+    success: bool
+    message: str
+    data: AnalyzeJobData
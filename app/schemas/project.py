@@ -151,6 +151,7 @@ class AnalyzeResponse(BaseModel):
     success: bool
     message: str
     data: Dict[str, Any]
+    token_usage: Optional[Dict[str, Any]] = Field(None, description="Jumlah token Gemini (prompt & output) per section untuk request ini")
 
 class RoadmapStepRequest(BaseModel):
     """Schema untuk request update roadmap step"""
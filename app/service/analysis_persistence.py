@@ -0,0 +1,90 @@
+import logging
+import uuid
+from typing import Any, Callable, Dict
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session
+from app.models.analisis_financial import AnalisisFinancial
+from app.models.informasi_teknis import InformasiTeknis
+from app.models.roadmap import Roadmap
+
+logger = logging.getLogger(__name__)
+
+# Kolom database (snake_case) -> field hasil generate (camelCase)
+INFORMASI_TEKNIS_COLUMNS = {
+    "spesifikasi_kolam": "spesifikasiKolam",
+    "kualitas_air": "kualitasAir",
+    "spesifikasi_benih": "spesifikasiBenih",
+    "spesifikasi_pakan": "spesifikasiPakan",
+    "manajemen_kesehatan": "manajemenKesehatan",
+    "teknologi_pendukung": "teknologiPendukung"
+}
+
+ANALISIS_FINANCIAL_COLUMNS = {
+    "rincian_modal_awal": "rincianModalAwal",
+    "biaya_operasional": "biayaOperasional",
+    "analisis_roi": "analisisROI",
+    "analisis_bep": "analisisBEP",
+    "proyeksi_pendapatan": "proyeksiPendapatan"
+}
+
+_INSERTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert
+}
+
+def _upsert_by_project(db: Session, model, project_id: str, columns: Dict[str, str], result: Dict[str, Any]):
+    """INSERT ... ON CONFLICT (project_id) DO UPDATE: satu round trip, ada atau belum ada barisnya"""
+    values = {column: result.get(field) for column, field in columns.items()}
+    insert = _INSERTS[db.get_bind().dialect.name]
+    statement = insert(model).values(id=str(uuid.uuid4()), project_id=project_id, **values)
+    statement = statement.on_conflict_do_update(
+        index_elements=["project_id"],
+        set_={column: statement.excluded[column] for column in values}
+    )
+    db.execute(statement)
+
+def upsert_informasi_teknis(db: Session, project_id: str, informasi_teknis_result: Dict[str, Any]):
+    """Simpan informasi teknis project (update jika sudah ada), belum di-commit"""
+    _upsert_by_project(db, InformasiTeknis, project_id, INFORMASI_TEKNIS_COLUMNS, informasi_teknis_result)
+
+def upsert_analisis_financial(db: Session, project_id: str, analisis_financial_result: Dict[str, Any]):
+    """Simpan analisis financial project (update jika sudah ada), belum di-commit"""
+    _upsert_by_project(db, AnalisisFinancial, project_id, ANALISIS_FINANCIAL_COLUMNS, analisis_financial_result)
+
+def replace_roadmap(db: Session, project_id: str, roadmap_result: Dict[str, Any]):
+    """Ganti semua baris roadmap project dengan hasil generate baru (satu DELETE + satu INSERT), belum di-commit"""
+    # Pastikan step adalah float
+    roadmap_step = roadmap_result.get("step", 1.0)
+    if not isinstance(roadmap_step, (int, float)):
+        roadmap_step = 1.0
+    else:
+        roadmap_step = float(roadmap_step)
+    
+    # Sub-step (roadmap_id ke baris lain) ikut terhapus dalam statement yang sama
+    db.execute(delete(Roadmap).where(Roadmap.project_id == project_id))
+    db.add(Roadmap(
+        project_id=project_id,
+        response=roadmap_result.get("response"),
+        request=roadmap_result.get("request"),
+        step=roadmap_step,
+        is_request=roadmap_result.get("isRequest", False),
+        roadmap_id=roadmap_result.get("roadmapId")
+    ))
+
+SECTION_WRITERS: Dict[str, Callable[[Session, str, Dict[str, Any]], None]] = {
+    "informasi_teknis": upsert_informasi_teknis,
+    "analisis_financial": upsert_analisis_financial,
+    "roadmap": replace_roadmap
+}
+
+def save_analysis_sections(db: Session, project_id: str, sections: Dict[str, Dict[str, Any]]):
+    """
+    Tulis section analyze yang ada di `sections` dalam transaksi yang sedang berjalan (belum di-commit).
+    Jumlah round trip tetap per section, tidak bergantung pada riwayat data project.
+    """
+    for section, result in sections.items():
+        SECTION_WRITERS[section](db, project_id, result)
+    db.flush()
+    logger.info(f"✅ Section {', '.join(sections)} disimpan untuk project: {project_id}")
@@ -0,0 +1,63 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Any
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+class GenerativeBackend(ABC):
+    """Seam antara GeminiClient dan penyedia model
+
+    Model yang dikembalikan `create_model` cukup meniru `genai.GenerativeModel`:
+    `generate_content(prompt, generation_config=None, stream=False)` dan
+    `generate_content_async(prompt, generation_config=None)`, dengan response yang
+    punya `text`, `usage_metadata`, `prompt_feedback` dan `candidates`.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def probe_model(self, model_name: str):
+        """Raise jika model tidak tersedia di backend ini"""
+
+    @abstractmethod
+    def create_model(self, model_name: str) -> Any:
+        """Buat objek model untuk `model_name`"""
+
+
+class GeminiBackend(GenerativeBackend):
+    """Backend produksi: Google Gemini lewat google-generativeai"""
+
+    name = "gemini"
+
+    def __init__(self, api_key: str):
+        import google.generativeai as genai
+        self._genai = genai
+        genai.configure(api_key=api_key)
+
+    def probe_model(self, model_name: str):
+        self._genai.get_model(f"models/{model_name}")
+
+    def create_model(self, model_name: str) -> Any:
+        return self._genai.GenerativeModel(model_name)
+
+
+def create_backend(settings: Settings) -> GenerativeBackend:
+    """Pilih backend sesuai `settings.gemini_backend` ("gemini" atau "local")"""
+    if settings.gemini_backend == "local":
+        from app.service.generative.local_backend import LocalBackend
+        logger.warning("⚠️ Menggunakan backend model lokal (simulasi), bukan Gemini")
+        return LocalBackend(
+            latency_median_ms=settings.local_backend_latency_median_ms,
+            latency_p99_ms=settings.local_backend_latency_p99_ms,
+            model_latency_scale=settings.local_backend_model_latency_scale,
+            stream_chunk_chars=settings.local_backend_stream_chunk_chars,
+            stream_interval_ms=settings.local_backend_stream_interval_ms,
+            error_rate=settings.local_backend_error_rate,
+            rate_limit_rate=settings.local_backend_rate_limit_rate,
+            safety_block_rate=settings.local_backend_safety_block_rate,
+            seed=settings.local_backend_seed
+        )
+    if settings.gemini_backend != "gemini":
+        raise ValueError(f"Backend generative tidak dikenal: {settings.gemini_backend}")
+    return GeminiBackend(settings.apikey_gemini)
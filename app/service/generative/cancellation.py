@@ -0,0 +1,222 @@
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterable, AsyncIterator, Callable, Iterable, List, Optional, Set, Union
+from app.config import get_settings
+from app.service.generative.errors import GenerationCancelledError
+from app.service.generative.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class CancellationToken:
+    """Sinyal pembatalan kooperatif untuk satu run generate, aman dipakai lintas thread
+
+    GeminiClient mengecek token sebelum setiap attempt dan di antara chunk streaming.
+    Section yang didaftarkan lewat plan/begin/end dipakai untuk menghitung panggilan
+    yang dihemat (belum dimulai saat client putus) dan yang terbuang (sedang berjalan).
+    Panggilan yang sedang berjalan ikut dihentikan lewat pembatalan task, kecuali masih
+    ditunggu run lain (lihat SingleFlight).
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._pending: List[str] = []
+        self._in_flight: Set[str] = set()
+        self.detached = False
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def plan(self, sections: List[str]):
+        with self._lock:
+            self._pending = list(sections)
+
+    def begin(self, section: str):
+        self.raise_if_cancelled()
+        with self._lock:
+            if section in self._pending:
+                self._pending.remove(section)
+            self._in_flight.add(section)
+
+    def end(self, section: str):
+        with self._lock:
+            self._in_flight.discard(section)
+
+    def cancel(self):
+        """Batalkan run: section yang belum dimulai dihitung dihemat, yang sedang berjalan terbuang"""
+        with self._lock:
+            if self._event.is_set() or self.detached:
+                return
+            self._event.set()
+            saved, wasted = list(self._pending), list(self._in_flight)
+            self._pending = []
+
+        for section in saved:
+            metrics.incr("calls_saved", section)
+        for section in wasted:
+            metrics.incr("calls_wasted", section)
+        logger.info(f"⚠️ Generate dibatalkan: {len(saved)} section dihemat, {len(wasted)} section terbuang")
+
+    def detach(self):
+        """Lanjutkan run tanpa client; sisa section tetap diselesaikan dan disimpan"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.detached = True
+            remaining = self._pending + sorted(self._in_flight)
+
+        for section in remaining:
+            metrics.incr("calls_finished_in_background", section)
+        logger.info(f"♻️ Client terputus, {len(remaining)} section diselesaikan di background")
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise GenerationCancelledError("Generate dihentikan karena client sudah terputus")
+
+
+_current_cancellation: ContextVar[Optional[CancellationToken]] = ContextVar("generation_cancellation", default=None)
+
+def current_cancellation() -> Optional[CancellationToken]:
+    return _current_cancellation.get()
+
+
+def check_cancelled():
+    """Raise GenerationCancelledError jika run yang sedang berjalan sudah dibatalkan"""
+    token = _current_cancellation.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+def plan_sections(sections: List[str]):
+    """Daftarkan section yang akan di-generate oleh run yang sedang berjalan"""
+    token = _current_cancellation.get()
+    if token is not None:
+        token.plan(sections)
+
+
+@contextmanager
+def uncancellable():
+    """Jalankan blok tanpa token run yang sedang aktif, untuk pekerjaan yang dipakai bersama beberapa run
+
+    Pembatalan satu run tidak boleh menghentikan panggilan yang masih ditunggu run lain;
+    pemilik pekerjaan bersama (SingleFlight) yang memutuskan kapan pekerjaan itu dihentikan.
+    """
+    reset = _current_cancellation.set(None)
+    try:
+        yield
+    finally:
+        _current_cancellation.reset(reset)
+
+
+@contextmanager
+def cancellable_section(section: str):
+    """Tandai section sedang berjalan; raise GenerationCancelledError jika run sudah dibatalkan"""
+    token = _current_cancellation.get()
+    if token is None:
+        yield
+        return
+    token.begin(section)
+    try:
+        yield
+    finally:
+        token.end(section)
+
+
+async def iterate_cancellable(
+    token: CancellationToken,
+    events: Union[Iterable[str], AsyncIterable[str]],
+    on_event: Callable[[str], None]
+):
+    """Iterasi generator event controller (sync atau async) dengan token pembatalan aktif
+
+    Harus dijalankan di task tersendiri karena token dipasang di context task tersebut.
+    Berhenti diam-diam jika run dibatalkan.
+    """
+    _current_cancellation.set(token)
+    try:
+        if hasattr(events, "__aiter__"):
+            async for event in events:
+                on_event(event)
+        else:
+            done = object()
+            iterator = iter(events)
+            while True:
+                # Generator sync dijalankan di thread; context (termasuk token) ikut tersalin
+                event = await asyncio.to_thread(next, iterator, done)
+                if event is done:
+                    break
+                on_event(event)
+    except GenerationCancelledError:
+        pass
+
+
+# Referensi task background supaya tidak di-garbage-collect sebelum selesai
+_background_runs: Set[asyncio.Task] = set()
+
+async def stream_until_disconnect(
+    request,
+    events: Union[Iterable[str], AsyncIterable[str]],
+    name: str,
+    finish_in_background: Optional[bool] = None
+) -> AsyncIterator[str]:
+    """Teruskan event SSE dari generator controller sambil memantau koneksi client
+
+    Generator controller dijalankan di task terpisah yang membawa CancellationToken.
+    Putusnya client terdeteksi lewat polling request.is_disconnected(), pembatalan task
+    response oleh server, atau gagal kirim. Saat itu sisa section dibatalkan, atau jika
+    `finish_in_background` aktif, run dibiarkan selesai tanpa client supaya hasilnya tetap
+    tersimpan. Error dari generator controller dicatat lalu di-raise ulang ke consumer.
+    """
+    settings = get_settings()
+    if finish_in_background is None:
+        finish_in_background = settings.sse_finish_in_background
+
+    token = CancellationToken()
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    def forward(event: str):
+        if not token.detached:
+            queue.put_nowait(event)
+
+    async def produce():
+        try:
+            await iterate_cancellable(token, events, forward)
+        except Exception as e:
+            # Diteruskan ke consumer supaya response SSE gagal dengan error, bukan berhenti diam-diam
+            logger.error(f"❌ Stream {name} gagal: {e}")
+            queue.put_nowait(e)
+        finally:
+            queue.put_nowait(done)
+
+    producer = asyncio.create_task(produce())
+    finished = False
+    try:
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout=settings.sse_disconnect_poll_seconds)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                continue
+            if event is done:
+                finished = True
+                break
+            if isinstance(event, Exception):
+                finished = True
+                raise event
+            yield event
+    finally:
+        if not finished and not producer.done():
+            metrics.incr("sse_disconnects", name)
+            if finish_in_background:
+                token.detach()
+                _background_runs.add(producer)
+                producer.add_done_callback(_background_runs.discard)
+            else:
+                token.cancel()
+                producer.cancel()
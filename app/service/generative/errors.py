@@ -0,0 +1,26 @@
+class GeminiError(Exception):
+    """Base error layer generative yang diteruskan apa adanya sampai ke controller"""
+
+
+class GeminiUnavailableError(GeminiError):
+    """Gemini sementara tidak bisa melayani; client sebaiknya mencoba lagi nanti (HTTP 503)"""
+
+
+class GeminiOverloadedError(GeminiUnavailableError):
+    """Antrean admission ke Gemini penuh atau waktu tunggu habis; client sebaiknya mencoba lagi nanti"""
+
+
+class GeminiCircuitOpenError(GeminiUnavailableError):
+    """Semua model kandidat sedang dalam kondisi circuit open"""
+
+
+class GeminiDeadlineExceededError(GeminiUnavailableError):
+    """Retry dihentikan karena deadline request sudah habis"""
+
+
+class GeminiSafetyBlockedError(GeminiError):
+    """Prompt atau response diblokir safety filter Gemini; retry tidak akan membantu (HTTP 422)"""
+
+
+class GenerationCancelledError(GeminiError):
+    """Generate dihentikan karena client SSE yang menunggu hasilnya sudah terputus"""
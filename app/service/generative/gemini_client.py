@@ -0,0 +1,634 @@
+import asyncio
+import logging
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, TypeVar
+from app.config import get_settings
+from app.service.generative.backends import GenerativeBackend, create_backend
+from app.service.generative.cancellation import check_cancelled
+from app.service.generative.errors import (
+    GeminiCircuitOpenError,
+    GeminiDeadlineExceededError,
+    GeminiSafetyBlockedError,
+    GeminiUnavailableError,
+    GenerationCancelledError
+)
+from app.service.generative.hedging import HedgePolicy
+from app.service.generative.metrics import metrics
+from app.service.generative.model_router import ModelRouter
+from app.service.generative.rate_limiter import AdaptiveLimiter
+from app.service.generative.resilience import SAFETY, TERMINAL, CircuitBreaker, RetryPolicy, classify_error, ensure_not_blocked
+from app.service.generative.response_cache import ResponseCache, get_response_cache, make_cache_key
+from app.service.generative.single_flight import SingleFlight
+from app.service.generative.streaming_json import IncrementalJsonParser, JsonEvent
+from app.service.generative.token_usage import record_token_usage, usage_from_response
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class GenerationResult:
+    """Hasil generate yang sudah berupa text, kompatibel dengan ResponseParser.extract_response_text"""
+
+    def __init__(self, text: str, model_name: str, from_cache: bool = False, usage: Optional[Dict[str, int]] = None):
+        self.text = text
+        self.model_name = model_name
+        self.from_cache = from_cache
+        self.usage = usage or {"prompt_tokens": 0, "output_tokens": 0, "cached_tokens": 0}
+
+
+def _chunk_text(chunk) -> str:
+    """Ambil text dari chunk/response Gemini dengan berbagai format"""
+    try:
+        if hasattr(chunk, 'text') and chunk.text:
+            return chunk.text
+    except ValueError:
+        pass
+    if hasattr(chunk, 'parts') and chunk.parts:
+        return "".join(part.text for part in chunk.parts if hasattr(part, 'text') and part.text)
+    if isinstance(chunk, str):
+        return chunk
+    return ""
+
+
+class GeminiClient:
+    """Registry client Gemini yang dipakai bersama oleh semua analyzer dalam satu proses
+
+    Backend model (Gemini atau stand-in lokal) dibuat sekali, daftar fallback model di-probe
+    sekali, dan handle model disimpan per nama model untuk dipakai ulang.
+    Panggilan identik yang sedang in-flight di-coalesce lewat SingleFlight, semua
+    panggilan ke Gemini melewati satu AdaptiveLimiter per API key, model untuk
+    tiap section dipilih oleh ModelRouter, dan kegagalan ditangani RetryPolicy serta
+    CircuitBreaker per model.
+    """
+
+    def __init__(
+        self,
+        backend: GenerativeBackend,
+        model_names: List[str],
+        limiter: AdaptiveLimiter,
+        router: ModelRouter,
+        response_cache: Optional[ResponseCache] = None,
+        single_flight: Optional[SingleFlight] = None,
+        hedge_policy: Optional[HedgePolicy] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_failure_threshold: int = 5,
+        circuit_reset_seconds: float = 30.0
+    ):
+        self.backend = backend
+        self.model_names = list(model_names)
+        self.limiter = limiter
+        self.router = router
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=1, base_delay=0, max_delay=0, deadline_seconds=0)
+        self.circuit_failure_threshold = circuit_failure_threshold
+        self.circuit_reset_seconds = circuit_reset_seconds
+        self.response_cache = response_cache
+        self.single_flight = single_flight
+        self.hedge_policy = hedge_policy
+        self._available_models: Optional[List[str]] = None
+        self._models: Dict[str, Any] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def resolve_models(self) -> List[str]:
+        """Probe daftar fallback model sekali dan simpan model yang tersedia"""
+        if self._available_models is not None:
+            return self._available_models
+
+        with self._lock:
+            if self._available_models is not None:
+                return self._available_models
+
+            available_models = []
+            for model_name in self.model_names:
+                try:
+                    self.backend.probe_model(model_name)
+                    available_models.append(model_name)
+                    logger.info(f"✅ Model tersedia: {model_name}")
+                except Exception as e:
+                    logger.warning(f"Model {model_name} tidak tersedia: {e}")
+
+            if not available_models:
+                # Tidak di-cache supaya probe diulang pada request berikutnya
+                raise Exception("Tidak ada model Gemini yang tersedia. Pastikan API key valid dan model tersedia.")
+
+            self._available_models = available_models
+            logger.info(f"✅ Menggunakan model: {available_models[0]}")
+
+        return self._available_models
+
+    def get_model(self, model_name: Optional[str] = None) -> Tuple[Any, str]:
+        """Mendapatkan handle model yang bisa dipakai ulang, default ke model pertama yang tersedia"""
+        if model_name is None:
+            model_name = self.resolve_models()[0]
+
+        model = self._models.get(model_name)
+        if model is None:
+            with self._lock:
+                model = self._models.get(model_name)
+                if model is None:
+                    model = self.backend.create_model(model_name)
+                    self._models[model_name] = model
+
+        return model, model_name
+
+    def _route(self, section: str) -> str:
+        """Pilih model untuk section lewat ModelRouter"""
+        return self.router.choose(section, self.resolve_models())
+
+    def _breaker(self, model_name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(model_name)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.setdefault(
+                    model_name,
+                    CircuitBreaker(model_name, self.circuit_failure_threshold, self.circuit_reset_seconds)
+                )
+        return breaker
+
+    def _pick_model(self, section: str, preferred_model_name: str) -> Tuple[Any, str]:
+        """Model yang dipanggil: model pilihan, atau kandidat berikutnya jika circuit-nya terbuka"""
+        candidates = [preferred_model_name] + [
+            name for name in self.router.candidates(section, self.resolve_models()) if name != preferred_model_name
+        ]
+        for model_name in candidates:
+            if self._breaker(model_name).allow():
+                if model_name != preferred_model_name:
+                    metrics.incr("circuit_failover", section)
+                    logger.warning(f"⚠️ Circuit {preferred_model_name} terbuka, section {section} dialihkan ke {model_name}")
+                return self.get_model(model_name)
+        raise GeminiCircuitOpenError("Semua model Gemini sedang tidak sehat, silakan coba beberapa saat lagi")
+
+    def _record_call(self, section: str, model_name: str, started: float, success: bool):
+        self.router.record(section, model_name, (time.monotonic() - started) * 1000, success=success)
+
+    def _retry_delay(
+        self,
+        error: Exception,
+        section: str,
+        model_name: str,
+        started: float,
+        attempt: int,
+        deadline: float
+    ) -> Optional[float]:
+        """Tentukan nasib panggilan yang gagal berdasarkan klasifikasi error
+
+        Safety -> GeminiSafetyBlockedError, terminal -> None (error asli di-raise ulang oleh caller),
+        retryable -> jeda backoff sebelum attempt berikutnya, atau GeminiUnavailableError /
+        GeminiDeadlineExceededError jika attempt atau deadline sudah habis.
+        """
+        kind = classify_error(error)
+        metrics.incr(f"errors_{kind}", section)
+        breaker = self._breaker(model_name)
+
+        if kind == SAFETY:
+            # Model merespons normal, hanya kontennya yang diblokir
+            breaker.record_success()
+            if isinstance(error, GeminiSafetyBlockedError):
+                raise error
+            raise GeminiSafetyBlockedError(f"Request diblokir safety filter Gemini: {error}") from error
+        if kind == TERMINAL:
+            breaker.record_success()
+            return None
+
+        # Hanya error sementara yang dihitung sebagai kegagalan model
+        self._record_call(section, model_name, started, success=False)
+        breaker.record_failure()
+        if self.retry_policy.attempts_exhausted(attempt):
+            raise GeminiUnavailableError(f"Gemini gagal setelah {attempt + 1} percobaan: {error}") from error
+        delay = self.retry_policy.next_delay(attempt, deadline)
+        if delay is None:
+            raise GeminiDeadlineExceededError(f"Deadline request Gemini habis setelah {attempt + 1} percobaan: {error}") from error
+
+        metrics.incr("retries", section)
+        logger.warning(f"⚠️ Gemini {model_name} gagal ({error}), retry {attempt + 1} dalam {delay:.2f}s")
+        return delay
+
+    def _execute(
+        self,
+        section: str,
+        preferred_model_name: str,
+        invoke: Callable[[Any], T]
+    ) -> Tuple[T, str]:
+        """Panggil Gemini lewat limiter dengan retry, backoff, deadline, dan circuit breaker per model"""
+        deadline = self.retry_policy.deadline()
+        attempt = 0
+        while True:
+            check_cancelled()
+            model, model_name = self._pick_model(section, preferred_model_name)
+            started = time.monotonic()
+            try:
+                with self.limiter.slot(section):
+                    response = invoke(model)
+                ensure_not_blocked(response)
+            except GeminiUnavailableError:
+                self._breaker(model_name).release()
+                raise
+            except Exception as e:
+                delay = self._retry_delay(e, section, model_name, started, attempt, deadline)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+
+            self._record_call(section, model_name, started, success=True)
+            self._breaker(model_name).record_success()
+            return response, model_name
+
+    async def _execute_async(
+        self,
+        section: str,
+        preferred_model_name: str,
+        invoke: Callable[[Any], Awaitable[T]]
+    ) -> Tuple[T, str]:
+        """Versi async dari _execute"""
+        deadline = self.retry_policy.deadline()
+        attempt = 0
+        while True:
+            check_cancelled()
+            model, model_name = self._pick_model(section, preferred_model_name)
+            started = time.monotonic()
+            try:
+                async with self.limiter.slot_async(section):
+                    response = await invoke(model)
+                ensure_not_blocked(response)
+            except GeminiUnavailableError:
+                self._breaker(model_name).release()
+                raise
+            except asyncio.CancelledError:
+                # Semua caller sudah berhenti menunggu (client terputus): panggilan dihentikan di tengah jalan
+                self._breaker(model_name).release()
+                metrics.incr("calls_aborted", section)
+                raise
+            except Exception as e:
+                delay = self._retry_delay(e, section, model_name, started, attempt, deadline)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+
+            self._record_call(section, model_name, started, success=True)
+            self._breaker(model_name).record_success()
+            return response, model_name
+
+    def _cache_for(self, use_cache: bool) -> Optional[ResponseCache]:
+        return self.response_cache if use_cache else None
+
+    @staticmethod
+    def _cacheable(result: GenerationResult, section: str, validate: Optional[Callable[[GenerationResult], Any]]) -> bool:
+        """Response boleh masuk cache hanya jika tidak kosong dan lolos `validate` (jika ada)
+
+        Response terpotong atau JSON rusak yang ikut di-cache akan terus gagal di-parse
+        untuk setiap request identik sampai TTL cache habis.
+        """
+        if not result.text:
+            return False
+        if validate is None:
+            return True
+        try:
+            validate(result)
+        except Exception as e:
+            metrics.incr("cache_rejected_invalid", section)
+            logger.warning(f"⚠️ Response {section} tidak lolos validasi, tidak disimpan ke cache: {e}")
+            return False
+        return True
+
+    def _cache_store(self, cache: ResponseCache, prompt: str, section: str, generation_config: Optional[Dict[str, Any]], result: GenerationResult):
+        """Simpan response dengan key model yang benar-benar melayani, bukan model hasil routing"""
+        cache.set(make_cache_key(result.model_name, prompt, generation_config), section, result.model_name, result.text)
+
+    def generate_content(
+        self,
+        prompt: str,
+        section: str = "default",
+        generation_config: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True,
+        validate: Optional[Callable[[GenerationResult], Any]] = None
+    ) -> GenerationResult:
+        """Generate content menggunakan model hasil routing section, lewat cache response jika aktif
+
+        `validate` (biasanya parser analyzer) mencegah response yang tidak bisa di-parse masuk ke cache.
+        """
+        model_name = self._route(section)
+        cache = self._cache_for(use_cache)
+        cache_key = make_cache_key(model_name, prompt, generation_config)
+
+        if cache is not None:
+            cached_text = cache.get(cache_key, section)
+            if cached_text is not None:
+                return GenerationResult(cached_text, model_name, from_cache=True)
+
+        def call() -> GenerationResult:
+            metrics.incr("gemini_calls", section)
+            response, served_model_name = self._execute(
+                section,
+                model_name,
+                lambda model: model.generate_content(prompt, generation_config=generation_config)
+            )
+            usage = usage_from_response(response)
+            record_token_usage(section, **usage)
+            result = GenerationResult(_chunk_text(response), served_model_name, usage=usage)
+
+            if cache is not None and self._cacheable(result, section, validate):
+                self._cache_store(cache, prompt, section, generation_config, result)
+            return result
+
+        if self.single_flight is None:
+            return call()
+        return self.single_flight.do(cache_key, call, section=section)
+
+    def generate_content_stream(
+        self,
+        prompt: str,
+        section: str = "default",
+        generation_config: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True,
+        validate: Optional[Callable[[GenerationResult], Any]] = None
+    ) -> Iterator[GenerationResult]:
+        """Generate content dengan streaming; setiap chunk berupa GenerationResult berisi model yang melayani
+
+        Cache hit dikirim sebagai satu chunk utuh. Retry hanya dilakukan jika kegagalan
+        terjadi sebelum chunk pertama dikirim. Response lengkap baru masuk cache jika lolos `validate`.
+        """
+        model_name = self._route(section)
+        cache = self._cache_for(use_cache)
+        cache_key = make_cache_key(model_name, prompt, generation_config)
+
+        if cache is not None:
+            cached_text = cache.get(cache_key, section)
+            if cached_text is not None:
+                yield GenerationResult(cached_text, model_name, from_cache=True)
+                return
+
+        def call() -> Iterator[GenerationResult]:
+            metrics.incr("gemini_calls", section)
+            deadline = self.retry_policy.deadline()
+            attempt = 0
+            while True:
+                check_cancelled()
+                model, served_model_name = self._pick_model(section, model_name)
+                text_parts = []
+                usage = usage_from_response(None)
+                started = time.monotonic()
+                try:
+                    # Slot limiter dipegang selama streaming berlangsung
+                    with self.limiter.slot(section):
+                        for chunk in model.generate_content(prompt, generation_config=generation_config, stream=True):
+                            # Berhenti menarik chunk jika client yang menunggu sudah terputus
+                            check_cancelled()
+                            ensure_not_blocked(chunk)
+                            chunk_text = _chunk_text(chunk)
+                            text_parts.append(chunk_text)
+                            # usage_metadata chunk terakhir berisi total token streaming
+                            chunk_usage = usage_from_response(chunk)
+                            if chunk_usage["prompt_tokens"] or chunk_usage["output_tokens"]:
+                                usage = chunk_usage
+                            yield GenerationResult(chunk_text, served_model_name)
+                except (GeminiUnavailableError, GenerationCancelledError, GeneratorExit):
+                    self._breaker(served_model_name).release()
+                    raise
+                except Exception as e:
+                    if text_parts:
+                        # Sebagian chunk sudah dikirim ke caller, streaming tidak bisa diulang
+                        self._record_call(section, served_model_name, started, success=False)
+                        self._breaker(served_model_name).record_failure()
+                        raise
+                    delay = self._retry_delay(e, section, served_model_name, started, attempt, deadline)
+                    if delay is None:
+                        raise
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+                break
+
+            self._record_call(section, served_model_name, started, success=True)
+            self._breaker(served_model_name).record_success()
+            record_token_usage(section, **usage)
+
+            result = GenerationResult("".join(text_parts), served_model_name, usage=usage)
+            if cache is not None and self._cacheable(result, section, validate):
+                self._cache_store(cache, prompt, section, generation_config, result)
+
+        if self.single_flight is None:
+            yield from call()
+            return
+        yield from self.single_flight.stream(cache_key, call, section=section)
+
+    async def generate_content_fields_async(
+        self,
+        prompt: str,
+        on_event: Callable[[JsonEvent], None],
+        section: str = "default",
+        generation_config: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True,
+        item_paths: Iterable[Sequence[Any]] = (),
+        validate: Optional[Callable[[GenerationResult], Any]] = None
+    ) -> GenerationResult:
+        """Streaming JSON yang di-parse bertahap; return hasil lengkap seperti generate_content
+
+        `on_event` dipanggil (dari thread streaming) untuk setiap field top-level dan item
+        array pada `item_paths` begitu nilainya tertutup, sehingga caller bisa memakai data
+        sebelum generate selesai. Jika coroutine dibatalkan, stream dihentikan di chunk berikutnya.
+        `validate` diteruskan ke generate_content_stream untuk menyaring response yang di-cache.
+        """
+        stop = threading.Event()
+
+        def consume() -> GenerationResult:
+            parser = IncrementalJsonParser(item_paths)
+            model_name, from_cache = None, False
+            stream = self.generate_content_stream(
+                prompt, section=section, generation_config=generation_config, use_cache=use_cache, validate=validate
+            )
+            try:
+                for chunk in stream:
+                    if stop.is_set():
+                        break
+                    model_name = chunk.model_name
+                    from_cache = chunk.from_cache
+                    for event in parser.feed(chunk.text):
+                        on_event(event)
+            finally:
+                stream.close()
+            return GenerationResult(parser.text, model_name or "unknown", from_cache=from_cache)
+
+        try:
+            return await asyncio.to_thread(consume)
+        except asyncio.CancelledError:
+            stop.set()
+            raise
+
+    async def _route_async(self, section: str) -> str:
+        """Seperti _route, tapi probe model pertama kali tidak memblokir event loop"""
+        if self._available_models is None:
+            await asyncio.to_thread(self.resolve_models)
+        return self._route(section)
+
+    async def _generate_once_async(
+        self,
+        model_name: str,
+        prompt: str,
+        section: str,
+        generation_config: Optional[Dict[str, Any]]
+    ) -> GenerationResult:
+        metrics.incr("gemini_calls", section)
+        response, served_model_name = await self._execute_async(
+            section,
+            model_name,
+            lambda model: model.generate_content_async(prompt, generation_config=generation_config)
+        )
+        usage = usage_from_response(response)
+        record_token_usage(section, **usage)
+        return GenerationResult(_chunk_text(response), served_model_name, usage=usage)
+
+    def _hedge_model(self, section: str, primary_model_name: str) -> str:
+        """Model untuk hedge: kandidat routing berikutnya jika diizinkan, selain itu model yang sama"""
+        if self.hedge_policy.use_alternate_model:
+            for candidate in self.router.candidates(section, self.resolve_models()):
+                if candidate != primary_model_name:
+                    return candidate
+        return primary_model_name
+
+    async def _generate_hedged_async(
+        self,
+        model_name: str,
+        prompt: str,
+        section: str,
+        generation_config: Optional[Dict[str, Any]],
+        validate: Optional[Callable[[GenerationResult], Any]]
+    ) -> Tuple[GenerationResult, bool]:
+        """Generate dengan hedging opsional; return (hasil, lolos validasi)
+
+        Hasil valid pertama yang dipakai dan request lainnya dibatalkan. Jika tidak ada
+        hasil yang lolos validasi, hasil terakhir dikembalikan supaya analyzer
+        melaporkan error parsing seperti biasa.
+        """
+        delay = self.hedge_policy.delay_for(section) if self.hedge_policy is not None else None
+        primary = asyncio.ensure_future(
+            self._generate_once_async(model_name, prompt, section, generation_config)
+        )
+        hedge = None
+        pending = {primary}
+        fallback: Optional[GenerationResult] = None
+        last_error: Optional[BaseException] = None
+
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(pending, timeout=delay)
+                if not done and self.hedge_policy.try_acquire(section):
+                    hedge_model_name = self._hedge_model(section, model_name)
+                    logger.info(f"⚠️ Section {section} melewati p90 ({delay:.1f}s), hedge ke {hedge_model_name}")
+                    hedge = asyncio.ensure_future(
+                        self._generate_once_async(hedge_model_name, prompt, section, generation_config)
+                    )
+                    pending.add(hedge)
+
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        last_error = e
+                        continue
+
+                    if validate is not None:
+                        try:
+                            validate(result)
+                        except Exception:
+                            fallback = result
+                            continue
+
+                    if hedge is not None:
+                        metrics.incr("hedge_won" if task is hedge else "hedge_lost", section)
+                    return result, True
+
+            if fallback is not None:
+                return fallback, False
+            raise last_error
+        finally:
+            for task in (primary, hedge):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def generate_content_async(
+        self,
+        prompt: str,
+        section: str = "default",
+        generation_config: Optional[Dict[str, Any]] = None,
+        use_cache: bool = True,
+        validate: Optional[Callable[[GenerationResult], Any]] = None
+    ) -> GenerationResult:
+        """Generate content menggunakan async API Gemini, dibatasi AdaptiveLimiter
+
+        `validate` (biasanya parser analyzer) dipakai untuk memilih hasil hedge yang valid
+        dan mencegah response yang tidak bisa di-parse masuk ke cache.
+        """
+        model_name = await self._route_async(section)
+        cache = self._cache_for(use_cache)
+        cache_key = make_cache_key(model_name, prompt, generation_config)
+
+        if cache is not None:
+            cached_text = await asyncio.to_thread(cache.get, cache_key, section)
+            if cached_text is not None:
+                return GenerationResult(cached_text, model_name, from_cache=True)
+
+        async def call() -> GenerationResult:
+            result, valid = await self._generate_hedged_async(
+                model_name, prompt, section, generation_config, validate
+            )
+
+            if cache is not None and valid and result.text:
+                await asyncio.to_thread(self._cache_store, cache, prompt, section, generation_config, result)
+            return result
+
+        if self.single_flight is None:
+            return await call()
+        return await self.single_flight.do_async(cache_key, call, section=section)
+
+    @property
+    def model_name(self) -> str:
+        """Mendapatkan nama model yang digunakan"""
+        return self.resolve_models()[0]
+
+
+@lru_cache()
+def get_gemini_client() -> GeminiClient:
+    """Instance GeminiClient tunggal untuk seluruh proses"""
+    settings = get_settings()
+    return GeminiClient(
+        backend=create_backend(settings),
+        model_names=settings.gemini_model_names,
+        limiter=AdaptiveLimiter(
+            initial_limit=settings.gemini_initial_concurrency,
+            min_limit=settings.gemini_min_concurrency,
+            max_limit=settings.gemini_max_concurrency,
+            max_queue=settings.gemini_admission_queue_size,
+            queue_timeout=settings.gemini_admission_timeout_seconds
+        ),
+        router=ModelRouter(
+            section_tiers=settings.gemini_section_models,
+            latency_budgets_ms=settings.gemini_section_latency_budget_ms,
+            default_latency_budget_ms=settings.gemini_default_latency_budget_ms,
+            max_error_rate=settings.gemini_router_max_error_rate,
+            min_samples=settings.gemini_router_min_samples
+        ),
+        response_cache=get_response_cache() if settings.llm_cache_enabled else None,
+        single_flight=SingleFlight() if settings.llm_single_flight_enabled else None,
+        hedge_policy=HedgePolicy(
+            sections=settings.gemini_hedge_sections,
+            budget_ratio=settings.gemini_hedge_budget_ratio,
+            min_samples=settings.gemini_hedge_min_samples,
+            use_alternate_model=settings.gemini_hedge_alternate_model
+        ) if settings.gemini_hedging_enabled else None,
+        retry_policy=RetryPolicy(
+            max_attempts=settings.gemini_retry_max_attempts,
+            base_delay=settings.gemini_retry_base_delay_seconds,
+            max_delay=settings.gemini_retry_max_delay_seconds,
+            deadline_seconds=settings.gemini_request_deadline_seconds
+        ),
+        circuit_failure_threshold=settings.gemini_circuit_failure_threshold,
+        circuit_reset_seconds=settings.gemini_circuit_reset_seconds
+    )
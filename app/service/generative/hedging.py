@@ -0,0 +1,50 @@
+import threading
+from collections import defaultdict
+from typing import Dict, List, Optional
+from app.service.generative.metrics import metrics
+
+class HedgePolicy:
+    """Kebijakan hedged request per section
+
+    Jika panggilan belum selesai setelah p90 latency section yang teramati, satu request
+    cadangan dikirim. Jumlah hedge dibatasi `budget_ratio` dari jumlah panggilan yang
+    memenuhi syarat hedging, supaya biaya tambahan tetap terkendali.
+    """
+
+    def __init__(
+        self,
+        sections: List[str],
+        budget_ratio: float,
+        min_samples: int = 20,
+        quantile: float = 0.9,
+        use_alternate_model: bool = True
+    ):
+        self.sections = set(sections)
+        self.budget_ratio = budget_ratio
+        self.min_samples = min_samples
+        self.quantile = quantile
+        self.use_alternate_model = use_alternate_model
+        self._lock = threading.Lock()
+        self._eligible_calls: Dict[str, int] = defaultdict(int)
+        self._hedges: Dict[str, int] = defaultdict(int)
+
+    def delay_for(self, section: str) -> Optional[float]:
+        """Detik menunggu sebelum hedge dikirim, None jika section tidak di-hedge"""
+        if section not in self.sections:
+            return None
+        if metrics.count("latency_ms", section) < self.min_samples:
+            return None
+
+        with self._lock:
+            self._eligible_calls[section] += 1
+        return metrics.percentile("latency_ms", self.quantile, section) / 1000
+
+    def try_acquire(self, section: str) -> bool:
+        """Ambil jatah hedge dari budget section; False jika budget sudah habis"""
+        with self._lock:
+            if self._hedges[section] + 1 > self.budget_ratio * self._eligible_calls[section]:
+                metrics.incr("hedge_skipped_budget", section)
+                return False
+            self._hedges[section] += 1
+        metrics.incr("hedge_fired", section)
+        return True
@@ -0,0 +1,205 @@
+import asyncio
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+from google.api_core import exceptions as google_exceptions
+from app.service.generative.backends import GenerativeBackend
+
+# Nilai realistis untuk field yang divalidasi lebih ketat oleh ResponseParser
+_STRING_CHOICES = {
+    "potensi_pasar": ["TINGGI", "SEDANG", "RENDAH"],
+    "roi": ["35%", "48%", "62%"],
+    "lamaSiklus": ["3 bulan", "4 bulan", "6 bulan"],
+}
+_INTEGER_RANGES = {
+    "skor_kelayakan": (40, 95),
+    "estimasi_balik_modal": (6, 36),
+}
+_ARRAY_LENGTH = 6
+_MIN_TEXT_LENGTH = 60
+
+_WORDS = (
+    "kolam air benih pakan ikan panen modal siklus kualitas oksigen suhu terpal pompa "
+    "filter vitamin pasar harga budidaya bibit pemeliharaan sortir"
+).split()
+
+
+class _UsageMetadata:
+    def __init__(self, prompt_token_count: int, candidates_token_count: int, cached_content_token_count: int = 0):
+        self.prompt_token_count = prompt_token_count
+        self.candidates_token_count = candidates_token_count
+        self.cached_content_token_count = cached_content_token_count
+
+
+class _PromptFeedback:
+    def __init__(self, block_reason: Optional[str]):
+        self.block_reason = block_reason
+
+
+class LocalResponse:
+    """Response/chunk dengan atribut yang dibaca GeminiClient dan ResponseParser"""
+
+    def __init__(self, text: str, usage_metadata: Optional[_UsageMetadata] = None, block_reason: Optional[str] = None):
+        self.text = text
+        self.parts = []
+        self.candidates = []
+        self.usage_metadata = usage_metadata
+        self.prompt_feedback = _PromptFeedback(block_reason)
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+def generate_from_schema(schema: Dict[str, Any], rng: random.Random, field_name: str = "", index: int = 0) -> Any:
+    """Bangun nilai yang valid terhadap response_schema structured output"""
+    field_type = schema.get("type")
+
+    if field_type == "OBJECT":
+        return {
+            name: generate_from_schema(property_schema, rng, name, index)
+            for name, property_schema in schema.get("properties", {}).items()
+        }
+    if field_type == "ARRAY":
+        return [generate_from_schema(schema["items"], rng, field_name, position + 1) for position in range(_ARRAY_LENGTH)]
+    if field_type == "INTEGER":
+        low, high = _INTEGER_RANGES.get(field_name, (1, 1000))
+        return rng.randint(low, high)
+    if field_type == "NUMBER":
+        # Nomor step roadmap harus berurutan
+        if field_name == "step":
+            return float(index or 1)
+        return float(rng.randint(1, 500) * 10000)
+    if field_type == "BOOLEAN":
+        return False
+    if schema.get("nullable"):
+        return None
+    if field_name in _STRING_CHOICES:
+        return rng.choice(_STRING_CHOICES[field_name])
+
+    words = [field_name or "teks", "simulasi"]
+    while len(" ".join(words)) < _MIN_TEXT_LENGTH:
+        words.append(rng.choice(_WORDS))
+    return " ".join(words)
+
+
+class LocalModel:
+    """Stand-in deterministik untuk genai.GenerativeModel
+
+    Isi response ditentukan oleh (model, prompt) sehingga prompt yang sama selalu
+    menghasilkan JSON yang sama; latency dan error diambil dari RNG backend.
+    """
+
+    def __init__(self, backend: "LocalBackend", model_name: str):
+        self.backend = backend
+        self.model_name = model_name
+
+    def _build_text(self, prompt: str, generation_config: Optional[Dict[str, Any]]) -> str:
+        digest = hashlib.sha256(f"{self.model_name}\n{prompt}".encode("utf-8")).hexdigest()
+        rng = random.Random(int(digest[:16], 16))
+        schema = (generation_config or {}).get("response_schema")
+        if schema is None:
+            return generate_from_schema({"type": "STRING"}, rng, "response")
+        return json.dumps(generate_from_schema(schema, rng), ensure_ascii=False)
+
+    def _response(self, prompt: str, text: str, block_reason: Optional[str]) -> LocalResponse:
+        usage = _UsageMetadata(_estimate_tokens(prompt), _estimate_tokens(text))
+        return LocalResponse(text, usage_metadata=usage, block_reason=block_reason)
+
+    def generate_content(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None, stream: bool = False):
+        latency, block_reason = self.backend.plan_call(self.model_name)
+        text = "" if block_reason else self._build_text(prompt, generation_config)
+        if stream:
+            return self._stream(prompt, text, latency, block_reason)
+        time.sleep(latency)
+        return self._response(prompt, text, block_reason)
+
+    async def generate_content_async(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None):
+        latency, block_reason = self.backend.plan_call(self.model_name)
+        text = "" if block_reason else self._build_text(prompt, generation_config)
+        await asyncio.sleep(latency)
+        return self._response(prompt, text, block_reason)
+
+    def _stream(self, prompt: str, text: str, latency: float, block_reason: Optional[str]) -> Iterator[LocalResponse]:
+        # Latency sampel dipakai sebagai time-to-first-chunk, chunk berikutnya mengikuti cadence
+        time.sleep(latency)
+        size = self.backend.stream_chunk_chars
+        pieces: List[str] = [text[i:i + size] for i in range(0, len(text), size)] or [""]
+        for index, piece in enumerate(pieces):
+            if index > 0:
+                time.sleep(self.backend.stream_interval)
+            if index == len(pieces) - 1:
+                yield self._response(prompt, piece, block_reason)
+            else:
+                yield LocalResponse(piece)
+
+
+class LocalBackend(GenerativeBackend):
+    """Backend lokal untuk load test dan benchmark tanpa memakai kuota Gemini
+
+    Latency mengikuti distribusi lognormal yang dibentuk dari median dan p99, bisa
+    diskalakan per model. Error injection: `rate_limit_rate` (429), `error_rate`
+    (503) dan `safety_block_rate` (prompt diblokir), masing-masing sebagai peluang
+    per panggilan.
+    """
+
+    name = "local"
+
+    def __init__(
+        self,
+        latency_median_ms: float = 800.0,
+        latency_p99_ms: float = 4000.0,
+        model_latency_scale: Optional[Dict[str, float]] = None,
+        stream_chunk_chars: int = 80,
+        stream_interval_ms: float = 50.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        safety_block_rate: float = 0.0,
+        seed: int = 0
+    ):
+        self.latency_median_ms = latency_median_ms
+        # z(0.99) = 2.326 untuk distribusi normal standar
+        self.latency_sigma = 0.0
+        if latency_median_ms > 0:
+            self.latency_sigma = math.log(max(latency_p99_ms, latency_median_ms) / latency_median_ms) / 2.326
+        self.model_latency_scale = dict(model_latency_scale or {})
+        self.stream_chunk_chars = max(1, stream_chunk_chars)
+        self.stream_interval = stream_interval_ms / 1000
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.safety_block_rate = safety_block_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def probe_model(self, model_name: str):
+        return None
+
+    def create_model(self, model_name: str) -> LocalModel:
+        return LocalModel(self, model_name)
+
+    def plan_call(self, model_name: str):
+        """Ambil latency (detik) dan hasil injeksi error untuk satu panggilan
+
+        Error langsung di-raise dengan tipe exception yang sama seperti Gemini supaya jalur
+        klasifikasi, retry dan circuit breaker ikut teruji.
+        """
+        with self._lock:
+            if self.latency_median_ms > 0:
+                latency_ms = self._rng.lognormvariate(math.log(self.latency_median_ms), self.latency_sigma)
+            else:
+                latency_ms = 0.0
+            roll = self._rng.random()
+
+        if roll < self.rate_limit_rate:
+            raise google_exceptions.ResourceExhausted("Resource has been exhausted (simulasi backend lokal)")
+        roll -= self.rate_limit_rate
+        if roll < self.error_rate:
+            raise google_exceptions.ServiceUnavailable("Service Unavailable (simulasi backend lokal)")
+        roll -= self.error_rate
+        block_reason = "SAFETY" if roll < self.safety_block_rate else None
+
+        return latency_ms * self.model_latency_scale.get(model_name, 1.0) / 1000, block_reason
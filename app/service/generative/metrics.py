@@ -0,0 +1,85 @@
+import threading
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional
+
+# Jumlah sampel terakhir per (nama, section) yang disimpan untuk hitung percentile
+OBSERVATION_WINDOW = 1000
+
+def _percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    idx = min(len(sorted_values) - 1, max(0, int(round(q * (len(sorted_values) - 1)))))
+    return sorted_values[idx]
+
+
+class GenerativeMetrics:
+    """Counter, gauge dan observasi (latency dsb) in-process untuk layer generative, dikelompokkan per section"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._gauges: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._observations: Dict[str, Dict[str, Deque[float]]] = defaultdict(
+            lambda: defaultdict(lambda: deque(maxlen=OBSERVATION_WINDOW))
+        )
+
+    def incr(self, name: str, section: str = "all", amount: int = 1):
+        """Menambah counter `name` untuk section tertentu"""
+        with self._lock:
+            self._counters[name][section] += amount
+
+    def get(self, name: str, section: str = "all") -> int:
+        """Membaca nilai counter saat ini"""
+        with self._lock:
+            return self._counters[name][section] if name in self._counters else 0
+
+    def set_gauge(self, name: str, value: float, section: str = "all"):
+        """Mencatat nilai terkini (mis. limit concurrency, panjang antrean)"""
+        with self._lock:
+            self._gauges[name][section] = value
+
+    def observe(self, name: str, value: float, section: str = "all"):
+        """Mencatat satu sampel observasi, disimpan dalam window berukuran tetap"""
+        with self._lock:
+            self._observations[name][section].append(value)
+
+    def percentile(self, name: str, q: float, section: str = "all") -> Optional[float]:
+        """Percentile q (0-1) dari sampel terakhir, None jika belum ada sampel"""
+        with self._lock:
+            if name not in self._observations or section not in self._observations[name]:
+                return None
+            values = sorted(self._observations[name][section])
+        return _percentile(values, q) if values else None
+
+    def count(self, name: str, section: str = "all") -> int:
+        """Jumlah sampel observasi yang tersimpan di window"""
+        with self._lock:
+            if name not in self._observations or section not in self._observations[name]:
+                return 0
+            return len(self._observations[name][section])
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Salinan semua counter, gauge dan ringkasan observasi untuk endpoint metrics"""
+        with self._lock:
+            data: Dict[str, Any] = {name: dict(values) for name, values in self._counters.items()}
+            for name, values in self._gauges.items():
+                data[name] = dict(values)
+            for name, sections in self._observations.items():
+                summary = {}
+                for section, samples in sections.items():
+                    values = sorted(samples)
+                    if not values:
+                        continue
+                    summary[section] = {
+                        "count": len(values),
+                        "avg": round(sum(values) / len(values), 2),
+                        "p50": round(_percentile(values, 0.5), 2),
+                        "p90": round(_percentile(values, 0.9), 2),
+                        "p95": round(_percentile(values, 0.95), 2),
+                        "max": round(values[-1], 2)
+                    }
+                data[name] = summary
+            return data
+
+
+metrics = GenerativeMetrics()
@@ -0,0 +1,108 @@
+import logging
+import threading
+from collections import defaultdict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+from app.service.generative.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class _ModelStats:
+    """Window sampel latency dan hasil (sukses/gagal) terakhir untuk satu model"""
+
+    def __init__(self, window: int):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.outcomes: Deque[bool] = deque(maxlen=window)
+
+    def p95(self) -> Optional[float]:
+        if not self.latencies:
+            return None
+        values = sorted(self.latencies)
+        return values[min(len(values) - 1, int(round(0.95 * (len(values) - 1))))]
+
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+
+class ModelRouter:
+    """Routing model Gemini per section berdasarkan tier list, p95 latency dan error rate
+
+    Setiap section punya urutan tier model (mis. substep mendahulukan model flash).
+    Model pertama di tier yang masih sehat - p95 latency di bawah budget section dan
+    error rate di bawah batas - dipilih. Jika tidak ada yang sehat, model dengan skor
+    terbaik (error rate lalu p95) yang dipakai. Model dengan sampel kurang dari
+    `min_samples` dianggap sehat supaya tetap mendapat traffic.
+    """
+
+    def __init__(
+        self,
+        section_tiers: Dict[str, List[str]],
+        latency_budgets_ms: Dict[str, float],
+        default_latency_budget_ms: float,
+        max_error_rate: float,
+        min_samples: int = 5,
+        window: int = 100
+    ):
+        self.section_tiers = {section: list(models) for section, models in section_tiers.items()}
+        self.latency_budgets_ms = dict(latency_budgets_ms)
+        self.default_latency_budget_ms = default_latency_budget_ms
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        # Latency per (section, model) karena panjang prompt tiap section berbeda,
+        # error rate per model karena gangguan biasanya berlaku untuk semua section
+        self._latency: Dict[Tuple[str, str], _ModelStats] = defaultdict(lambda: _ModelStats(window))
+        self._errors: Dict[str, _ModelStats] = defaultdict(lambda: _ModelStats(window))
+
+    def _tier_for(self, section: str, available_models: List[str]) -> List[str]:
+        tier = [name for name in self.section_tiers.get(section, []) if name in available_models]
+        return tier or list(available_models)
+
+    def _is_healthy(self, section: str, model_name: str) -> bool:
+        errors = self._errors.get(model_name)
+        if errors is not None and len(errors.outcomes) >= self.min_samples and errors.error_rate() > self.max_error_rate:
+            return False
+
+        latency = self._latency.get((section, model_name))
+        if latency is None or len(latency.latencies) < self.min_samples:
+            return True
+        budget = self.latency_budgets_ms.get(section, self.default_latency_budget_ms)
+        return latency.p95() <= budget
+
+    def _score(self, section: str, model_name: str) -> Tuple[float, float]:
+        errors = self._errors.get(model_name)
+        latency = self._latency.get((section, model_name))
+        error_rate = errors.error_rate() if errors is not None else 0.0
+        p95 = latency.p95() if latency is not None else None
+        return error_rate, p95 if p95 is not None else 0.0
+
+    def candidates(self, section: str, available_models: List[str]) -> List[str]:
+        """Urutan model untuk section: model sehat sesuai urutan tier, lalu sisanya berdasarkan skor"""
+        tier = self._tier_for(section, available_models)
+        with self._lock:
+            healthy = [name for name in tier if self._is_healthy(section, name)]
+            unhealthy = sorted(
+                (name for name in tier if name not in healthy),
+                key=lambda name: self._score(section, name)
+            )
+        return healthy + unhealthy
+
+    def choose(self, section: str, available_models: List[str]) -> str:
+        """Pilih model yang melayani section ini"""
+        model_name = self.candidates(section, available_models)[0]
+        metrics.incr("model_selected", f"{section}:{model_name}")
+        return model_name
+
+    def record(self, section: str, model_name: str, latency_ms: float, success: bool):
+        """Catat hasil satu panggilan untuk keputusan routing berikutnya"""
+        with self._lock:
+            if success:
+                self._latency[(section, model_name)].latencies.append(latency_ms)
+            self._errors[model_name].outcomes.append(success)
+
+        if success:
+            metrics.observe("latency_ms", latency_ms, section)
+            metrics.observe("model_latency_ms", latency_ms, f"{section}:{model_name}")
+        else:
+            metrics.incr("model_errors", f"{section}:{model_name}")
@@ -0,0 +1,254 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Sequence
+from app.config import get_settings
+from app.service.generative.cancellation import cancellable_section, plan_sections
+from app.service.generative.metrics import metrics
+from app.service.generative.prompt_analisis_financial import generate_analisis_financial_async
+from app.service.generative.prompt_analisis_financial.prompt_builder import PromptBuilder as FinancialPromptBuilder
+from app.service.generative.prompt_informasi_teknis import generate_informasi_teknis_async
+from app.service.generative.prompt_roadmap import generate_roadmap_async
+from app.service.generative.prompt_roadmap.prompt_builder import PromptBuilder as RoadmapPromptBuilder
+
+logger = logging.getLogger(__name__)
+
+Publish = Callable[[str, Any], None]
+SectionRunner = Callable[[Dict[str, Dict[str, Any]], Publish], Awaitable[Dict[str, Any]]]
+
+class PipelineSection:
+    """Satu node pipeline: nama section, fungsi generate, dan field upstream yang dibutuhkan
+
+    `requires` memetakan section upstream ke field top-level yang dibaca node ini; tuple
+    kosong berarti menunggu section upstream selesai seluruhnya. `run(inputs, publish)`
+    menerima field upstream yang sudah tersedia dan boleh memanggil `publish(field, value)`
+    untuk field hasilnya sendiri yang sudah final (mis. dari stream yang di-parse bertahap),
+    supaya section downstream bisa mulai sebelum node ini selesai.
+    """
+
+    def __init__(self, name: str, run: SectionRunner, requires: Optional[Dict[str, Sequence[str]]] = None):
+        self.name = name
+        self.run = run
+        self.requires = {upstream: tuple(fields) for upstream, fields in (requires or {}).items()}
+
+
+class PipelineEvent:
+    """Event dari PipelineExecutor: section dimulai (`started`), field section sudah final
+    (`published`, result berisi {field: nilai}), atau section selesai (`completed`)"""
+
+    STARTED = "started"
+    PUBLISHED = "published"
+    COMPLETED = "completed"
+
+    def __init__(self, kind: str, section: str, result: Optional[Dict[str, Any]] = None):
+        self.kind = kind
+        self.section = section
+        self.result = result
+
+
+class PipelineExecutor:
+    """Menjalankan section generate sebagai dependency graph, bukan rantai berurutan
+
+    Setiap section dimulai begitu semua field yang dibutuhkannya tersedia, baik dari section
+    upstream yang sudah selesai maupun yang di-publish sebagian. Jika satu section gagal,
+    section lain yang masih berjalan dibatalkan dan error-nya di-raise ke caller.
+    `completed` berisi hasil section upstream yang sudah ada (mis. dari database); section
+    tersebut tidak dijalankan dan hasilnya langsung menjadi input section downstream.
+    """
+
+    def __init__(
+        self,
+        sections: List[PipelineSection],
+        name: str = "pipeline",
+        completed: Optional[Dict[str, Dict[str, Any]]] = None
+    ):
+        self.name = name
+        self.sections = {section.name: section for section in sections}
+        self.completed = {
+            section: result for section, result in (completed or {}).items() if section not in self.sections
+        }
+        self.order = self._topological_order()
+
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        visiting = set()
+
+        def visit(name: str):
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency pipeline {self.name} membentuk siklus di section {name}")
+            visiting.add(name)
+            for upstream in self.sections[name].requires:
+                if upstream in self.completed:
+                    continue
+                if upstream not in self.sections:
+                    raise ValueError(f"Section {name} bergantung pada section tidak dikenal: {upstream}")
+                visit(upstream)
+            visiting.discard(name)
+            order.append(name)
+
+        for name in self.sections:
+            visit(name)
+        return order
+
+    def dependents(self, name: str) -> List[str]:
+        """Section yang (langsung atau tidak langsung) membaca hasil `name`, sesuai urutan eksekusi"""
+        affected = {name}
+        for section in self.order:
+            if any(upstream in affected for upstream in self.sections[section].requires):
+                affected.add(section)
+        return [section for section in self.order if section in affected and section != name]
+
+    def subset(self, names: Sequence[str], completed: Dict[str, Dict[str, Any]]) -> "PipelineExecutor":
+        """Pipeline yang hanya menjalankan `names`; upstream lainnya diambil dari `completed`"""
+        return PipelineExecutor(
+            [self.sections[name] for name in self.order if name in names],
+            name=self.name,
+            completed=completed
+        )
+
+    async def events(self) -> AsyncIterator[PipelineEvent]:
+        """Jalankan semua section dan yield event started/completed sesuai urutan terjadinya"""
+        loop = asyncio.get_running_loop()
+        started_at = time.monotonic()
+        published: Dict[str, Dict[str, Any]] = {name: {} for name in self.order}
+        results: Dict[str, Dict[str, Any]] = dict(self.completed)
+        ready = {name: asyncio.Event() for name in self.order}
+        queue: asyncio.Queue = asyncio.Queue()
+
+        def is_ready(section: PipelineSection) -> bool:
+            for upstream, fields in section.requires.items():
+                if upstream in results:
+                    continue
+                if not fields or any(field not in published[upstream] for field in fields):
+                    return False
+            return True
+
+        def refresh():
+            for name, event in ready.items():
+                if not event.is_set() and is_ready(self.sections[name]):
+                    event.set()
+
+        def apply_publish(name: str, field: str, value: Any):
+            if name in results or field in published[name]:
+                return
+            published[name][field] = value
+            refresh()
+            queue.put_nowait(PipelineEvent(PipelineEvent.PUBLISHED, name, {field: value}))
+
+        def publisher(name: str) -> Publish:
+            def publish(field: str, value: Any):
+                # Boleh dipanggil dari thread lain (mis. stream sync yang dijalankan di to_thread)
+                try:
+                    running_loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    running_loop = None
+                if running_loop is loop:
+                    apply_publish(name, field, value)
+                else:
+                    loop.call_soon_threadsafe(apply_publish, name, field, value)
+            return publish
+
+        async def run_section(name: str):
+            section = self.sections[name]
+            try:
+                await ready[name].wait()
+                inputs = {
+                    upstream: results[upstream] if upstream in results else dict(published[upstream])
+                    for upstream in section.requires
+                }
+                queue.put_nowait(PipelineEvent(PipelineEvent.STARTED, name))
+                metrics.observe("pipeline_section_start_ms", (time.monotonic() - started_at) * 1000, name)
+                logger.info(f"🔍 Section {name} dimulai")
+                with cancellable_section(name):
+                    result = await section.run(inputs, publisher(name))
+            except asyncio.CancelledError:
+                raise
+            except BaseException as e:
+                queue.put_nowait((name, e))
+                return
+
+            results[name] = result
+            published[name].update(result)
+            refresh()
+            logger.info(f"✅ Section {name} selesai")
+            queue.put_nowait(PipelineEvent(PipelineEvent.COMPLETED, name, result))
+
+        plan_sections(list(self.order))
+        refresh()
+        tasks = [asyncio.ensure_future(run_section(name)) for name in self.order]
+        remaining = len(tasks)
+        try:
+            while remaining:
+                item = await queue.get()
+                if isinstance(item, tuple):
+                    name, error = item
+                    logger.error(f"❌ Section {name} gagal, section lain dibatalkan: {error}")
+                    raise error
+                if item.kind == PipelineEvent.COMPLETED:
+                    remaining -= 1
+                yield item
+            metrics.observe("pipeline_latency_ms", (time.monotonic() - started_at) * 1000, self.name)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def run(self) -> Dict[str, Dict[str, Any]]:
+        """Jalankan pipeline sampai selesai dan return hasil per section"""
+        results: Dict[str, Dict[str, Any]] = {}
+        async for event in self.events():
+            if event.kind == PipelineEvent.COMPLETED:
+                results[event.section] = event.result
+        return results
+
+
+def build_analyze_pipeline(
+    common_params: Dict[str, Any],
+    prefetched: Optional[Dict[str, Future]] = None
+) -> PipelineExecutor:
+    """Pipeline analyze: informasi teknis -> analisis financial -> roadmap, dengan dependensi per field
+
+    Field yang dibutuhkan tiap section diambil dari `PromptBuilder.INPUT_FIELDS` section
+    tersebut, sehingga tetap sinkron dengan isi prompt. Jika `llm_pipeline_stream_fields`
+    aktif, section upstream di-stream dan field-nya di-publish begitu lengkap. `prefetched`
+    berisi hasil prefetch (selesai atau masih berjalan) yang dipakai menggantikan generate.
+    """
+    stream_fields = get_settings().llm_pipeline_stream_fields
+    prefetched = prefetched or {}
+
+    async def run_informasi_teknis(inputs, publish):
+        future = prefetched.get("informasi_teknis")
+        if future is not None:
+            try:
+                return await asyncio.wrap_future(future)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"⚠️ Prefetch informasi teknis gagal, generate ulang: {e}")
+        return await generate_informasi_teknis_async(
+            **common_params,
+            on_field=publish if stream_fields else None
+        )
+
+    async def run_analisis_financial(inputs, publish):
+        return await generate_analisis_financial_async(
+            **common_params,
+            informasi_teknis=inputs["informasi_teknis"],
+            on_field=publish if stream_fields else None
+        )
+
+    async def run_roadmap(inputs, publish):
+        return await generate_roadmap_async(
+            **common_params,
+            informasi_teknis=inputs["informasi_teknis"],
+            analisis_financial=inputs["analisis_financial"]
+        )
+
+    return PipelineExecutor([
+        PipelineSection("informasi_teknis", run_informasi_teknis),
+        PipelineSection("analisis_financial", run_analisis_financial, FinancialPromptBuilder.INPUT_FIELDS),
+        PipelineSection("roadmap", run_roadmap, RoadmapPromptBuilder.INPUT_FIELDS)
+    ], name="analyze")
@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+from app.config import get_settings
+from app.service.generative.gemini_client import get_gemini_client
+from app.service.generative.metrics import metrics
+from app.service.generative.prompt_informasi_teknis import generate_informasi_teknis_with_gemini
+
+logger = logging.getLogger(__name__)
+
+SECTION = "informasi_teknis"
+
+def _prefetch_key(common_params: Dict[str, Any]) -> Tuple:
+    # use_cache tidak ikut: hasil prefetch tetap hasil generate yang sah untuk input yang sama
+    return tuple(sorted((name, value) for name, value in common_params.items() if name != "use_cache"))
+
+
+class AnalyzePrefetcher:
+    """Generate spekulatif section pertama analyze (informasi teknis) setelah ringkasan awal dibuat
+
+    Hampir semua user memanggil /analyze beberapa detik setelah membuat project, jadi informasi
+    teknis di-generate lebih dulu di thread pool kecil terpisah (prioritas rendah: dilewati jika
+    limiter Gemini sedang ramai). /analyze mengambil hasil yang sudah selesai atau yang masih
+    berjalan lewat `take`; hasil yang tidak diambil dibuang setelah `ttl_seconds`.
+    """
+
+    def __init__(
+        self,
+        limiter,
+        workers: int = 2,
+        ttl_seconds: float = 600,
+        max_pending: int = 50,
+        limiter_reserve: float = 0.5
+    ):
+        self.limiter = limiter
+        self.ttl_seconds = ttl_seconds
+        self.max_pending = max_pending
+        self.limiter_reserve = limiter_reserve
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analyze-prefetch")
+        self._entries: Dict[str, Tuple[Tuple, Future, float]] = {}
+        self._hits = 0
+        self._lookups = 0
+        self._lock = threading.Lock()
+
+    def _expire_locked(self):
+        now = time.monotonic()
+        for ringkasan_id, (_, future, expires_at) in list(self._entries.items()):
+            if expires_at <= now:
+                del self._entries[ringkasan_id]
+                future.cancel()
+                metrics.incr("analyze_prefetch_expired", SECTION)
+
+    def schedule(self, ringkasan_id: str, common_params: Dict[str, Any]) -> bool:
+        """Jadwalkan prefetch untuk ringkasan; return False jika dilewati"""
+        if not self.limiter.has_headroom(self.limiter_reserve):
+            metrics.incr("analyze_prefetch_skipped", "busy")
+            logger.info(f"⚠️ Prefetch {SECTION} dilewati, limiter Gemini sedang ramai")
+            return False
+
+        with self._lock:
+            self._expire_locked()
+            if ringkasan_id in self._entries:
+                return True
+            if len(self._entries) >= self.max_pending:
+                metrics.incr("analyze_prefetch_skipped", "full")
+                return False
+            future = self._executor.submit(self._run, ringkasan_id, dict(common_params))
+            self._entries[ringkasan_id] = (_prefetch_key(common_params), future, time.monotonic() + self.ttl_seconds)
+
+        metrics.incr("analyze_prefetch_scheduled", SECTION)
+        logger.info(f"🔍 Prefetch {SECTION} dijadwalkan untuk ringkasan: {ringkasan_id}")
+        return True
+
+    def _run(self, ringkasan_id: str, common_params: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            result = generate_informasi_teknis_with_gemini(**common_params)
+        except Exception as e:
+            metrics.incr("analyze_prefetch_failed", SECTION)
+            logger.warning(f"⚠️ Prefetch {SECTION} gagal untuk ringkasan {ringkasan_id}: {e}")
+            raise
+        logger.info(f"✅ Prefetch {SECTION} selesai untuk ringkasan: {ringkasan_id}")
+        return result
+
+    def take(self, ringkasan_id: str, common_params: Dict[str, Any]) -> Optional[Future]:
+        """Ambil prefetch (selesai atau masih berjalan) yang inputnya sama; None jika tidak ada"""
+        with self._lock:
+            self._expire_locked()
+            entry = self._entries.pop(ringkasan_id, None)
+            hit = entry is not None and entry[0] == _prefetch_key(common_params)
+            self._lookups += 1
+            self._hits += hit
+            metrics.set_gauge("analyze_prefetch_hit_rate", round(self._hits / self._lookups, 3), SECTION)
+
+        if not hit:
+            if entry is not None:
+                # Project diubah setelah prefetch dijadwalkan, hasilnya tidak lagi berlaku
+                entry[1].cancel()
+            metrics.incr("analyze_prefetch_miss", SECTION)
+            return None
+
+        future = entry[1]
+        metrics.incr("analyze_prefetch_hit", "ready" if future.done() else "in_flight")
+        return future
+
+    def discard(self, ringkasan_id: str):
+        """Buang prefetch ringkasan yang tidak akan dipakai (mode combined atau regenerate)"""
+        with self._lock:
+            entry = self._entries.pop(ringkasan_id, None)
+        if entry is not None:
+            # Prefetch yang belum mulai tidak jadi memakai kuota Gemini
+            entry[1].cancel()
+            metrics.incr("analyze_prefetch_discarded", SECTION)
+
+
+@lru_cache()
+def get_analyze_prefetcher() -> Optional[AnalyzePrefetcher]:
+    """Instance AnalyzePrefetcher tunggal, None jika prefetch dimatikan"""
+    settings = get_settings()
+    if not settings.analyze_prefetch_enabled:
+        return None
+    return AnalyzePrefetcher(
+        limiter=get_gemini_client().limiter,
+        workers=settings.analyze_prefetch_workers,
+        ttl_seconds=settings.analyze_prefetch_ttl_seconds,
+        max_pending=settings.analyze_prefetch_max_pending,
+        limiter_reserve=settings.analyze_prefetch_limiter_reserve
+    )
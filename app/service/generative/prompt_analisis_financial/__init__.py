@@ -1,4 +1,4 @@
-from app.service.generative.prompt_analisis_financial.analyzer import AnalisisFinancialAnalyzer
+from app.service.generative.prompt_analisis_financial.analyzer import AnalisisFinancialAnalyzer, get_analisis_financial_analyzer
 
 def generate_analisis_financial_with_gemini(
     project_name: str,
@@ -12,10 +12,11 @@ def generate_analisis_financial_with_gemini(
     kesimpulan_ringkasan: str,
     informasi_teknis: dict,
     lang: float = None,
-    lat: float = None
+    lat: float = None,
+    use_cache: bool = True
 ):
     """Helper function untuk generate analisis financial dengan Gemini"""
-    analyzer = AnalisisFinancialAnalyzer()
+    analyzer = get_analisis_financial_analyzer()
     return analyzer.generate_analisis_financial(
         project_name=project_name,
         jenis_ikan=jenis_ikan,
@@ -28,6 +29,41 @@ def generate_analisis_financial_with_gemini(
         kesimpulan_ringkasan=kesimpulan_ringkasan,
         informasi_teknis=informasi_teknis,
         lang=lang,
-        lat=lat
+        lat=lat,
+        use_cache=use_cache
     )
 
+async def generate_analisis_financial_async(
+    project_name: str,
+    jenis_ikan: str,
+    modal: int,
+    kabupaten_id: str,
+    resiko: str,
+    skor_kelayakan: int,
+    potensi_pasar: str,
+    estimasi_balik_modal: int,
+    kesimpulan_ringkasan: str,
+    informasi_teknis: dict,
+    lang: float = None,
+    lat: float = None,
+    use_cache: bool = True,
+    on_field=None
+):
+    """Helper async untuk generate analisis financial dengan Gemini tanpa thread pool"""
+    analyzer = get_analisis_financial_analyzer()
+    return await analyzer.generate_analisis_financial_async(
+        project_name=project_name,
+        jenis_ikan=jenis_ikan,
+        modal=modal,
+        kabupaten_id=kabupaten_id,
+        resiko=resiko,
+        skor_kelayakan=skor_kelayakan,
+        potensi_pasar=potensi_pasar,
+        estimasi_balik_modal=estimasi_balik_modal,
+        kesimpulan_ringkasan=kesimpulan_ringkasan,
+        informasi_teknis=informasi_teknis,
+        lang=lang,
+        lat=lat,
+        use_cache=use_cache,
+        on_field=on_field
+    )
@@ -4,6 +4,11 @@ from app.models.ringkasan_awal import PotensiPasar
 class PromptBuilder:
     """Kelas untuk membangun prompt analisis financial"""
     
+    # Field section upstream yang dibaca prompt (penuh maupun ringkas), dipakai pipeline analyze
+    INPUT_FIELDS = {
+        "informasi_teknis": ("spesifikasiKolam", "spesifikasiBenih")
+    }
+    
     @staticmethod
     def build_analisis_financial_prompt(
         project_name: str,
@@ -17,12 +22,27 @@ class PromptBuilder:
         kesimpulan_ringkasan: str,
         informasi_teknis: dict,
         lang: float = None,
-        lat: float = None
+        lat: float = None,
+        compact: bool = False
     ) -> str:
         
         kolam_info = informasi_teknis.get("spesifikasiKolam", {})
         benih_info = informasi_teknis.get("spesifikasiBenih", {})
         
+        if compact:
+            return PromptBuilder.build_analisis_financial_prompt_compact(
+                project_name=project_name,
+                jenis_ikan=jenis_ikan,
+                modal=modal,
+                kabupaten_id=kabupaten_id,
+                resiko=resiko,
+                skor_kelayakan=skor_kelayakan,
+                potensi_pasar=potensi_pasar,
+                estimasi_balik_modal=estimasi_balik_modal,
+                kolam_info=kolam_info,
+                benih_info=benih_info
+            )
+        
         return f"""
 Anda adalah ahli analisis financial budidaya ikan profesional dengan pengalaman 15+ tahun. Berdasarkan informasi project dan informasi teknis berikut, buatkan analisis financial yang DETIL dan REALISTIS:
 
@@ -98,4 +118,32 @@ Buatkan analisis financial lengkap untuk budidaya {jenis_ikan} dengan modal Rp {
 
 Sekarang buatkan analisis financial yang DETIL dan REALISTIS untuk project ini!
 """
+    
+    @staticmethod
+    def build_analisis_financial_prompt_compact(
+        project_name: str,
+        jenis_ikan: str,
+        modal: int,
+        kabupaten_id: str,
+        resiko: str,
+        skor_kelayakan: int,
+        potensi_pasar: str,
+        estimasi_balik_modal: int,
+        kolam_info: dict,
+        benih_info: dict
+    ) -> str:
+        """Prompt ringkas: hanya field upstream yang dipakai, struktur output dijamin response schema
+        
+        kesimpulan_ringkasan, koordinat, dan template JSON tidak dikirim ulang.
+        """
+        return f"""Anda ahli analisis financial budidaya ikan. Buat analisis financial REALISTIS dalam JSON camelCase sesuai schema, semua biaya dalam rupiah berupa angka.
 
+Project: {project_name}; {jenis_ikan}; modal Rp {modal:,}; {kabupaten_id}, Sumatera Barat; resiko {resiko}; skor kelayakan {skor_kelayakan}/100; potensi pasar {potensi_pasar}; balik modal {estimasi_balik_modal} bulan.
+Teknis: kolam {kolam_info.get('jenis', 'N/A')}, {kolam_info.get('ukuran', 'N/A')}, {kolam_info.get('jumlahKolam', 'N/A')} unit, air {kolam_info.get('volumeAir', 'N/A')}; benih {benih_info.get('jenis', 'N/A')}, {benih_info.get('jumlah', 'N/A')} ekor.
+
+Ketentuan:
+1. totalModalAwal 85-100% dari Rp {modal:,}; investasiAwal dan modalAwal = totalModalAwal.
+2. Panen = jumlah benih x survival rate 80-90%; hargaPerKg = harga pasar {jenis_ikan} di Sumatera Barat.
+3. Margin = pendapatan - (modal awal + operasional per siklus); roi = keuntungan per siklus / investasi awal x 100% (contoh "67.30%"); breakEvenPoint = modal awal / margin (contoh "1.5 siklus").
+4. lamaSiklus sesuai {jenis_ikan} (contoh "2.5 bulan"); ROI dan BEP konsisten dengan balik modal {estimasi_balik_modal} bulan.
+"""
@@ -0,0 +1,32 @@
+from app.service.generative.prompt_analyze_combined.analyzer import CombinedAnalyzer, get_combined_analyzer
+
+async def generate_analyze_combined_async(
+    project_name: str,
+    jenis_ikan: str,
+    modal: int,
+    kabupaten_id: str,
+    resiko: str,
+    skor_kelayakan: int,
+    potensi_pasar: str,
+    estimasi_balik_modal: int,
+    kesimpulan_ringkasan: str,
+    lang: float = None,
+    lat: float = None,
+    use_cache: bool = True
+):
+    """Helper async untuk generate informasi teknis, analisis financial, dan roadmap dalam satu panggilan"""
+    analyzer = get_combined_analyzer()
+    return await analyzer.generate_combined_async(
+        project_name=project_name,
+        jenis_ikan=jenis_ikan,
+        modal=modal,
+        kabupaten_id=kabupaten_id,
+        resiko=resiko,
+        skor_kelayakan=skor_kelayakan,
+        potensi_pasar=potensi_pasar,
+        estimasi_balik_modal=estimasi_balik_modal,
+        kesimpulan_ringkasan=kesimpulan_ringkasan,
+        lang=lang,
+        lat=lat,
+        use_cache=use_cache
+    )
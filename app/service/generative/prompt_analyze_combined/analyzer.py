@@ -0,0 +1,84 @@
+import logging
+from functools import lru_cache
+from typing import Any, Dict
+from app.service.generative.gemini_client import get_gemini_client
+from app.service.generative.errors import GeminiError
+from app.service.generative.prompt_analyze_combined.prompt_builder import PromptBuilder
+from app.service.generative.prompt_analyze_combined.response_parser import ResponseParser
+
+logger = logging.getLogger(__name__)
+
+class CombinedAnalyzer:
+    """Service untuk generate informasi teknis, analisis financial, dan roadmap dalam satu panggilan Gemini"""
+    
+    SECTION = "analyze_combined"
+    
+    def __init__(self):
+        self.client = get_gemini_client()
+        self.prompt_builder = PromptBuilder()
+        self.response_parser = ResponseParser()
+    
+    def _parse_response(self, response) -> Dict[str, Dict[str, Any]]:
+        """Extract, parse, dan validasi response gabungan dari Gemini"""
+        response_text = self.response_parser.extract_response_text(response)
+        analysis_data = self.response_parser.parse_json_response(response_text)
+        return self.response_parser.validate_and_normalize_combined(analysis_data)
+    
+    async def generate_combined_async(
+        self,
+        project_name: str,
+        jenis_ikan: str,
+        modal: int,
+        kabupaten_id: str,
+        resiko: str,
+        skor_kelayakan: int,
+        potensi_pasar: str,
+        estimasi_balik_modal: int,
+        kesimpulan_ringkasan: str,
+        lang: float = None,
+        lat: float = None,
+        use_cache: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """Generate ketiga section sekaligus; return {"informasi_teknis", "analisis_financial", "roadmap"}"""
+        
+        prompt = self.prompt_builder.build_combined_prompt(
+            project_name=project_name,
+            jenis_ikan=jenis_ikan,
+            modal=modal,
+            kabupaten_id=kabupaten_id,
+            resiko=resiko,
+            skor_kelayakan=skor_kelayakan,
+            potensi_pasar=potensi_pasar,
+            estimasi_balik_modal=estimasi_balik_modal,
+            kesimpulan_ringkasan=kesimpulan_ringkasan,
+            lang=lang,
+            lat=lat
+        )
+        
+        logger.info(f"🔍 Mengirim request async ke Gemini API untuk analyze gabungan: {project_name}")
+        
+        try:
+            response = await self.client.generate_content_async(
+                prompt,
+                section=self.SECTION,
+                generation_config=self.response_parser.GENERATION_CONFIG,
+                use_cache=use_cache,
+                validate=self._parse_response
+            )
+        except GeminiError:
+            raise
+        except Exception as api_err:
+            logger.error(f"❌ Error saat memanggil Gemini API: {str(api_err)}")
+            raise Exception(f"Error dari Gemini API: {str(api_err)}")
+        
+        normalized_data = self._parse_response(response)
+        
+        logger.info(f"✅ Analyze gabungan berhasil di-generate untuk project: {project_name}")
+        
+        return normalized_data
+
+
+@lru_cache()
+def get_combined_analyzer() -> CombinedAnalyzer:
+    """Instance CombinedAnalyzer tunggal yang dipakai ulang antar request"""
+    return CombinedAnalyzer()
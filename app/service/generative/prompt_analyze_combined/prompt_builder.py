@@ -0,0 +1,214 @@
+# Instruksi per section mengikuti prompt mode tiga panggilan, tetapi tanpa data project:
+# data project dikirim sekali di akhir prompt gabungan
+TEKNIS_INSTRUCTIONS = """
+Anda adalah ahli budidaya ikan profesional dengan pengalaman 15+ tahun. Tugas Anda adalah membuat informasi teknis yang DETIL dan REALISTIS untuk project budidaya ikan yang diberikan di bagian akhir prompt ini.
+
+**OUTPUT yang DIPERLUKAN (JSON) - WAJIB SEMUA FIELD dengan format camelCase:**
+
+{
+    "spesifikasiKolam": {
+        "jenis": "<jenis kolam yang sesuai untuk jenis ikan dan modal project, contoh: Kolam Terpal, Kolam Beton, Kolam Tanah>",
+        "ukuran": "<ukuran kolam dalam format: panjang x lebar x tinggi, contoh: 3m x 4m x 1m>",
+        "volumeAir": "<volume air dalam liter, contoh: 10.000 liter>",
+        "jumlahKolam": <jumlah kolam yang realistis berdasarkan modal>,
+        "kedalamanAir": "<kedalaman air optimal untuk jenis ikan project, dalam cm>"
+    },
+    "kualitasAir": {
+        "pH": "<range pH optimal untuk jenis ikan project, contoh: 6.5 - 8.0>",
+        "suhu": "<range suhu optimal dalam derajat celcius, contoh: 27 - 30 C>",
+        "oksigenTerlarut": "<kadar oksigen terlarut optimal dalam mg/L, contoh: 3 - 5 mg/L>",
+        "kejernihan": "<kejernihan air optimal dalam cm, contoh: 30 - 40 cm>"
+    },
+    "spesifikasiBenih": {
+        "jenis": "<jenis/strain benih yang direkomendasikan, contoh: Lele Sangkuriang, Nila NIRWANA>",
+        "ukuran": "<ukuran benih saat tebar dalam cm, contoh: 5 - 7 cm>",
+        "jumlah": <jumlah benih total yang realistis berdasarkan ukuran kolam>,
+        "padatTebar": "<padat tebar dalam ekor/m2, contoh: 200 ekor/m2>"
+    },
+    "spesifikasiPakan": {
+        "jenis": "<jenis pakan yang direkomendasikan, contoh: Pelet Terapung, Pelet Tenggelam>",
+        "protein": "<kandungan protein optimal dalam persen, contoh: 30% - 32%>",
+        "frekuensiPemberian": "<frekuensi pemberian pakan per hari, contoh: 3x sehari>",
+        "rasioPakan": "<rasio pakan terhadap bobot biomass dalam persen, contoh: 3% dari bobot biomass>"
+    },
+    "manajemenKesehatan": {
+        "cekRutin": "<frekuensi pengecekan kesehatan ikan, contoh: 2x seminggu>",
+        "vaksin": <boolean, apakah perlu vaksin atau tidak>,
+        "penangananHama": "<cara penanganan hama/penyakit yang direkomendasikan>",
+        "pencegahanPenyakit": "<tindakan pencegahan penyakit yang harus dilakukan>"
+    },
+    "teknologiPendukung": {
+        "sensorPH": <boolean, apakah direkomendasikan menggunakan sensor pH>,
+        "otomatisasiPakan": <boolean, apakah direkomendasikan otomatisasi pakan>,
+        "sistemMonitoring": "<jenis sistem monitoring yang direkomendasikan berdasarkan modal, contoh: IoT Basic Monitoring, Manual Monitoring>",
+        "kameraKolam": <boolean, apakah direkomendasikan kamera untuk monitoring>
+    }
+}
+
+**KETENTUAN PENTING:**
+1. Semua nilai harus REALISTIS dan SESUAI dengan modal dan jenis ikan project
+2. Ukuran kolam dan jumlah kolam harus proporsional dengan modal
+3. Spesifikasi teknis harus sesuai dengan karakteristik jenis ikan project
+4. Teknologi pendukung harus realistis sesuai budget (jangan over-spec untuk modal kecil)
+5. Gunakan format camelCase untuk semua key JSON
+6. Jangan ada field yang kosong atau null
+"""
+
+FINANCIAL_INSTRUCTIONS = """
+Anda adalah ahli analisis financial budidaya ikan profesional dengan pengalaman 15+ tahun. Tugas Anda adalah membuat analisis financial yang DETIL dan REALISTIS untuk project dan informasi teknis yang diberikan di bagian akhir prompt ini.
+
+**OUTPUT yang DIPERLUKAN (JSON) - WAJIB SEMUA FIELD dengan format camelCase:**
+
+{
+    "rincianModalAwal": {
+        "kolamTerpal": <biaya kolam terpal dalam rupiah (jika menggunakan terpal)>,
+        "pompaAir": <biaya pompa air dalam rupiah>,
+        "selangFilter": <biaya selang dan filter dalam rupiah>,
+        "pembelianBenih": <biaya pembelian benih berdasarkan jumlah dan harga pasar>,
+        "totalModalAwal": <total semua biaya modal awal, HARUS MENDEKATI modal project>
+    },
+    "biayaOperasional": {
+        "pakanBulanan": <biaya pakan per bulan berdasarkan jumlah benih dan kebutuhan pakan>,
+        "listrik": <biaya listrik per bulan untuk pompa dan peralatan>,
+        "vitaminObat": <biaya vitamin dan obat per bulan>,
+        "lainnya": <biaya operasional lain-lain per bulan>,
+        "totalOperasionalBulanan": <total biaya operasional per bulan>
+    },
+    "analisisROI": {
+        "investasiAwal": <sama dengan totalModalAwal>,
+        "proyeksiKeuntunganPerSiklus": <proyeksi keuntungan per siklus panen berdasarkan harga jual dan biaya>,
+        "roi": "<ROI dalam persen, contoh: 67.30%>",
+        "lamaSiklus": "<lama satu siklus budidaya dalam bulan, contoh: 2.5 bulan>"
+    },
+    "analisisBEP": {
+        "modalAwal": <sama dengan totalModalAwal>,
+        "marginPerSiklus": <margin keuntungan per siklus>,
+        "breakEvenPoint": "<break even point dalam jumlah siklus, contoh: 1.5 siklus>"
+    },
+    "proyeksiPendapatan": {
+        "panenPerSiklusKg": <berat panen per siklus dalam kg, berdasarkan jumlah benih dan survival rate>,
+        "hargaPerKg": <harga jual per kg berdasarkan harga pasar jenis ikan project di Sumatera Barat>,
+        "pendapatanPerPanen": <total pendapatan per panen (panenPerSiklusKg x hargaPerKg)>
+    }
+}
+
+**KETENTUAN PENTING:**
+1. Semua nilai biaya harus REALISTIS dan SESUAI dengan modal project
+2. totalModalAwal harus MENDEKATI modal project (dalam range 85-100% dari modal)
+3. Hitung proyeksi panen berdasarkan jumlah benih dan survival rate realistis untuk jenis ikan project
+4. Harga jual harus sesuai dengan harga pasar jenis ikan project di Sumatera Barat
+5. ROI dan BEP harus realistis berdasarkan estimasi balik modal project
+6. Lama siklus harus sesuai dengan karakteristik jenis ikan project
+7. Gunakan format camelCase untuk semua key JSON
+8. Jangan ada field yang kosong atau null
+
+**Rumus yang harus digunakan:**
+- Survival rate: 80-90% (realistis)
+- Margin: pendapatan - (modal awal + biaya operasional per siklus)
+- ROI: (keuntungan per siklus / investasi awal) x 100%
+- BEP: modal awal / margin per siklus
+"""
+
+ROADMAP_INSTRUCTIONS = """
+Anda adalah ahli budidaya ikan profesional dengan pengalaman 15+ tahun. Tugas Anda adalah membuat roadmap/langkah-langkah budidaya yang DETIL dan REALISTIS untuk project, informasi teknis, dan analisis financial yang diberikan di bagian akhir prompt ini. Roadmap harus mencakup semua tahapan dari persiapan hingga panen dengan estimasi waktu yang realistis.
+
+**OUTPUT yang DIPERLUKAN (JSON) - format dinamis tapi struktur konsisten:**
+
+Roadmap harus berisi langkah-langkah yang detail dengan estimasi waktu. Buatkan langkah-langkah yang SPESIFIK dan PRAKTIS untuk project.
+
+Format JSON:
+{
+    "response": {
+        "judul": "<judul roadmap, contoh: Roadmap Budidaya Lele 3 bulan>",
+        "detail": "<deskripsi singkat roadmap>",
+        "list": [
+            {
+                "step": <nomor step, mulai dari 1>,
+                "title": "<judul step, contoh: Persiapan Kolam>",
+                "deskripsi": "<deskripsi lengkap langkah-langkah yang harus dilakukan, minimal 2-3 kalimat, SPESIFIK untuk project>"
+            },
+            {
+                "step": <nomor step berikutnya>,
+                "title": "<judul step>",
+                "deskripsi": "<deskripsi lengkap>"
+            }
+            // ... lanjutkan untuk semua step hingga panen
+        ]
+    },
+    "request": null,
+    "step": 1,
+    "isRequest": false,
+    "roadmapId": null
+}
+
+**KETENTUAN PENTING:**
+1. Buatkan minimal 5-8 langkah yang mencakup: Persiapan, Pengisian Air, Tebar Benih, Manajemen Pakan, Monitoring, Panen
+2. Setiap langkah harus SPESIFIK dan disesuaikan dengan informasi teknis yang sudah ada
+3. Deskripsi harus DETIL dan PRAKTIS (minimal 2-3 kalimat per step)
+4. Step harus berurutan dari persiapan hingga panen
+5. Estimasi waktu harus realistis sesuai lama siklus project
+6. Judul roadmap harus sesuai dengan jenis ikan dan lama siklus
+7. Response harus dalam format JSON yang valid
+
+**Contoh struktur step yang diperlukan:**
+- Step 1: Persiapan Kolam (bersihkan, pasang terpal, dll sesuai jenis kolam)
+- Step 2: Pengisian Air & Setting Kualitas (atur pH, suhu, kejernihan sesuai spesifikasi)
+- Step 3: Tebar Benih (sesuai jumlah dan ukuran benih)
+- Step 4: Manajemen Pakan (sesuai frekuensi dan rasio pakan)
+- Step 5: Monitoring Harian (sesuai parameter kualitas air)
+- Step 6: Manajemen Kesehatan (sesuai spesifikasi manajemen kesehatan)
+- Step 7: Panen (sesuai estimasi berat panen dan waktu panen)
+"""
+
+COMBINED_INSTRUCTIONS = f"""
+Anda menyusun TIGA bagian analisis budidaya ikan sekaligus dalam SATU object JSON dengan key "informasi_teknis", "analisis_financial", dan "roadmap". Isi setiap key mengikuti instruksi bagiannya masing-masing di bawah ini.
+
+Karena ketiga bagian dibuat bersamaan, informasi teknis dan analisis financial yang disebut pada instruksi bagian lain adalah hasil yang Anda buat sendiri di object yang sama:
+- analisis_financial harus konsisten dengan kolam dan benih pada informasi_teknis
+- roadmap harus konsisten dengan informasi_teknis dan lama siklus pada analisis_financial.analisisROI
+
+=== BAGIAN "informasi_teknis" ===
+{TEKNIS_INSTRUCTIONS}
+=== BAGIAN "analisis_financial" ===
+{FINANCIAL_INSTRUCTIONS}
+=== BAGIAN "roadmap" ===
+{ROADMAP_INSTRUCTIONS}
+"""
+
+class PromptBuilder:
+    """Kelas untuk membangun prompt analyze gabungan (informasi teknis, analisis financial, roadmap)"""
+    
+    @staticmethod
+    def build_combined_prompt(
+        project_name: str,
+        jenis_ikan: str,
+        modal: int,
+        kabupaten_id: str,
+        resiko: str,
+        skor_kelayakan: int,
+        potensi_pasar: str,
+        estimasi_balik_modal: int,
+        kesimpulan_ringkasan: str,
+        lang: float = None,
+        lat: float = None
+    ) -> str:
+        """Membangun prompt satu generate untuk ketiga section: prefix statis + data project (sekali)"""
+        
+        dynamic_suffix = f"""
+**Informasi Project:**
+- Nama Project: {project_name}
+- Jenis Ikan: {jenis_ikan}
+- Modal Awal: Rp {modal:,}
+- Lokasi: {kabupaten_id}, Sumatera Barat{f' (Koordinat: {lat}, {lang})' if lang and lat else ''}
+- Resiko: {resiko}
+- Skor Kelayakan: {skor_kelayakan}/100
+- Potensi Pasar: {potensi_pasar}
+- Estimasi Balik Modal: {estimasi_balik_modal} bulan
+- Kesimpulan: {kesimpulan_ringkasan}
+
+**Tugas Anda:**
+Buatkan informasi teknis, analisis financial, dan roadmap lengkap untuk budidaya {jenis_ikan} dengan modal Rp {modal:,} di {kabupaten_id}. totalModalAwal dalam range 85-100% dari Rp {modal:,}, ROI/BEP konsisten dengan estimasi balik modal {estimasi_balik_modal} bulan, dan roadmap mengikuti lama siklus yang Anda tetapkan.
+
+Sekarang buatkan ketiga bagian yang DETIL dan REALISTIS untuk project ini dalam satu JSON!
+"""
+        return COMBINED_INSTRUCTIONS + dynamic_suffix
@@ -0,0 +1,60 @@
+import logging
+from typing import Any, Dict
+from app.service.generative.prompt_analisis_financial.response_parser import (
+    RESPONSE_SCHEMA as FINANCIAL_SCHEMA,
+    ResponseParser as FinancialResponseParser
+)
+from app.service.generative.prompt_informasi_teknis.response_parser import (
+    RESPONSE_SCHEMA as TEKNIS_SCHEMA,
+    ResponseParser as TeknisResponseParser
+)
+from app.service.generative.prompt_roadmap.response_parser import (
+    RESPONSE_SCHEMA as ROADMAP_SCHEMA,
+    ResponseParser as RoadmapResponseParser
+)
+from app.service.generative.response_schema import decode_json_object, json_generation_config, object_schema
+
+logger = logging.getLogger(__name__)
+
+# Schema gabungan memakai schema masing-masing section tanpa perubahan
+RESPONSE_SCHEMA = object_schema({
+    "informasi_teknis": TEKNIS_SCHEMA,
+    "analisis_financial": FINANCIAL_SCHEMA,
+    "roadmap": ROADMAP_SCHEMA
+})
+
+# Validator section yang sama dengan mode tiga panggilan
+SECTION_VALIDATORS = {
+    "informasi_teknis": TeknisResponseParser.validate_and_normalize_informasi_teknis,
+    "analisis_financial": FinancialResponseParser.validate_and_normalize_analisis_financial,
+    "roadmap": RoadmapResponseParser.validate_and_normalize_roadmap
+}
+
+class ResponseParser:
+    """Kelas untuk parsing dan validasi response analyze gabungan dari Gemini API"""
+    
+    GENERATION_CONFIG = json_generation_config(RESPONSE_SCHEMA)
+    
+    @staticmethod
+    def extract_response_text(response) -> str:
+        """Extract text dari response Gemini dengan berbagai format"""
+        return TeknisResponseParser.extract_response_text(response)
+    
+    @staticmethod
+    def parse_json_response(response_text: str) -> Dict[str, Any]:
+        """Decode JSON dari response structured output"""
+        return decode_json_object(response_text)
+    
+    @staticmethod
+    def validate_and_normalize_combined(analysis_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Validasi tiap bagian dengan aturan validate_and_normalize_* section-nya"""
+        normalized_data = {}
+        for section, validate in SECTION_VALIDATORS.items():
+            section_data = analysis_data.get(section)
+            if not isinstance(section_data, dict):
+                raise ValueError(f"Bagian {section} tidak ditemukan atau bukan object dalam response AI")
+            try:
+                normalized_data[section] = validate(section_data)
+            except ValueError as e:
+                raise ValueError(f"Bagian {section} tidak valid: {e}")
+        return normalized_data
@@ -1,4 +1,4 @@
-from app.service.generative.prompt_informasi_teknis.analyzer import InformasiTeknisAnalyzer
+from app.service.generative.prompt_informasi_teknis.analyzer import InformasiTeknisAnalyzer, get_informasi_teknis_analyzer
 
 def generate_informasi_teknis_with_gemini(
     project_name: str,
@@ -11,10 +11,11 @@ def generate_informasi_teknis_with_gemini(
     estimasi_balik_modal: int,
     kesimpulan_ringkasan: str,
     lang: float = None,
-    lat: float = None
+    lat: float = None,
+    use_cache: bool = True
 ):
     """Helper function untuk generate informasi teknis dengan Gemini"""
-    analyzer = InformasiTeknisAnalyzer()
+    analyzer = get_informasi_teknis_analyzer()
     return analyzer.generate_informasi_teknis(
         project_name=project_name,
         jenis_ikan=jenis_ikan,
@@ -26,5 +27,39 @@ def generate_informasi_teknis_with_gemini(
         estimasi_balik_modal=estimasi_balik_modal,
         kesimpulan_ringkasan=kesimpulan_ringkasan,
         lang=lang,
-        lat=lat
+        lat=lat,
+        use_cache=use_cache
+    )
+
+async def generate_informasi_teknis_async(
+    project_name: str,
+    jenis_ikan: str,
+    modal: int,
+    kabupaten_id: str,
+    resiko: str,
+    skor_kelayakan: int,
+    potensi_pasar: str,
+    estimasi_balik_modal: int,
+    kesimpulan_ringkasan: str,
+    lang: float = None,
+    lat: float = None,
+    use_cache: bool = True,
+    on_field=None
+):
+    """Helper async untuk generate informasi teknis dengan Gemini tanpa thread pool"""
+    analyzer = get_informasi_teknis_analyzer()
+    return await analyzer.generate_informasi_teknis_async(
+        project_name=project_name,
+        jenis_ikan=jenis_ikan,
+        modal=modal,
+        kabupaten_id=kabupaten_id,
+        resiko=resiko,
+        skor_kelayakan=skor_kelayakan,
+        potensi_pasar=potensi_pasar,
+        estimasi_balik_modal=estimasi_balik_modal,
+        kesimpulan_ringkasan=kesimpulan_ringkasan,
+        lang=lang,
+        lat=lat,
+        use_cache=use_cache,
+        on_field=on_field
     )
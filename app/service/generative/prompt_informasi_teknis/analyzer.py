@@ -1,6 +1,8 @@
 import logging
-from typing import Dict, Any
-from app.service.generative.prompt_informasi_teknis.gemini_client import GeminiClient
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+from app.service.generative.gemini_client import get_gemini_client
+from app.service.generative.errors import GeminiError
 from app.service.generative.prompt_informasi_teknis.prompt_builder import PromptBuilder
 from app.service.generative.prompt_informasi_teknis.response_parser import ResponseParser
 
@@ -9,11 +11,19 @@ logger = logging.getLogger(__name__)
 class InformasiTeknisAnalyzer:
     """Service untuk generate informasi teknis menggunakan Gemini AI"""
     
+    SECTION = "informasi_teknis"
+    
     def __init__(self):
-        self.client = GeminiClient()
+        self.client = get_gemini_client()
         self.prompt_builder = PromptBuilder()
         self.response_parser = ResponseParser()
     
+    def _parse_response(self, response) -> Dict[str, Any]:
+        """Extract, parse, dan validasi response informasi teknis dari Gemini"""
+        response_text = self.response_parser.extract_response_text(response)
+        analysis_data = self.response_parser.parse_json_response(response_text)
+        return self.response_parser.validate_and_normalize_informasi_teknis(analysis_data)
+    
     def generate_informasi_teknis(
         self,
         project_name: str,
@@ -26,7 +36,8 @@ class InformasiTeknisAnalyzer:
         estimasi_balik_modal: int,
         kesimpulan_ringkasan: str,
         lang: float = None,
-        lat: float = None
+        lat: float = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """Generate informasi teknis menggunakan AI"""
         
@@ -47,17 +58,95 @@ class InformasiTeknisAnalyzer:
         logger.info(f"🔍 Mengirim request ke Gemini API untuk generate informasi teknis: {project_name}")
         
         try:
-            response = self.client.generate_content(prompt)
+            response = self.client.generate_content(
+                prompt,
+                section=self.SECTION,
+                generation_config=self.response_parser.GENERATION_CONFIG,
+                use_cache=use_cache,
+                validate=self._parse_response
+            )
+        except GeminiError:
+            raise
         except Exception as api_err:
             logger.error(f"❌ Error saat memanggil Gemini API: {str(api_err)}")
             raise Exception(f"Error dari Gemini API: {str(api_err)}")
         
-        response_text = self.response_parser.extract_response_text(response)
-        cleaned_text = self.response_parser.clean_response_text(response_text)
-        analysis_data = self.response_parser.parse_json_response(cleaned_text)
-        normalized_data = self.response_parser.validate_and_normalize_informasi_teknis(analysis_data)
+        normalized_data = self._parse_response(response)
+        
+        logger.info(f"✅ Informasi teknis berhasil di-generate untuk project: {project_name}")
+        
+        return normalized_data
+    
+    async def generate_informasi_teknis_async(
+        self,
+        project_name: str,
+        jenis_ikan: str,
+        modal: int,
+        kabupaten_id: str,
+        resiko: str,
+        skor_kelayakan: int,
+        potensi_pasar: str,
+        estimasi_balik_modal: int,
+        kesimpulan_ringkasan: str,
+        lang: float = None,
+        lat: float = None,
+        use_cache: bool = True,
+        on_field: Optional[Callable[[str, Any], None]] = None
+    ) -> Dict[str, Any]:
+        """Generate informasi teknis menggunakan async API Gemini tanpa memakai thread pool
+        
+        Jika `on_field` diberikan, response di-stream dan setiap field top-level dikirim ke
+        `on_field(nama, nilai)` begitu lengkap, sebelum seluruh response selesai.
+        """
+        
+        prompt = self.prompt_builder.build_informasi_teknis_prompt(
+            project_name=project_name,
+            jenis_ikan=jenis_ikan,
+            modal=modal,
+            kabupaten_id=kabupaten_id,
+            resiko=resiko,
+            skor_kelayakan=skor_kelayakan,
+            potensi_pasar=potensi_pasar,
+            estimasi_balik_modal=estimasi_balik_modal,
+            kesimpulan_ringkasan=kesimpulan_ringkasan,
+            lang=lang,
+            lat=lat
+        )
+        
+        logger.info(f"🔍 Mengirim request async ke Gemini API untuk generate informasi teknis: {project_name}")
+        
+        try:
+            if on_field is not None:
+                response = await self.client.generate_content_fields_async(
+                    prompt,
+                    on_event=lambda event: on_field(event.key, event.value),
+                    section=self.SECTION,
+                    generation_config=self.response_parser.GENERATION_CONFIG,
+                    use_cache=use_cache,
+                    validate=self._parse_response
+                )
+            else:
+                response = await self.client.generate_content_async(
+                    prompt,
+                    section=self.SECTION,
+                    generation_config=self.response_parser.GENERATION_CONFIG,
+                    use_cache=use_cache,
+                    validate=self._parse_response
+                )
+        except GeminiError:
+            raise
+        except Exception as api_err:
+            logger.error(f"❌ Error saat memanggil Gemini API: {str(api_err)}")
+            raise Exception(f"Error dari Gemini API: {str(api_err)}")
+        
+        normalized_data = self._parse_response(response)
         
         logger.info(f"✅ Informasi teknis berhasil di-generate untuk project: {project_name}")
         
         return normalized_data
 
+
+@lru_cache()
+def get_informasi_teknis_analyzer() -> InformasiTeknisAnalyzer:
+    """Instance InformasiTeknisAnalyzer tunggal yang dipakai ulang antar request"""
+    return InformasiTeknisAnalyzer()
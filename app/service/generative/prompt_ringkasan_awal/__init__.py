@@ -1,4 +1,4 @@
-from app.service.generative.prompt_ringkasan_awal.project_analyzer import analyze_project_with_gemini, ProjectAnalyzer
+from app.service.generative.prompt_ringkasan_awal.project_analyzer import analyze_project_with_gemini, ProjectAnalyzer, get_project_analyzer
 
-__all__ = ["analyze_project_with_gemini", "ProjectAnalyzer"]
+__all__ = ["analyze_project_with_gemini", "ProjectAnalyzer", "get_project_analyzer"]
 
@@ -1,21 +1,28 @@
 import logging
+from functools import lru_cache
 from typing import Dict, Any
 from app.models.project import JenisIkan, Resiko
-from app.service.generative.prompt_ringkasan_awal.gemini_client import GeminiClient
+from app.service.generative.gemini_client import get_gemini_client
+from app.service.generative.errors import GeminiError, GenerationCancelledError
 from app.service.generative.prompt_ringkasan_awal.context_helper import ContextHelper
 from app.service.generative.prompt_ringkasan_awal.prompt_builder import PromptBuilder
 from app.service.generative.prompt_ringkasan_awal.response_parser import ResponseParser
+from app.service.generative.prompt_ringkasan_awal.similarity_cache import get_similarity_cache
+from app.service.generative.streaming_json import IncrementalJsonParser
 
 logger = logging.getLogger(__name__)
 
 class ProjectAnalyzer:
     """Service utama untuk analisis project menggunakan Gemini AI - FULL AI, tidak ada generate manual"""
     
+    SECTION = "ringkasan"
+    
     def __init__(self):
-        self.client = GeminiClient()
+        self.client = get_gemini_client()
         self.context_helper = ContextHelper()
         self.prompt_builder = PromptBuilder()
         self.response_parser = ResponseParser()
+        self.similarity_cache = get_similarity_cache()
     
     def analyze_project(
         self,
@@ -25,14 +32,24 @@ class ProjectAnalyzer:
         kabupaten_id: str,
         resiko: Resiko,
         lang: float = None,
-        lat: float = None
+        lat: float = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """Menganalisis project menggunakan AI - FULL AI RESPONSE, tidak ada generate manual
         
         Semua hasil (skor_kelayakan, potensi_pasar, estimasi_balik_modal, kesimpulan_ringkasan)
         berasal 100% dari AI response, tidak ada perhitungan manual.
+        Jika ada ringkasan project yang hampir identik di similarity cache, hasil AI
+        sebelumnya dipakai ulang tanpa memanggil Gemini.
         """
         
+        if use_cache and self.similarity_cache is not None:
+            similar_result = self.similarity_cache.lookup(
+                project_name, jenis_ikan, modal, kabupaten_id, resiko, lang=lang, lat=lat
+            )
+            if similar_result is not None:
+                return similar_result
+        
         skala, _ = self.context_helper.get_scale_info(modal)
         lokasi_multiplier = self.context_helper.get_location_context(kabupaten_id)
         ikan_data = self.context_helper.get_fish_context(jenis_ikan)
@@ -46,20 +63,23 @@ class ProjectAnalyzer:
         logger.info(f"🔍 Mengirim request ke Gemini API untuk analisis project: {project_name}")
         
         try:
-            response = self.client.generate_content(prompt)
+            response = self.client.generate_content(
+                prompt,
+                section=self.SECTION,
+                generation_config=self.response_parser.GENERATION_CONFIG,
+                use_cache=use_cache,
+                validate=self.response_parser.parse_analysis_response
+            )
+        except GeminiError:
+            raise
         except Exception as api_err:
             logger.error(f"❌ Error saat memanggil Gemini API: {str(api_err)}")
             raise Exception(f"Error dari Gemini API: {str(api_err)}")
         
-        # Parse dan validasi response dari AI
-        response_text = self.response_parser.extract_response_text(response)
-        cleaned_text = self.response_parser.clean_response_text(response_text)
-        analysis_data = self.response_parser.parse_json_response(cleaned_text)
+        # Parse dan validasi response dari AI (semua data berasal dari AI, tanpa fallback manual)
+        normalized_data = self.response_parser.parse_analysis_response(response)
         
-        # Validasi bahwa semua data berasal dari AI (tanpa fallback manual)
-        normalized_data = self.response_parser.validate_and_normalize_analysis(analysis_data)
-        
-        model_used = self.client.model_name
+        model_used = response.model_name
         
         logger.info(f"✅ Analisis AI berhasil: Skor {normalized_data['skor_kelayakan']}/100, "
                    f"ROI: {normalized_data['estimasi_balik_modal']} bulan, "
@@ -67,7 +87,7 @@ class ProjectAnalyzer:
         
         # PENTING: Semua nilai di bawah ini 100% berasal dari AI response
         # TIDAK ADA perhitungan manual atau generate manual
-        return {
+        result = {
             "skor_kelayakan": normalized_data["skor_kelayakan"],  # 100% dari AI
             "potensi_pasar": normalized_data["potensi_pasar"],  # 100% dari AI
             "estimasi_balik_modal": normalized_data["estimasi_balik_modal"],  # 100% dari AI
@@ -75,6 +95,13 @@ class ProjectAnalyzer:
             "ai_model_used": model_used,
             "ai_analysis_success": True  # Selalu True karena semua dari AI
         }
+        
+        if self.similarity_cache is not None:
+            self.similarity_cache.store_result(
+                project_name, jenis_ikan, modal, kabupaten_id, resiko, result, lang=lang, lat=lat
+            )
+        
+        return result
     
     def analyze_project_stream(
         self,
@@ -84,12 +111,21 @@ class ProjectAnalyzer:
         kabupaten_id: str,
         resiko: Resiko,
         lang: float = None,
-        lat: float = None
+        lat: float = None,
+        use_cache: bool = True
     ):
         """Menganalisis project dengan streaming response untuk mempercepat feedback
         
         Generator yang yield chunks dari response AI secara real-time
         """
+        if use_cache and self.similarity_cache is not None:
+            similar_result = self.similarity_cache.lookup(
+                project_name, jenis_ikan, modal, kabupaten_id, resiko, lang=lang, lat=lat
+            )
+            if similar_result is not None:
+                yield {"type": "result", "data": similar_result, "progress": 100}
+                return
+        
         skala, _ = self.context_helper.get_scale_info(modal)
         lokasi_multiplier = self.context_helper.get_location_context(kabupaten_id)
         ikan_data = self.context_helper.get_fish_context(jenis_ikan)
@@ -107,14 +143,23 @@ class ProjectAnalyzer:
             yield {"type": "status", "message": "Mengirim request ke AI...", "progress": 10}
             
             # Generate dengan streaming
-            stream = self.client.generate_content_stream(prompt)
+            stream = self.client.generate_content_stream(
+                prompt,
+                section=self.SECTION,
+                generation_config=self.response_parser.GENERATION_CONFIG,
+                use_cache=use_cache,
+                validate=self.response_parser.parse_analysis_response
+            )
             
             yield {"type": "status", "message": "Menerima response dari AI...", "progress": 30}
             
-            # Kumpulkan semua chunks
-            full_text = ""
+            # Kumpulkan chunk lewat parser bertahap; field yang sudah lengkap langsung dikirim
+            parser = IncrementalJsonParser()
             chunk_count = 0
+            model_used = None
             for chunk in stream:
+                # Model yang benar-benar melayani request (hasil routing per section)
+                model_used = getattr(chunk, 'model_name', None) or model_used
                 chunk_text = ""
                 # Handle berbagai format chunk dari Gemini
                 if hasattr(chunk, 'text'):
@@ -129,20 +174,21 @@ class ProjectAnalyzer:
                     continue
                 
                 if chunk_text:
-                    full_text += chunk_text
                     chunk_count += 1
+                    events = parser.feed(chunk_text)
                     # Yield setiap chunk untuk real-time update (throttle untuk performa)
                     if chunk_count % 3 == 0:  # Yield setiap 3 chunks untuk mengurangi overhead
                         yield {"type": "chunk", "text": chunk_text, "progress": 50, "chunk_count": chunk_count}
+                    for event in events:
+                        yield {"type": "field", "key": event.key, "value": event.value, "progress": 60}
             
             yield {"type": "status", "message": "Memproses response...", "progress": 70}
             
             # Parse dan validasi response
-            cleaned_text = self.response_parser.clean_response_text(full_text)
-            analysis_data = self.response_parser.parse_json_response(cleaned_text)
+            analysis_data = self.response_parser.parse_json_response(parser.text)
             normalized_data = self.response_parser.validate_and_normalize_analysis(analysis_data)
             
-            model_used = self.client.model_name
+            model_used = model_used or "unknown"
             
             yield {"type": "status", "message": "Menyelesaikan analisis...", "progress": 90}
             
@@ -159,10 +205,18 @@ class ProjectAnalyzer:
                 },
                 "progress": 100
             }
+            
+            if self.similarity_cache is not None:
+                self.similarity_cache.store_result(
+                    project_name, jenis_ikan, modal, kabupaten_id, resiko, result["data"], lang=lang, lat=lat
+                )
+            
             yield result
             
             logger.info(f"✅ Streaming analisis AI berhasil: Skor {normalized_data['skor_kelayakan']}/100")
             
+        except GenerationCancelledError:
+            raise
         except Exception as api_err:
             logger.error(f"❌ Error saat streaming dari Gemini API: {str(api_err)}")
             yield {
@@ -173,6 +227,12 @@ class ProjectAnalyzer:
             raise
 
 
+@lru_cache()
+def get_project_analyzer() -> ProjectAnalyzer:
+    """Instance ProjectAnalyzer tunggal yang dipakai ulang antar request"""
+    return ProjectAnalyzer()
+
+
 # Function untuk backward compatibility
 def analyze_project_with_gemini(
     project_name: str,
@@ -181,11 +241,12 @@ def analyze_project_with_gemini(
     kabupaten_id: str,
     resiko: Resiko,
     lang: float = None,
-    lat: float = None
+    lat: float = None,
+    use_cache: bool = True
 ) -> Dict[str, Any]:
     """Function wrapper untuk backward compatibility dengan kode lama"""
-    analyzer = ProjectAnalyzer()
+    analyzer = get_project_analyzer()
     return analyzer.analyze_project(
-        project_name, jenis_ikan, modal, kabupaten_id, resiko, lang=lang, lat=lat
+        project_name, jenis_ikan, modal, kabupaten_id, resiko, lang=lang, lat=lat, use_cache=use_cache
     )
 
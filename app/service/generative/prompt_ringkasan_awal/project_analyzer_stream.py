@@ -3,18 +3,21 @@ import json
 import asyncio
 from typing import AsyncGenerator, Dict, Any
 from app.models.project import JenisIkan, Resiko
-from app.service.generative.prompt_ringkasan_awal.gemini_client import GeminiClient
+from app.service.generative.gemini_client import get_gemini_client
 from app.service.generative.prompt_ringkasan_awal.context_helper import ContextHelper
 from app.service.generative.prompt_ringkasan_awal.prompt_builder import PromptBuilder
 from app.service.generative.prompt_ringkasan_awal.response_parser import ResponseParser
+from app.service.generative.streaming_json import IncrementalJsonParser
 
 logger = logging.getLogger(__name__)
 
 class ProjectAnalyzerStream:
     """Service untuk analisis project dengan streaming response"""
     
+    SECTION = "ringkasan"
+    
     def __init__(self):
-        self.client = GeminiClient()
+        self.client = get_gemini_client()
         self.context_helper = ContextHelper()
         self.prompt_builder = PromptBuilder()
         self.response_parser = ResponseParser()
@@ -27,7 +30,8 @@ class ProjectAnalyzerStream:
         kabupaten_id: str,
         resiko: Resiko,
         lang: float = None,
-        lat: float = None
+        lat: float = None,
+        use_cache: bool = True
     ):
         """Menganalisis project dengan streaming response
         
@@ -52,32 +56,41 @@ class ProjectAnalyzerStream:
             # 2. Kirim status "analyzing"
             yield f"data: {json.dumps({'status': 'analyzing', 'message': 'Sedang menganalisis project...'})}\n\n"
             
-            # 3. Stream response dari Gemini
-            full_response = ""
+            # 3. Stream response dari Gemini; field yang sudah lengkap dikirim tanpa menunggu stream selesai
+            parser = IncrementalJsonParser()
             try:
-                response_stream = self.client.generate_content_stream(prompt)
+                response_stream = self.client.generate_content_stream(
+                    prompt,
+                    section=self.SECTION,
+                    generation_config=self.response_parser.GENERATION_CONFIG,
+                    use_cache=use_cache,
+                    validate=self.response_parser.parse_analysis_response
+                )
                 
                 # Stream setiap chunk
+                model_used = None
                 for chunk in response_stream:
+                    model_used = getattr(chunk, 'model_name', None) or model_used
+                    texts = []
                     if hasattr(chunk, 'text') and chunk.text:
-                        full_response += chunk.text
-                        # Kirim chunk ke client (untuk live preview)
-                        yield f"data: {json.dumps({'status': 'streaming', 'chunk': chunk.text})}\n\n"
+                        texts.append(chunk.text)
                     elif hasattr(chunk, 'parts') and chunk.parts:
-                        for part in chunk.parts:
-                            if hasattr(part, 'text') and part.text:
-                                full_response += part.text
-                                yield f"data: {json.dumps({'status': 'streaming', 'chunk': part.text})}\n\n"
+                        texts.extend(part.text for part in chunk.parts if hasattr(part, 'text') and part.text)
+                    
+                    for text in texts:
+                        # Kirim chunk ke client (untuk live preview)
+                        yield f"data: {json.dumps({'status': 'streaming', 'chunk': text})}\n\n"
+                        for event in parser.feed(text):
+                            yield f"data: {json.dumps({'status': 'field', 'key': event.key, 'value': event.value})}\n\n"
                 
                 # 4. Parse response lengkap
                 yield f"data: {json.dumps({'status': 'parsing', 'message': 'Memproses hasil analisis...'})}\n\n"
                 
-                cleaned_text = self.response_parser.clean_response_text(full_response)
-                analysis_data = self.response_parser.parse_json_response(cleaned_text)
+                analysis_data = self.response_parser.parse_json_response(parser.text)
                 
                 # 5. Validasi dan normalisasi
                 normalized_data = self.response_parser.validate_and_normalize_analysis(analysis_data)
-                model_used = self.client.model_name
+                model_used = model_used or "unknown"
                 
                 # 6. Kirim hasil final
                 final_result = {
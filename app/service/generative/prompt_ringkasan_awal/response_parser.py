@@ -1,13 +1,24 @@
-import json
-import re
 import logging
 from typing import Dict, Any
+from app.service.generative.response_schema import INTEGER, STRING, decode_json_object, json_generation_config, object_schema
 
 logger = logging.getLogger(__name__)
 
+# Field wajib ringkasan awal beserta tipenya; sumber validasi dan response schema
+RINGKASAN_FIELDS = {
+    "skor_kelayakan": INTEGER,
+    "potensi_pasar": STRING,
+    "estimasi_balik_modal": INTEGER,
+    "kesimpulan_ringkasan": STRING,
+}
+
+RESPONSE_SCHEMA = object_schema(RINGKASAN_FIELDS)
+
 class ResponseParser:
     """Kelas untuk parsing dan validasi response dari Gemini API"""
     
+    GENERATION_CONFIG = json_generation_config(RESPONSE_SCHEMA)
+    
     @staticmethod
     def extract_response_text(response) -> str:
         """Extract text dari response Gemini dengan berbagai format"""
@@ -29,63 +40,10 @@ class ResponseParser:
         
         return response_text.strip()
     
-    @staticmethod
-    def clean_response_text(response_text: str) -> str:
-        """Membersihkan response text dari markdown dan whitespace"""
-        response_text = response_text.strip()
-        
-        # Log raw response untuk debugging
-        logger.debug(f"Raw response dari Gemini (first 500 chars): {response_text[:500]}")
-        
-        if not response_text:
-            raise ValueError("Response text dari Gemini API kosong")
-        
-        # Clean response - remove markdown code blocks if present
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]  # Remove ```json
-        elif response_text.startswith("```"):
-            response_text = response_text[3:]  # Remove ```
-        
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]  # Remove closing ```
-        
-        response_text = response_text.strip()
-        
-        # Cari JSON object dalam response (jika ada text tambahan)
-        if "{" in response_text and "}" in response_text:
-            start_idx = response_text.find("{")
-            end_idx = response_text.rfind("}") + 1
-            response_text = response_text[start_idx:end_idx]
-        
-        # Validasi response tidak kosong
-        if not response_text or len(response_text) < 10:
-            logger.error(f"Response text terlalu pendek atau kosong setelah cleaning: {response_text}")
-            raise ValueError("Response dari Gemini API tidak valid atau kosong")
-        
-        return response_text.strip()
-    
     @staticmethod
     def parse_json_response(response_text: str) -> Dict[str, Any]:
-        """Parse JSON dari response text dengan error handling"""
-        try:
-            analysis_data = json.loads(response_text)
-            return analysis_data
-        except json.JSONDecodeError as json_err:
-            logger.error(f"❌ Error parsing JSON dari Gemini:")
-            logger.error(f"Response text: {response_text[:1000]}")
-            logger.error(f"JSON Error: {str(json_err)}")
-            
-            # Coba extract JSON menggunakan regex sebagai fallback
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                try:
-                    analysis_data = json.loads(json_match.group(0))
-                    logger.info("✅ Berhasil extract JSON menggunakan regex fallback")
-                    return analysis_data
-                except:
-                    raise ValueError(f"Gagal parsing JSON dari Gemini API. Response tidak valid: {response_text[:200]}")
-            else:
-                raise ValueError(f"Tidak ditemukan JSON valid dalam response Gemini API: {response_text[:200]}")
+        """Decode JSON dari response structured output"""
+        return decode_json_object(response_text)
     
     @staticmethod
     def validate_and_normalize_analysis(analysis_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -97,8 +55,7 @@ class ResponseParser:
         """
         
         # Validasi bahwa semua field yang diperlukan ada dari AI
-        required_fields = ["skor_kelayakan", "potensi_pasar", "estimasi_balik_modal", "kesimpulan_ringkasan"]
-        missing_fields = [field for field in required_fields if field not in analysis_data or analysis_data[field] is None]
+        missing_fields = [field for field in RINGKASAN_FIELDS if field not in analysis_data or analysis_data[field] is None]
         
         if missing_fields:
             raise ValueError(
@@ -150,3 +107,10 @@ class ResponseParser:
             "kesimpulan_ringkasan": kesimpulan_ringkasan  # Dari AI
         }
 
+    
+    @staticmethod
+    def parse_analysis_response(response) -> Dict[str, Any]:
+        """Extract, decode, dan validasi response analisis; dipakai juga sebagai validasi sebelum response di-cache"""
+        response_text = ResponseParser.extract_response_text(response)
+        analysis_data = ResponseParser.parse_json_response(response_text)
+        return ResponseParser.validate_and_normalize_analysis(analysis_data)
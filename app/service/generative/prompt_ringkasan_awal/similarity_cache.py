@@ -0,0 +1,235 @@
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+from app.config import get_settings
+from app.models.project import JenisIkan, Resiko
+from app.service.generative.metrics import metrics
+from app.service.generative.vector_store import VectorStore, create_vector_store
+
+logger = logging.getLogger(__name__)
+
+# Batas atas bucket modal (Rupiah); modal di atas batas terakhir masuk bucket paling akhir
+MODAL_BUCKETS = [10_000_000, 20_000_000, 30_000_000, 50_000_000, 75_000_000, 100_000_000, 150_000_000, 250_000_000]
+KABUPATEN_HASH_DIM = 32
+# Titik tengah Sumatera Barat sebagai acuan koordinat
+CENTER_LAT, CENTER_LANG = -0.95, 100.35
+COORD_WEIGHT = 0.5
+
+JENIS_IKAN_VALUES = [item.value for item in JenisIkan]
+RESIKO_VALUES = [item.value for item in Resiko]
+
+EMBEDDING_DIM = len(JENIS_IKAN_VALUES) + len(MODAL_BUCKETS) + 1 + KABUPATEN_HASH_DIM + len(RESIKO_VALUES) + 2
+
+
+def _enum_value(value) -> str:
+    return value.value if hasattr(value, "value") else str(value)
+
+
+def _modal_bucket(modal: int) -> int:
+    for idx, upper in enumerate(MODAL_BUCKETS):
+        if modal < upper:
+            return idx
+    return len(MODAL_BUCKETS)
+
+
+def _normalize_kabupaten(kabupaten_id: str) -> str:
+    return " ".join(kabupaten_id.strip().lower().split())
+
+
+def _kabupaten_slot(kabupaten_id: str) -> int:
+    digest = hashlib.md5(_normalize_kabupaten(kabupaten_id).encode("utf-8")).digest()
+    return int.from_bytes(digest[:4], "big") % KABUPATEN_HASH_DIM
+
+
+def embed_project_parameters(
+    jenis_ikan,
+    modal: int,
+    kabupaten_id: str,
+    resiko,
+    lang: Optional[float] = None,
+    lat: Optional[float] = None
+) -> List[float]:
+    """Embedding deterministik dari parameter project yang sudah dinormalisasi
+
+    One-hot untuk jenis ikan, bucket modal, kabupaten (hashed) dan resiko, ditambah
+    offset koordinat dari titik tengah Sumatera Barat. Project yang hanya berbeda
+    sedikit lokasi/koordinatnya menghasilkan cosine similarity mendekati 1.
+    """
+    vector = [0.0] * EMBEDDING_DIM
+    offset = 0
+
+    jenis_ikan_value = _enum_value(jenis_ikan)
+    if jenis_ikan_value in JENIS_IKAN_VALUES:
+        vector[offset + JENIS_IKAN_VALUES.index(jenis_ikan_value)] = 1.0
+    offset += len(JENIS_IKAN_VALUES)
+
+    vector[offset + _modal_bucket(modal)] = 1.0
+    offset += len(MODAL_BUCKETS) + 1
+
+    vector[offset + _kabupaten_slot(kabupaten_id)] = 1.0
+    offset += KABUPATEN_HASH_DIM
+
+    resiko_value = _enum_value(resiko)
+    if resiko_value in RESIKO_VALUES:
+        vector[offset + RESIKO_VALUES.index(resiko_value)] = 1.0
+    offset += len(RESIKO_VALUES)
+
+    if lang is not None and lat is not None:
+        # Dibatasi supaya koordinat yang salah/jauh tidak mendominasi vector
+        vector[offset] = max(-1.0, min(1.0, (lat - CENTER_LAT) * COORD_WEIGHT))
+        vector[offset + 1] = max(-1.0, min(1.0, (lang - CENTER_LANG) * COORD_WEIGHT))
+
+    return vector
+
+
+class RingkasanSimilarityCache:
+    """Similarity cache ringkasan_awal: pakai ulang hasil analisis project yang hampir identik
+
+    Embedding hanya membedakan bucket modal, sedangkan skor_kelayakan dan estimasi_balik_modal
+    dihitung untuk modal tertentu. Karena itu hit juga harus punya modal dalam
+    `modal_tolerance` (selisih relatif) dari modal project baru. Slot kabupaten di embedding
+    di-hash sehingga beberapa kabupaten berbagi slot (mis. Padang dan Padang Pariaman);
+    kabupaten, jenis ikan dan resiko hit dibandingkan langsung dengan payload yang tersimpan.
+    """
+
+    def __init__(
+        self,
+        store: VectorStore,
+        threshold: float,
+        personalize: bool = True,
+        modal_tolerance: float = 0.05,
+        search_limit: int = 5
+    ):
+        self.store = store
+        self.threshold = threshold
+        self.personalize = personalize
+        self.modal_tolerance = modal_tolerance
+        self.search_limit = search_limit
+
+    @staticmethod
+    def _categories_match(payload: Dict[str, Any], jenis_ikan, kabupaten_id: str, resiko) -> bool:
+        stored_kabupaten = payload.get("kabupaten_id")
+        return (
+            stored_kabupaten is not None
+            and _normalize_kabupaten(stored_kabupaten) == _normalize_kabupaten(kabupaten_id)
+            and payload.get("jenis_ikan") == _enum_value(jenis_ikan)
+            and payload.get("resiko") == _enum_value(resiko)
+        )
+
+    def _modal_matches(self, payload: Dict[str, Any], modal: int) -> bool:
+        stored_modal = payload.get("modal")
+        if stored_modal is None:
+            return False
+        return abs(stored_modal - modal) <= self.modal_tolerance * max(abs(modal), 1)
+
+    @staticmethod
+    def _personalize(result: Dict[str, Any], payload: Dict[str, Any], project_name: str, modal: int) -> Dict[str, Any]:
+        """Ganti nama project dan nominal modal lama di kesimpulan dengan milik project baru"""
+        kesimpulan = result["kesimpulan_ringkasan"]
+        old_name = payload.get("project_name")
+        if old_name and old_name != project_name:
+            kesimpulan = kesimpulan.replace(old_name, project_name)
+
+        old_modal = payload.get("modal")
+        if old_modal and old_modal != modal:
+            kesimpulan = kesimpulan.replace(f"{old_modal:,}", f"{modal:,}")
+            kesimpulan = kesimpulan.replace(f"{old_modal:,}".replace(",", "."), f"{modal:,}".replace(",", "."))
+
+        return {**result, "kesimpulan_ringkasan": kesimpulan}
+
+    def lookup(
+        self,
+        project_name: str,
+        jenis_ikan,
+        modal: int,
+        kabupaten_id: str,
+        resiko,
+        lang: Optional[float] = None,
+        lat: Optional[float] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Cari ringkasan sebelumnya dengan similarity di atas threshold"""
+        vector = embed_project_parameters(jenis_ikan, modal, kabupaten_id, resiko, lang=lang, lat=lat)
+        try:
+            hits = self.store.search(vector, limit=self.search_limit)
+        except Exception as e:
+            logger.warning(f"⚠️ Gagal mencari similarity cache: {e}")
+            return None
+
+        candidates = [
+            (score, payload) for score, payload in hits
+            if score >= self.threshold and self._categories_match(payload, jenis_ikan, kabupaten_id, resiko)
+        ]
+        match = next(((score, payload) for score, payload in candidates if self._modal_matches(payload, modal)), None)
+        if match is None:
+            if len(candidates) < sum(score >= self.threshold for score, _ in hits):
+                metrics.incr("similarity_category_mismatch", "ringkasan")
+            if candidates:
+                metrics.incr("similarity_modal_mismatch", "ringkasan")
+            metrics.incr("similarity_miss", "ringkasan")
+            return None
+
+        score, payload = match
+        metrics.incr("similarity_hit", "ringkasan")
+        logger.info(f"♻️ Memakai ringkasan serupa (similarity {score:.4f}) untuk project: {project_name}")
+
+        result = dict(payload["result"])
+        if self.personalize:
+            result = self._personalize(result, payload, project_name, modal)
+        return result
+
+    def store_result(
+        self,
+        project_name: str,
+        jenis_ikan,
+        modal: int,
+        kabupaten_id: str,
+        resiko,
+        result: Dict[str, Any],
+        lang: Optional[float] = None,
+        lat: Optional[float] = None
+    ):
+        """Simpan hasil analisis AI supaya bisa dipakai project serupa berikutnya"""
+        vector = embed_project_parameters(jenis_ikan, modal, kabupaten_id, resiko, lang=lang, lat=lat)
+        # Modal dan kabupaten ikut menentukan id supaya project satu bucket modal atau satu slot
+        # kabupaten tidak saling menimpa
+        point_id = hashlib.sha256(repr((vector, modal, _normalize_kabupaten(kabupaten_id))).encode("utf-8")).hexdigest()
+        try:
+            self.store.upsert(point_id, vector, {
+                "project_name": project_name,
+                "modal": modal,
+                "kabupaten_id": kabupaten_id,
+                "jenis_ikan": _enum_value(jenis_ikan),
+                "resiko": _enum_value(resiko),
+                "result": result
+            })
+        except Exception as e:
+            logger.warning(f"⚠️ Gagal menyimpan similarity cache: {e}")
+
+
+@lru_cache()
+def get_similarity_cache() -> Optional[RingkasanSimilarityCache]:
+    """Instance similarity cache tunggal, None jika dinonaktifkan atau backend gagal dibuat"""
+    settings = get_settings()
+    if not settings.similarity_cache_enabled:
+        return None
+
+    try:
+        store = create_vector_store(
+            backend=settings.vector_store_backend,
+            dimension=EMBEDDING_DIM,
+            collection_name=settings.similarity_collection_name,
+            max_entries=settings.similarity_cache_max_entries,
+            qdrant_url=settings.qdrant_url
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Similarity cache dinonaktifkan, vector store gagal dibuat: {e}")
+        return None
+
+    return RingkasanSimilarityCache(
+        store=store,
+        threshold=settings.similarity_threshold,
+        personalize=settings.similarity_cache_personalize,
+        modal_tolerance=settings.similarity_modal_tolerance,
+        search_limit=settings.similarity_search_limit
+    )
@@ -1,4 +1,4 @@
-from app.service.generative.prompt_roadmap.analyzer import RoadmapAnalyzer
+from app.service.generative.prompt_roadmap.analyzer import RoadmapAnalyzer, get_roadmap_analyzer
 
 def generate_roadmap_with_gemini(
     project_name: str,
@@ -13,10 +13,11 @@ def generate_roadmap_with_gemini(
     informasi_teknis: dict,
     analisis_financial: dict,
     lang: float = None,
-    lat: float = None
+    lat: float = None,
+    use_cache: bool = True
 ):
     """Helper function untuk generate roadmap dengan Gemini"""
-    analyzer = RoadmapAnalyzer()
+    analyzer = get_roadmap_analyzer()
     return analyzer.generate_roadmap(
         project_name=project_name,
         jenis_ikan=jenis_ikan,
@@ -30,6 +31,41 @@ def generate_roadmap_with_gemini(
         informasi_teknis=informasi_teknis,
         analisis_financial=analisis_financial,
         lang=lang,
-        lat=lat
+        lat=lat,
+        use_cache=use_cache
     )
 
+async def generate_roadmap_async(
+    project_name: str,
+    jenis_ikan: str,
+    modal: int,
+    kabupaten_id: str,
+    resiko: str,
+    skor_kelayakan: int,
+    potensi_pasar: str,
+    estimasi_balik_modal: int,
+    kesimpulan_ringkasan: str,
+    informasi_teknis: dict,
+    analisis_financial: dict,
+    lang: float = None,
+    lat: float = None,
+    use_cache: bool = True
+):
+    """Helper async untuk generate roadmap dengan Gemini tanpa thread pool"""
+    analyzer = get_roadmap_analyzer()
+    return await analyzer.generate_roadmap_async(
+        project_name=project_name,
+        jenis_ikan=jenis_ikan,
+        modal=modal,
+        kabupaten_id=kabupaten_id,
+        resiko=resiko,
+        skor_kelayakan=skor_kelayakan,
+        potensi_pasar=potensi_pasar,
+        estimasi_balik_modal=estimasi_balik_modal,
+        kesimpulan_ringkasan=kesimpulan_ringkasan,
+        informasi_teknis=informasi_teknis,
+        analisis_financial=analisis_financial,
+        lang=lang,
+        lat=lat,
+        use_cache=use_cache
+    )
@@ -1,6 +1,9 @@
 import logging
+from functools import lru_cache
 from typing import Dict, Any
-from app.service.generative.prompt_roadmap.gemini_client import GeminiClient
+from app.config import get_settings
+from app.service.generative.gemini_client import get_gemini_client
+from app.service.generative.errors import GeminiError
 from app.service.generative.prompt_roadmap.prompt_builder import PromptBuilder
 from app.service.generative.prompt_roadmap.response_parser import ResponseParser
 
@@ -9,10 +12,19 @@ logger = logging.getLogger(__name__)
 class RoadmapAnalyzer:
     """Service untuk generate roadmap menggunakan Gemini AI"""
     
+    SECTION = "roadmap"
+    
     def __init__(self):
-        self.client = GeminiClient()
+        self.client = get_gemini_client()
         self.prompt_builder = PromptBuilder()
         self.response_parser = ResponseParser()
+        self.compact_prompt = get_settings().llm_prompt_compaction
+    
+    def _parse_response(self, response) -> Dict[str, Any]:
+        """Extract, parse, dan validasi response roadmap dari Gemini"""
+        response_text = self.response_parser.extract_response_text(response)
+        analysis_data = self.response_parser.parse_json_response(response_text)
+        return self.response_parser.validate_and_normalize_roadmap(analysis_data)
     
     def generate_roadmap(
         self,
@@ -28,7 +40,8 @@ class RoadmapAnalyzer:
         informasi_teknis: dict,
         analisis_financial: dict,
         lang: float = None,
-        lat: float = None
+        lat: float = None,
+        use_cache: bool = True
     ) -> Dict[str, Any]:
         """Generate roadmap menggunakan AI"""
         
@@ -45,23 +58,92 @@ class RoadmapAnalyzer:
             informasi_teknis=informasi_teknis,
             analisis_financial=analisis_financial,
             lang=lang,
-            lat=lat
+            lat=lat,
+            compact=self.compact_prompt
         )
         
         logger.info(f"🔍 Mengirim request ke Gemini API untuk generate roadmap: {project_name}")
         
         try:
-            response = self.client.generate_content(prompt)
+            response = self.client.generate_content(
+                prompt,
+                section=self.SECTION,
+                generation_config=self.response_parser.GENERATION_CONFIG,
+                use_cache=use_cache,
+                validate=self._parse_response
+            )
+        except GeminiError:
+            raise
         except Exception as api_err:
             logger.error(f"❌ Error saat memanggil Gemini API: {str(api_err)}")
             raise Exception(f"Error dari Gemini API: {str(api_err)}")
         
-        response_text = self.response_parser.extract_response_text(response)
-        cleaned_text = self.response_parser.clean_response_text(response_text)
-        analysis_data = self.response_parser.parse_json_response(cleaned_text)
-        normalized_data = self.response_parser.validate_and_normalize_roadmap(analysis_data)
+        normalized_data = self._parse_response(response)
+        
+        logger.info(f"✅ Roadmap berhasil di-generate untuk project: {project_name}")
+        
+        return normalized_data
+    
+    async def generate_roadmap_async(
+        self,
+        project_name: str,
+        jenis_ikan: str,
+        modal: int,
+        kabupaten_id: str,
+        resiko: str,
+        skor_kelayakan: int,
+        potensi_pasar: str,
+        estimasi_balik_modal: int,
+        kesimpulan_ringkasan: str,
+        informasi_teknis: dict,
+        analisis_financial: dict,
+        lang: float = None,
+        lat: float = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """Generate roadmap menggunakan async API Gemini tanpa memakai thread pool"""
+        
+        prompt = self.prompt_builder.build_roadmap_prompt(
+            project_name=project_name,
+            jenis_ikan=jenis_ikan,
+            modal=modal,
+            kabupaten_id=kabupaten_id,
+            resiko=resiko,
+            skor_kelayakan=skor_kelayakan,
+            potensi_pasar=potensi_pasar,
+            estimasi_balik_modal=estimasi_balik_modal,
+            kesimpulan_ringkasan=kesimpulan_ringkasan,
+            informasi_teknis=informasi_teknis,
+            analisis_financial=analisis_financial,
+            lang=lang,
+            lat=lat,
+            compact=self.compact_prompt
+        )
+        
+        logger.info(f"🔍 Mengirim request async ke Gemini API untuk generate roadmap: {project_name}")
+        
+        try:
+            response = await self.client.generate_content_async(
+                prompt,
+                section=self.SECTION,
+                generation_config=self.response_parser.GENERATION_CONFIG,
+                use_cache=use_cache,
+                validate=self._parse_response
+            )
+        except GeminiError:
+            raise
+        except Exception as api_err:
+            logger.error(f"❌ Error saat memanggil Gemini API: {str(api_err)}")
+            raise Exception(f"Error dari Gemini API: {str(api_err)}")
+        
+        normalized_data = self._parse_response(response)
         
         logger.info(f"✅ Roadmap berhasil di-generate untuk project: {project_name}")
         
         return normalized_data
 
+
+@lru_cache()
+def get_roadmap_analyzer() -> RoadmapAnalyzer:
+    """Instance RoadmapAnalyzer tunggal yang dipakai ulang antar request"""
+    return RoadmapAnalyzer()
@@ -4,6 +4,12 @@ from app.models.ringkasan_awal import PotensiPasar
 class PromptBuilder:
     """Kelas untuk membangun prompt roadmap"""
     
+    # Field section upstream yang dibaca prompt (penuh maupun ringkas), dipakai pipeline analyze
+    INPUT_FIELDS = {
+        "informasi_teknis": ("spesifikasiKolam", "spesifikasiBenih", "spesifikasiPakan", "kualitasAir"),
+        "analisis_financial": ("analisisROI",)
+    }
+    
     @staticmethod
     def build_roadmap_prompt(
         project_name: str,
@@ -18,7 +24,8 @@ class PromptBuilder:
         informasi_teknis: dict,
         analisis_financial: dict,
         lang: float = None,
-        lat: float = None
+        lat: float = None,
+        compact: bool = False
     ) -> str:
         """Membangun prompt untuk generate roadmap"""
         
@@ -29,6 +36,19 @@ class PromptBuilder:
         siklus_info = analisis_financial.get("analisisROI", {})
         lama_siklus = siklus_info.get("lamaSiklus", "2.5 bulan")
         
+        if compact:
+            return PromptBuilder.build_roadmap_prompt_compact(
+                project_name=project_name,
+                jenis_ikan=jenis_ikan,
+                modal=modal,
+                kabupaten_id=kabupaten_id,
+                lama_siklus=lama_siklus,
+                kolam_info=kolam_info,
+                benih_info=benih_info,
+                pakan_info=pakan_info,
+                kualitas_air=informasi_teknis.get("kualitasAir", {})
+            )
+        
         return f"""
 Anda adalah ahli budidaya ikan profesional dengan pengalaman 15+ tahun. Berdasarkan informasi project, informasi teknis, dan analisis financial berikut, buatkan roadmap/langkah-langkah budidaya yang DETIL dan REALISTIS:
 
@@ -101,4 +121,31 @@ Format JSON:
 
 Sekarang buatkan roadmap yang DETIL dan REALISTIS untuk project ini!
 """
+    
+    @staticmethod
+    def build_roadmap_prompt_compact(
+        project_name: str,
+        jenis_ikan: str,
+        modal: int,
+        kabupaten_id: str,
+        lama_siklus: str,
+        kolam_info: dict,
+        benih_info: dict,
+        pakan_info: dict,
+        kualitas_air: dict
+    ) -> str:
+        """Prompt ringkas: hanya field upstream yang dipakai, struktur output dijamin response schema"""
+        return f"""Anda ahli budidaya ikan. Buat roadmap budidaya DETIL dan REALISTIS dalam JSON sesuai schema.
 
+Project: {project_name}; {jenis_ikan}; modal Rp {modal:,}; {kabupaten_id}, Sumatera Barat; lama siklus {lama_siklus}.
+Kolam: {kolam_info.get('jenis', 'N/A')}, {kolam_info.get('ukuran', 'N/A')}, {kolam_info.get('jumlahKolam', 'N/A')} unit.
+Benih: {benih_info.get('jenis', 'N/A')}, {benih_info.get('jumlah', 'N/A')} ekor, ukuran {benih_info.get('ukuran', 'N/A')}.
+Pakan: {pakan_info.get('jenis', 'N/A')}, protein {pakan_info.get('protein', 'N/A')}, {pakan_info.get('frekuensiPemberian', 'N/A')}.
+Air: pH {kualitas_air.get('pH', 'N/A')}, suhu {kualitas_air.get('suhu', 'N/A')}.
+
+Ketentuan:
+1. response.judul sesuai jenis ikan dan lama siklus; response.detail ringkas.
+2. response.list berisi 5-8 step berurutan (step mulai 1): persiapan kolam, pengisian air & kualitas, tebar benih, manajemen pakan, monitoring, kesehatan, panen.
+3. Setiap deskripsi 2-3 kalimat, SPESIFIK memakai data teknis di atas, estimasi waktu sesuai {lama_siklus}.
+4. request null, step 1, isRequest false, roadmapId null.
+"""
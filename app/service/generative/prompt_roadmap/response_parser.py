@@ -1,13 +1,32 @@
-import json
-import re
 import logging
 from typing import Dict, Any
+from app.service.generative.response_schema import BOOLEAN, NUMBER, STRING, array_schema, decode_json_object, field_schema, json_generation_config, object_schema
 
 logger = logging.getLogger(__name__)
 
+# Field wajib roadmap dan tiap step beserta tipenya; sumber validasi dan response schema
+ROADMAP_RESPONSE_FIELDS = {"judul": STRING, "detail": STRING}
+ROADMAP_STEP_FIELDS = {"step": NUMBER, "title": STRING, "deskripsi": STRING}
+
+RESPONSE_SCHEMA = object_schema(
+    {
+        "response": object_schema({
+            **ROADMAP_RESPONSE_FIELDS,
+            "list": array_schema(object_schema(ROADMAP_STEP_FIELDS))
+        }),
+        "request": field_schema(STRING, nullable=True),
+        "step": NUMBER,
+        "isRequest": BOOLEAN,
+        "roadmapId": field_schema(STRING, nullable=True)
+    },
+    required=["response"]
+)
+
 class ResponseParser:
     """Kelas untuk parsing dan validasi response dari Gemini API untuk roadmap"""
     
+    GENERATION_CONFIG = json_generation_config(RESPONSE_SCHEMA)
+    
     @staticmethod
     def extract_response_text(response) -> str:
         """Extract text dari response Gemini dengan berbagai format"""
@@ -28,58 +47,10 @@ class ResponseParser:
         
         return response_text.strip()
     
-    @staticmethod
-    def clean_response_text(response_text: str) -> str:
-        """Membersihkan response text dari markdown dan whitespace"""
-        response_text = response_text.strip()
-        
-        logger.debug(f"Raw response dari Gemini (first 500 chars): {response_text[:500]}")
-        
-        if not response_text:
-            raise ValueError("Response text dari Gemini API kosong")
-        
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        elif response_text.startswith("```"):
-            response_text = response_text[3:]
-        
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        
-        response_text = response_text.strip()
-        
-        if "{" in response_text and "}" in response_text:
-            start_idx = response_text.find("{")
-            end_idx = response_text.rfind("}") + 1
-            response_text = response_text[start_idx:end_idx]
-        
-        if not response_text or len(response_text) < 10:
-            logger.error(f"Response text terlalu pendek atau kosong setelah cleaning: {response_text}")
-            raise ValueError("Response dari Gemini API tidak valid atau kosong")
-        
-        return response_text.strip()
-    
     @staticmethod
     def parse_json_response(response_text: str) -> Dict[str, Any]:
-        """Parse JSON dari response text dengan error handling"""
-        try:
-            analysis_data = json.loads(response_text)
-            return analysis_data
-        except json.JSONDecodeError as json_err:
-            logger.error(f"❌ Error parsing JSON dari Gemini:")
-            logger.error(f"Response text: {response_text[:1000]}")
-            logger.error(f"JSON Error: {str(json_err)}")
-            
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                try:
-                    analysis_data = json.loads(json_match.group(0))
-                    logger.info("✅ Berhasil extract JSON menggunakan regex fallback")
-                    return analysis_data
-                except:
-                    raise ValueError(f"Gagal parsing JSON dari Gemini API. Response tidak valid: {response_text[:200]}")
-            else:
-                raise ValueError(f"Tidak ditemukan JSON valid dalam response Gemini API: {response_text[:200]}")
+        """Decode JSON dari response structured output"""
+        return decode_json_object(response_text)
     
     @staticmethod
     def validate_and_normalize_roadmap(analysis_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -94,8 +65,7 @@ class ResponseParser:
         response = analysis_data["response"]
         
         # Validasi required fields di response
-        required_response_fields = ["judul", "detail", "list"]
-        for field in required_response_fields:
+        for field in [*ROADMAP_RESPONSE_FIELDS, "list"]:
             if field not in response:
                 raise ValueError(f"Field response.{field} tidak ditemukan")
         
@@ -112,8 +82,7 @@ class ResponseParser:
             if not isinstance(step, dict):
                 raise ValueError(f"Step {idx + 1} harus berupa object/dictionary")
             
-            required_step_fields = ["step", "title", "deskripsi"]
-            for field in required_step_fields:
+            for field in ROADMAP_STEP_FIELDS:
                 if field not in step:
                     raise ValueError(f"Field list[{idx}].{field} tidak ditemukan")
             
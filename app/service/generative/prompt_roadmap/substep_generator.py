@@ -1,29 +1,34 @@
 import logging
-import json
-import re
+from functools import lru_cache
 from typing import Dict, Any
-from app.service.generative.prompt_roadmap.gemini_client import GeminiClient
+from app.service.generative.gemini_client import get_gemini_client
+from app.service.generative.errors import GeminiError
+from app.service.generative.response_schema import STRING, decode_json_object, json_generation_config, object_schema
 
 logger = logging.getLogger(__name__)
 
+# Field wajib sub-step; sumber validasi dan response schema
+SUBSTEP_FIELDS = {"title": STRING, "deskripsi": STRING}
+
 class SubStepGenerator:
     """Service untuk generate sub-step dari user request menggunakan Gemini AI"""
     
+    SECTION = "substep"
+    GENERATION_CONFIG = json_generation_config(object_schema(SUBSTEP_FIELDS))
+    
     def __init__(self):
-        self.client = GeminiClient()
+        self.client = get_gemini_client()
     
-    def generate_substep_from_request(
-        self,
+    @staticmethod
+    def _build_prompt(
         user_request: str,
         parent_step_title: str,
         parent_step_deskripsi: str,
         project_name: str,
-        jenis_ikan: str,
-        informasi_teknis: dict = None
-    ) -> Dict[str, Any]:
-        """Generate title dan deskripsi sub-step dari user request menggunakan AI"""
-        
-        prompt = f"""
+        jenis_ikan: str
+    ) -> str:
+        """Membangun prompt untuk generate sub-step"""
+        return f"""
 Anda adalah ahli budidaya ikan profesional. User memberikan masukkan/request untuk detail lebih lanjut dari langkah berikut:
 
 **Parent Step:**
@@ -55,15 +60,10 @@ Berdasarkan request/masukkan user di atas, buatkan sub-step yang DETIL dan PRAKT
 
 Sekarang buatkan sub-step berdasarkan request user di atas!
 """
-        
-        logger.info(f"🔍 Mengirim request ke Gemini API untuk generate sub-step dari user request")
-        
-        try:
-            response = self.client.generate_content(prompt)
-        except Exception as api_err:
-            logger.error(f"❌ Error saat memanggil Gemini API: {str(api_err)}")
-            raise Exception(f"Error dari Gemini API: {str(api_err)}")
-        
+    
+    @staticmethod
+    def _parse_response(response) -> Dict[str, Any]:
+        """Extract, parse, dan validasi response sub-step dari Gemini"""
         # Extract response text
         if hasattr(response, 'text'):
             response_text = response.text
@@ -75,49 +75,12 @@ Sekarang buatkan sub-step berdasarkan request user di atas!
         if not response_text:
             raise ValueError("Response text dari Gemini API kosong")
         
-        # Clean response
-        response_text = response_text.strip()
-        
-        # Remove markdown code blocks if present
-        if response_text.startswith("```json"):
-            response_text = response_text[7:]
-        elif response_text.startswith("```"):
-            response_text = response_text[3:]
-        
-        if response_text.endswith("```"):
-            response_text = response_text[:-3]
-        
-        response_text = response_text.strip()
-        
-        # Extract JSON
-        if "{" in response_text and "}" in response_text:
-            start_idx = response_text.find("{")
-            end_idx = response_text.rfind("}") + 1
-            response_text = response_text[start_idx:end_idx]
-        
-        # Parse JSON
-        try:
-            substep_data = json.loads(response_text)
-        except json.JSONDecodeError as json_err:
-            logger.error(f"❌ Error parsing JSON: {str(json_err)}")
-            logger.error(f"Response text: {response_text[:500]}")
-            
-            # Fallback: extract using regex
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
-            if json_match:
-                try:
-                    substep_data = json.loads(json_match.group(0))
-                except:
-                    raise ValueError(f"Gagal parsing JSON dari Gemini API: {response_text[:200]}")
-            else:
-                raise ValueError(f"Tidak ditemukan JSON valid dalam response: {response_text[:200]}")
+        substep_data = decode_json_object(response_text)
         
         # Validate
-        if "title" not in substep_data or not substep_data["title"]:
-            raise ValueError("Title tidak ditemukan dalam response AI")
-        
-        if "deskripsi" not in substep_data or not substep_data["deskripsi"]:
-            raise ValueError("Deskripsi tidak ditemukan dalam response AI")
+        for field in SUBSTEP_FIELDS:
+            if field not in substep_data or not substep_data[field]:
+                raise ValueError(f"{field.capitalize()} tidak ditemukan dalam response AI")
         
         if len(substep_data["deskripsi"]) < 20:
             logger.warning(f"⚠️ Deskripsi terlalu pendek ({len(substep_data['deskripsi'])} karakter)")
@@ -128,4 +91,77 @@ Sekarang buatkan sub-step berdasarkan request user di atas!
             "title": substep_data["title"].strip(),
             "deskripsi": substep_data["deskripsi"].strip()
         }
+    
+    def generate_substep_from_request(
+        self,
+        user_request: str,
+        parent_step_title: str,
+        parent_step_deskripsi: str,
+        project_name: str,
+        jenis_ikan: str,
+        informasi_teknis: dict = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """Generate title dan deskripsi sub-step dari user request menggunakan AI"""
+        
+        prompt = self._build_prompt(
+            user_request, parent_step_title, parent_step_deskripsi, project_name, jenis_ikan
+        )
+        
+        logger.info(f"🔍 Mengirim request ke Gemini API untuk generate sub-step dari user request")
+        
+        try:
+            response = self.client.generate_content(
+                prompt,
+                section=self.SECTION,
+                generation_config=self.GENERATION_CONFIG,
+                use_cache=use_cache,
+                validate=self._parse_response
+            )
+        except GeminiError:
+            raise
+        except Exception as api_err:
+            logger.error(f"❌ Error saat memanggil Gemini API: {str(api_err)}")
+            raise Exception(f"Error dari Gemini API: {str(api_err)}")
+        
+        return self._parse_response(response)
+    
+    async def generate_substep_from_request_async(
+        self,
+        user_request: str,
+        parent_step_title: str,
+        parent_step_deskripsi: str,
+        project_name: str,
+        jenis_ikan: str,
+        informasi_teknis: dict = None,
+        use_cache: bool = True
+    ) -> Dict[str, Any]:
+        """Generate sub-step menggunakan async API Gemini tanpa memakai thread pool"""
+        
+        prompt = self._build_prompt(
+            user_request, parent_step_title, parent_step_deskripsi, project_name, jenis_ikan
+        )
+        
+        logger.info(f"🔍 Mengirim request async ke Gemini API untuk generate sub-step dari user request")
+        
+        try:
+            response = await self.client.generate_content_async(
+                prompt,
+                section=self.SECTION,
+                generation_config=self.GENERATION_CONFIG,
+                use_cache=use_cache,
+                validate=self._parse_response
+            )
+        except GeminiError:
+            raise
+        except Exception as api_err:
+            logger.error(f"❌ Error saat memanggil Gemini API: {str(api_err)}")
+            raise Exception(f"Error dari Gemini API: {str(api_err)}")
+        
+        return self._parse_response(response)
+
 
+@lru_cache()
+def get_substep_generator() -> SubStepGenerator:
+    """Instance SubStepGenerator tunggal yang dipakai ulang antar request"""
+    return SubStepGenerator()
@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Deque, Optional
+from google.api_core import exceptions as google_exceptions
+from app.service.generative.errors import GeminiOverloadedError
+from app.service.generative.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Deteksi error kuota Gemini (HTTP 429 / RESOURCE_EXHAUSTED) dari tipe exception google-api-core
+
+    Pesan error tidak dicocokkan: teks prompt atau nilai yang ikut di pesan (mis. "modal 429000")
+    tidak boleh dianggap throttling.
+    """
+    return isinstance(error, (google_exceptions.ResourceExhausted, google_exceptions.TooManyRequests))
+
+
+class _Waiter:
+    """Satu caller di antrean admission, bisa sync (threading.Event) atau async (Future)"""
+
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.granted = False
+        self.loop = loop
+        self.event = None if loop else threading.Event()
+        self.future = loop.create_future() if loop else None
+
+    def grant(self):
+        self.granted = True
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self):
+        if not self.future.done():
+            self.future.set_result(True)
+
+
+class AdaptiveLimiter:
+    """Limiter concurrency AIMD dengan antrean admission terbatas
+
+    Limit concurrency naik additive (+increase_step per window limit) setiap panggilan sukses
+    dan turun multiplicative (x decrease_factor) saat Gemini membalas 429/RESOURCE_EXHAUSTED,
+    sehingga throughput bertahan di sekitar batas kuota. Caller yang tidak kebagian slot
+    menunggu FIFO di antrean; jika antrean penuh atau waktu tunggu habis, GeminiOverloadedError.
+    Bisa dipakai dari kode sync (thread pool FastAPI) maupun async.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float,
+        min_limit: float,
+        max_limit: float,
+        max_queue: int,
+        queue_timeout: float,
+        increase_step: float = 1.0,
+        decrease_factor: float = 0.5
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = max(min_limit, min(initial_limit, max_limit))
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self._in_flight = 0
+        self._waiters: Deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+        self._publish()
+
+    def _publish(self):
+        metrics.set_gauge("limiter_limit", round(self.limit, 2))
+        metrics.set_gauge("limiter_in_flight", self._in_flight)
+        metrics.set_gauge("limiter_queue_depth", len(self._waiters))
+
+    def _try_acquire_locked(self) -> bool:
+        if not self._waiters and self._in_flight < int(self.limit):
+            self._in_flight += 1
+            return True
+        return False
+
+    def _enqueue_locked(self, waiter: _Waiter, section: str):
+        if len(self._waiters) >= self.max_queue:
+            metrics.incr("admission_rejected", section)
+            raise GeminiOverloadedError("Antrean request AI penuh, silakan coba beberapa saat lagi")
+        self._waiters.append(waiter)
+        self._publish()
+
+    def _wake_locked(self):
+        while self._waiters and self._in_flight < int(self.limit):
+            waiter = self._waiters.popleft()
+            self._in_flight += 1
+            waiter.grant()
+        self._publish()
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Keluarkan waiter dari antrean; return True jika ternyata slot sudah diberikan"""
+        with self._lock:
+            if waiter.granted:
+                return True
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+            self._publish()
+            return False
+
+    def _record_wait(self, started: float, section: str):
+        metrics.observe("queue_wait_ms", (time.monotonic() - started) * 1000, section)
+
+    def _timeout_error(self, section: str) -> GeminiOverloadedError:
+        metrics.incr("admission_timeout", section)
+        return GeminiOverloadedError("Terlalu lama menunggu antrean request AI, silakan coba beberapa saat lagi")
+
+    def has_headroom(self, reserve_ratio: float = 0.0) -> bool:
+        """True jika tidak ada antrean dan slot terpakai masih di bawah (1 - reserve_ratio) x limit
+
+        Dipakai pekerjaan prioritas rendah (mis. prefetch) supaya tidak merebut slot request user.
+        """
+        with self._lock:
+            return not self._waiters and self._in_flight < int(self.limit * (1 - reserve_ratio))
+
+    def acquire(self, section: str = "default"):
+        """Ambil slot secara blocking (dipanggil dari thread)"""
+        started = time.monotonic()
+        with self._lock:
+            if self._try_acquire_locked():
+                self._publish()
+                self._record_wait(started, section)
+                return
+            waiter = _Waiter()
+            self._enqueue_locked(waiter, section)
+
+        if not waiter.event.wait(self.queue_timeout) and not self._abandon(waiter):
+            raise self._timeout_error(section)
+        self._record_wait(started, section)
+
+    async def acquire_async(self, section: str = "default"):
+        """Ambil slot tanpa memblokir event loop"""
+        started = time.monotonic()
+        with self._lock:
+            if self._try_acquire_locked():
+                self._publish()
+                self._record_wait(started, section)
+                return
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._enqueue_locked(waiter, section)
+
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if not self._abandon(waiter):
+                raise self._timeout_error(section)
+        except asyncio.CancelledError:
+            if self._abandon(waiter):
+                self.release()
+            raise
+        self._record_wait(started, section)
+
+    def release(self):
+        with self._lock:
+            self._in_flight = max(0, self._in_flight - 1)
+            self._wake_locked()
+
+    def on_success(self):
+        """Additive increase: +increase_step setelah kira-kira satu window limit sukses"""
+        with self._lock:
+            self.limit = min(self.max_limit, self.limit + self.increase_step / max(self.limit, 1.0))
+            self._wake_locked()
+
+    def on_rate_limited(self, section: str = "default"):
+        """Multiplicative decrease saat kena kuota"""
+        with self._lock:
+            self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+            self._publish()
+        metrics.incr("rate_limited", section)
+        logger.warning(f"⚠️ Gemini rate limited, concurrency diturunkan menjadi {int(self.limit)}")
+
+    def _observe(self, error: Optional[BaseException], section: str):
+        if error is None:
+            self.on_success()
+        elif is_rate_limit_error(error):
+            self.on_rate_limited(section)
+
+    @contextmanager
+    def slot(self, section: str = "default"):
+        """Context manager sync: acquire, catat hasil ke AIMD, release"""
+        self.acquire(section)
+        try:
+            yield
+        except Exception as e:
+            self._observe(e, section)
+            raise
+        else:
+            self._observe(None, section)
+        finally:
+            self.release()
+
+    @asynccontextmanager
+    async def slot_async(self, section: str = "default"):
+        """Context manager async: acquire, catat hasil ke AIMD, release"""
+        await self.acquire_async(section)
+        try:
+            yield
+        except Exception as e:
+            self._observe(e, section)
+            raise
+        else:
+            self._observe(None, section)
+        finally:
+            self.release()
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Optional
+from google.api_core import exceptions as google_exceptions
+from app.service.generative.errors import GeminiSafetyBlockedError
+from app.service.generative.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE = "retryable"
+TERMINAL = "terminal"
+SAFETY = "safety"
+
+# Tipe google-api-core untuk HTTP 429 dan 5xx (termasuk DeadlineExceeded) serta ABORTED
+_RETRYABLE_GOOGLE_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    google_exceptions.BadGateway,
+    google_exceptions.GatewayTimeout,
+    google_exceptions.Aborted
+)
+
+def classify_error(error: BaseException) -> str:
+    """Klasifikasi error Gemini: retryable (sementara), terminal (request salah), safety (diblokir)
+
+    Hanya tipe exception (dan status code yang diwakilinya) yang dipakai, bukan isi pesan:
+    pesan bisa memuat teks prompt atau nilai seperti "modal 500000". Error yang tidak
+    dikenali dianggap terminal.
+    """
+    if isinstance(error, GeminiSafetyBlockedError):
+        return SAFETY
+    if isinstance(error, _RETRYABLE_GOOGLE_ERRORS):
+        return RETRYABLE
+    if isinstance(error, google_exceptions.GoogleAPICallError):
+        return TERMINAL
+
+    try:
+        from google.generativeai.types import BlockedPromptException, StopCandidateException
+        if isinstance(error, (BlockedPromptException, StopCandidateException)):
+            return SAFETY
+    except ImportError:
+        pass
+
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return RETRYABLE
+    return TERMINAL
+
+
+def ensure_not_blocked(response):
+    """Raise GeminiSafetyBlockedError jika prompt/response diblokir safety filter"""
+    prompt_feedback = getattr(response, "prompt_feedback", None)
+    block_reason = getattr(prompt_feedback, "block_reason", None) if prompt_feedback is not None else None
+    if block_reason:
+        raise GeminiSafetyBlockedError(f"Prompt diblokir safety filter Gemini: {getattr(block_reason, 'name', block_reason)}")
+
+    candidates = getattr(response, "candidates", None) or []
+    for candidate in candidates:
+        finish_reason = getattr(candidate, "finish_reason", None)
+        if getattr(finish_reason, "name", str(finish_reason)) in ("SAFETY", "PROHIBITED_CONTENT", "BLOCKLIST"):
+            raise GeminiSafetyBlockedError("Response diblokir safety filter Gemini")
+
+
+class RetryPolicy:
+    """Exponential backoff dengan full jitter, dibatasi jumlah attempt dan deadline per request"""
+
+    def __init__(self, max_attempts: int, base_delay: float, max_delay: float, deadline_seconds: float):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline_seconds = deadline_seconds
+
+    def deadline(self) -> float:
+        return time.monotonic() + self.deadline_seconds
+
+    def attempts_exhausted(self, attempt: int) -> bool:
+        """Apakah attempt ke-`attempt` (mulai 0) adalah attempt terakhir"""
+        return attempt + 1 >= self.max_attempts
+
+    def next_delay(self, attempt: int, deadline: float) -> Optional[float]:
+        """Jeda acak sebelum attempt berikutnya, None jika jeda akan melewati deadline"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+
+class CircuitBreaker:
+    """Circuit breaker per model: closed -> open setelah N kegagalan beruntun -> half-open setelah reset_timeout
+
+    Saat half-open hanya satu panggilan percobaan yang diizinkan; sukses menutup circuit,
+    gagal membukanya lagi.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, model_name: str, failure_threshold: int, reset_timeout: float):
+        self.model_name = model_name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Apakah model ini boleh dipanggil sekarang"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._set_state(self.HALF_OPEN)
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._trial_in_flight = False
+            if self.state != self.CLOSED:
+                self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                if self.state != self.OPEN:
+                    self._set_state(self.OPEN)
+
+    def release(self):
+        """Lepas jatah percobaan half-open tanpa mencatat hasil (mis. panggilan dibatalkan)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def _set_state(self, state: str):
+        self.state = state
+        metrics.set_gauge("circuit_state", {self.CLOSED: 0, self.HALF_OPEN: 1, self.OPEN: 2}[state], self.model_name)
+        if state == self.OPEN:
+            metrics.incr("circuit_opened", self.model_name)
+            logger.warning(f"⚠️ Circuit breaker model {self.model_name} terbuka selama {self.reset_timeout:.0f}s")
+        else:
+            logger.info(f"✅ Circuit breaker model {self.model_name}: {state}")
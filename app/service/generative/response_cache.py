@@ -0,0 +1,113 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, Optional
+from sqlmodel import Session
+from app.config import get_settings
+from app.database import engine
+from app.models.llm_response_cache import LLMResponseCache
+from app.service.generative.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+def make_cache_key(model_name: str, prompt: str, generation_config: Optional[Dict[str, Any]] = None) -> str:
+    """Key content-addressed dari (model, hash prompt, generation config)"""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    config_json = json.dumps(generation_config or {}, sort_keys=True, default=str)
+    raw_key = f"{model_name}\n{prompt_hash}\n{config_json}"
+    return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Cache response LLM dua tier: LRU in-memory lalu tabel Postgres dengan TTL"""
+
+    def __init__(self, max_entries: int, ttl_seconds: int, persistent: bool = True):
+        self.max_entries = max_entries
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.persistent = persistent
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_memory(self, cache_key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(cache_key)
+            if entry is None:
+                return None
+            response_text, expires_at = entry
+            if expires_at <= datetime.utcnow():
+                del self._memory[cache_key]
+                return None
+            self._memory.move_to_end(cache_key)
+            return response_text
+
+    def _set_memory(self, cache_key: str, response_text: str, expires_at: datetime):
+        with self._lock:
+            self._memory[cache_key] = (response_text, expires_at)
+            self._memory.move_to_end(cache_key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def _get_persistent(self, cache_key: str) -> Optional[tuple]:
+        try:
+            with Session(engine) as session:
+                row = session.get(LLMResponseCache, cache_key)
+                if row is None or row.expires_at <= datetime.utcnow():
+                    return None
+                return row.response_text, row.expires_at
+        except Exception as e:
+            logger.warning(f"⚠️ Gagal membaca cache persisten: {e}")
+            return None
+
+    def _set_persistent(self, cache_key: str, section: str, model_name: str, response_text: str, expires_at: datetime):
+        try:
+            with Session(engine) as session:
+                session.merge(LLMResponseCache(
+                    cache_key=cache_key,
+                    section=section,
+                    model_name=model_name,
+                    response_text=response_text,
+                    expires_at=expires_at
+                ))
+                session.commit()
+        except Exception as e:
+            logger.warning(f"⚠️ Gagal menyimpan cache persisten: {e}")
+
+    def get(self, cache_key: str, section: str) -> Optional[str]:
+        """Cari response di tier memory lalu tier persisten, sambil mencatat hit/miss per section"""
+        response_text = self._get_memory(cache_key)
+        if response_text is not None:
+            metrics.incr("cache_hit_memory", section)
+            return response_text
+
+        if self.persistent:
+            entry = self._get_persistent(cache_key)
+            if entry is not None:
+                response_text, expires_at = entry
+                self._set_memory(cache_key, response_text, expires_at)
+                metrics.incr("cache_hit_persistent", section)
+                return response_text
+
+        metrics.incr("cache_miss", section)
+        return None
+
+    def set(self, cache_key: str, section: str, model_name: str, response_text: str):
+        """Simpan response ke kedua tier"""
+        expires_at = datetime.utcnow() + self.ttl
+        self._set_memory(cache_key, response_text, expires_at)
+        if self.persistent:
+            self._set_persistent(cache_key, section, model_name, response_text, expires_at)
+
+
+@lru_cache()
+def get_response_cache() -> ResponseCache:
+    """Instance ResponseCache tunggal untuk seluruh proses"""
+    settings = get_settings()
+    return ResponseCache(
+        max_entries=settings.llm_cache_max_entries,
+        ttl_seconds=settings.llm_cache_ttl_seconds,
+        persistent=settings.llm_cache_persistent
+    )
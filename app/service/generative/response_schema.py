@@ -0,0 +1,59 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+STRING = "STRING"
+INTEGER = "INTEGER"
+NUMBER = "NUMBER"
+BOOLEAN = "BOOLEAN"
+
+def field_schema(field_type: str, nullable: bool = False) -> Dict[str, Any]:
+    """Schema untuk satu field scalar"""
+    schema: Dict[str, Any] = {"type": field_type}
+    if nullable:
+        schema["nullable"] = True
+    return schema
+
+
+def object_schema(properties: Dict[str, Any], required: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Schema object; value properties boleh berupa nama tipe scalar atau schema lengkap
+
+    Tanpa `required` eksplisit semua properties dianggap wajib.
+    """
+    return {
+        "type": "OBJECT",
+        "properties": {
+            name: field_schema(value) if isinstance(value, str) else value
+            for name, value in properties.items()
+        },
+        "required": list(properties.keys()) if required is None else required
+    }
+
+
+def array_schema(items: Dict[str, Any]) -> Dict[str, Any]:
+    """Schema array dengan schema item yang sama"""
+    return {"type": "ARRAY", "items": items}
+
+
+def json_generation_config(response_schema: Dict[str, Any]) -> Dict[str, Any]:
+    """Generation config structured output: Gemini wajib membalas JSON sesuai schema"""
+    return {
+        "response_mime_type": "application/json",
+        "response_schema": response_schema
+    }
+
+
+def decode_json_object(response_text: str) -> Dict[str, Any]:
+    """Decode response structured output menjadi dict, raise ValueError jika tidak valid"""
+    try:
+        data = json.loads(response_text)
+    except json.JSONDecodeError as json_err:
+        logger.error(f"❌ Error parsing JSON dari Gemini: {str(json_err)}")
+        logger.error(f"Response text: {response_text[:1000]}")
+        raise ValueError(f"Response Gemini API bukan JSON valid: {response_text[:200]}")
+
+    if not isinstance(data, dict):
+        raise ValueError(f"Response Gemini API harus berupa JSON object: {response_text[:200]}")
+    return data
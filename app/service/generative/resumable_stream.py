@@ -0,0 +1,197 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import deque
+from functools import lru_cache
+from typing import AsyncIterable, AsyncIterator, Callable, Deque, Dict, Iterable, List, Optional, Tuple, Union
+from app.config import get_settings
+from app.service.generative.cancellation import CancellationToken, iterate_cancellable
+from app.service.generative.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+Events = Union[Iterable[str], AsyncIterable[str]]
+
+# Id event naik monoton di seluruh proses, sehingga id dari run lama tidak pernah tertukar dengan run baru
+_event_ids = itertools.count(1)
+
+def parse_last_event_id(value: Optional[str]) -> Optional[int]:
+    """Header Last-Event-ID sebagai int, None jika kosong atau tidak valid"""
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+
+class ResumableRun:
+    """Satu run SSE yang tetap berjalan walau client terputus, dengan log event terbatas
+
+    Setiap event dari generator controller diberi id dan disimpan di log (maksimal
+    `max_events` terakhir). Client yang reconnect membaca ulang event setelah id terakhir
+    yang diterimanya lalu mengikuti event baru dari run yang sama. Jika tidak ada client
+    selama `grace_seconds`, run dibatalkan (atau dilepas ke background jika
+    `finish_in_background`).
+    """
+
+    def __init__(self, key: Tuple, name: str, max_events: int, grace_seconds: float, finish_in_background: bool):
+        self.key = key
+        self.name = name
+        self.grace_seconds = grace_seconds
+        self.finish_in_background = finish_in_background
+        self.token = CancellationToken()
+        self.events: Deque[Tuple[int, str]] = deque(maxlen=max_events)
+        self.finished = False
+        self.finished_at: Optional[float] = None
+        self.changed = asyncio.Event()
+        self._subscribers = 0
+        self._task: Optional[asyncio.Task] = None
+        self._abandon_handle: Optional[asyncio.TimerHandle] = None
+
+    def start(self, events: Events):
+        self._task = asyncio.create_task(self._produce(events))
+
+    async def _produce(self, events: Events):
+        try:
+            await iterate_cancellable(self.token, events, self._append)
+        finally:
+            self.finished = True
+            self.finished_at = time.monotonic()
+            self._notify()
+
+    def _append(self, event: str):
+        event_id = next(_event_ids)
+        self.events.append((event_id, f"id: {event_id}\n{event}"))
+        self._notify()
+
+    def _notify(self):
+        # Event lama di-set untuk membangunkan subscriber, subscriber berikutnya menunggu event baru
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+    def since(self, last_event_id: int) -> List[Tuple[int, str]]:
+        """Event di log dengan id lebih besar dari `last_event_id`"""
+        return [(event_id, text) for event_id, text in self.events if event_id > last_event_id]
+
+    def has_gap(self, last_event_id: int) -> bool:
+        """True jika sebagian event setelah `last_event_id` sudah terbuang dari log"""
+        return bool(self.events) and 0 < last_event_id < self.events[0][0] - 1
+
+    def acquire(self):
+        self._subscribers += 1
+        if self._abandon_handle is not None:
+            self._abandon_handle.cancel()
+            self._abandon_handle = None
+
+    def release(self):
+        self._subscribers -= 1
+        if self._subscribers > 0 or self.finished:
+            return
+        metrics.incr("sse_disconnects", self.name)
+        self._abandon_handle = asyncio.get_running_loop().call_later(self.grace_seconds, self._abandon)
+
+    def _abandon(self):
+        self._abandon_handle = None
+        if self._subscribers > 0 or self.finished:
+            return
+        metrics.incr("sse_runs_abandoned", self.name)
+        if self.finish_in_background:
+            self.token.detach()
+            return
+        self.token.cancel()
+        self._task.cancel()
+
+
+class ResumableRunRegistry:
+    """Run SSE aktif (dan yang baru selesai) per key, untuk dilanjutkan lewat Last-Event-ID
+
+    Run disimpan in-process, jadi reconnect hanya bisa dilanjutkan di replica yang sama
+    (sticky session); di replica lain reconnect memulai run baru.
+    """
+
+    def __init__(self, max_events: int, grace_seconds: float, retention_seconds: float):
+        self.max_events = max_events
+        self.grace_seconds = grace_seconds
+        self.retention_seconds = retention_seconds
+        self._runs: Dict[Tuple, ResumableRun] = {}
+
+    def _expire(self):
+        now = time.monotonic()
+        for key, run in list(self._runs.items()):
+            if run.finished and now - run.finished_at > self.retention_seconds:
+                del self._runs[key]
+
+    def attach_or_start(
+        self,
+        key: Tuple,
+        events_factory: Callable[[], Events],
+        name: str,
+        last_event_id: Optional[int],
+        finish_in_background: bool
+    ) -> ResumableRun:
+        """Run yang sudah ada untuk key jika client melanjutkan (Last-Event-ID), selain itu run baru"""
+        self._expire()
+        run = self._runs.get(key)
+        if run is not None and last_event_id is not None:
+            metrics.incr("sse_resumed", name)
+            if run.has_gap(last_event_id):
+                metrics.incr("sse_replay_gap", name)
+                logger.warning(f"⚠️ Sebagian event {name} setelah id {last_event_id} sudah terbuang dari log")
+            logger.info(f"♻️ Client {name} tersambung kembali setelah event {last_event_id}")
+            return run
+
+        run = ResumableRun(key, name, self.max_events, self.grace_seconds, finish_in_background)
+        self._runs[key] = run
+        run.start(events_factory())
+        return run
+
+
+@lru_cache()
+def get_resumable_registry() -> ResumableRunRegistry:
+    """Registry run SSE tunggal per proses"""
+    settings = get_settings()
+    return ResumableRunRegistry(
+        max_events=settings.sse_event_log_size,
+        grace_seconds=settings.sse_resume_grace_seconds,
+        retention_seconds=settings.sse_resume_retention_seconds
+    )
+
+
+async def stream_resumable(
+    request,
+    key: Tuple,
+    events_factory: Callable[[], Events],
+    name: str,
+    last_event_id: Optional[str] = None,
+    finish_in_background: Optional[bool] = None
+) -> AsyncIterator[str]:
+    """Seperti stream_until_disconnect, tetapi run bisa dilanjutkan setelah client terputus
+
+    `events_factory` hanya dipanggil jika run baru perlu dimulai. Event dikirim dengan
+    baris `id:`; client yang reconnect dengan header Last-Event-ID menerima ulang event
+    yang terlewat lalu mengikuti run yang masih berjalan.
+    """
+    settings = get_settings()
+    if finish_in_background is None:
+        finish_in_background = settings.sse_finish_in_background
+
+    cursor = parse_last_event_id(last_event_id)
+    run = get_resumable_registry().attach_or_start(key, events_factory, name, cursor, finish_in_background)
+    cursor = cursor or 0
+    run.acquire()
+    try:
+        while True:
+            changed = run.changed
+            finished = run.finished
+            for event_id, text in run.since(cursor):
+                cursor = event_id
+                yield text
+            if finished:
+                break
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=settings.sse_disconnect_poll_seconds)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+    finally:
+        run.release()
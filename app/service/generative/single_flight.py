@@ -0,0 +1,241 @@
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+from app.service.generative.cancellation import check_cancelled, uncancellable
+from app.service.generative.errors import GenerationCancelledError
+from app.service.generative.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_EXHAUSTED = object()
+
+class _Call:
+    """Satu panggilan sync yang sedang berjalan, ditunggu oleh caller lain dengan key sama"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        # Leader dibatalkan sebelum selesai: tidak ada hasil, follower menjalankan ulang sendiri
+        self.abandoned = False
+
+
+class _AsyncCall:
+    """Satu task async bersama beserta jumlah caller yang masih menunggunya"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class _StreamCall:
+    """Satu streaming bersama; chunk di-buffer supaya bisa di-replay ke consumer yang bergabung belakangan"""
+
+    def __init__(self, iterator: Iterator[Any], section: str):
+        self.iterator = iterator
+        self.section = section
+        self.condition = threading.Condition()
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        # True selama satu consumer sedang menarik chunk berikutnya dari iterator
+        self.pulling = False
+        self.consumers = 0
+
+
+class SingleFlight:
+    """Coalescing panggilan generate identik yang sedang in-flight
+
+    Caller pertama untuk sebuah key (leader) memulai panggilan ke Gemini, caller lain
+    dengan key yang sama selama panggilan itu belum selesai (follower) menunggu hasil yang
+    sama tanpa memanggil Gemini lagi. Setelah selesai key dilepas, panggilan berikutnya
+    dilayani oleh cache response. Pembatalan satu caller (client terputus) tidak pernah
+    diteruskan ke caller lain: panggilan bersama hanya dihentikan saat tidak ada lagi
+    caller yang menunggunya.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._async_calls: Dict[str, _AsyncCall] = {}
+        self._streams: Dict[str, _StreamCall] = {}
+
+    def do(self, key: str, fn: Callable[[], Any], section: str = "default") -> Any:
+        """Jalankan fn sekali untuk semua caller sync yang memakai key yang sama
+
+        Jika leader dibatalkan sebelum selesai, follower tidak ikut gagal: follower pertama
+        yang bangun menjadi leader baru dan menjalankan fn miliknya sendiri.
+        """
+        coalesced = False
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                is_leader = call is None
+                if is_leader:
+                    call = _Call()
+                    self._calls[key] = call
+
+            if is_leader:
+                return self._lead(key, call, fn)
+
+            if not coalesced:
+                coalesced = True
+                metrics.incr("coalesced_calls", section)
+            call.event.wait()
+            if call.abandoned:
+                metrics.incr("coalesced_leader_abandoned", section)
+                continue
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+    def _lead(self, key: str, call: _Call, fn: Callable[[], Any]) -> Any:
+        try:
+            call.result = fn()
+            return call.result
+        except GenerationCancelledError:
+            call.abandoned = True
+            raise
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+    async def do_async(self, key: str, fn: Callable[[], Awaitable[Any]], section: str = "default") -> Any:
+        """Versi async: semua caller menunggu satu task bersama
+
+        Task dijalankan tanpa token pembatalan run mana pun. Caller yang dibatalkan hanya
+        berhenti menunggu; task baru dibatalkan (melepas slot limiter dan kuota) saat caller
+        terakhir yang menunggunya ikut dibatalkan.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            call = self._async_calls.get(key)
+            if call is not None and call.task.get_loop() is not loop:
+                call = None
+            is_leader = call is None
+            if is_leader:
+                call = _AsyncCall(loop.create_task(self._run_shared(fn)))
+                self._async_calls[key] = call
+                call.task.add_done_callback(lambda done, key=key, call=call: self._release_async(key, call))
+            call.waiters += 1
+
+        if not is_leader:
+            metrics.incr("coalesced_calls", section)
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            with self._lock:
+                call.waiters -= 1
+                abandoned = call.waiters == 0 and not call.task.done()
+                if abandoned and self._async_calls.get(key) is call:
+                    del self._async_calls[key]
+            if abandoned:
+                metrics.incr("coalesced_call_cancelled", section)
+                call.task.cancel()
+            raise
+        except BaseException:
+            with self._lock:
+                call.waiters -= 1
+            raise
+        else:
+            with self._lock:
+                call.waiters -= 1
+
+    @staticmethod
+    async def _run_shared(fn: Callable[[], Awaitable[Any]]) -> Any:
+        with uncancellable():
+            return await fn()
+
+    def _release_async(self, key: str, call: _AsyncCall):
+        with self._lock:
+            if self._async_calls.get(key) is call:
+                del self._async_calls[key]
+
+    def stream(self, key: str, fn: Callable[[], Iterator[Any]], section: str = "default") -> Iterator[Any]:
+        """Streaming bersama: semua caller dengan key sama menerima chunk dari satu panggilan
+
+        Consumer yang masih terhubung bergantian menarik chunk berikutnya dari iterator
+        bersama, sehingga berhentinya satu consumer (termasuk caller pertama) tidak
+        memutus stream consumer lain. Pembatalan dicek per consumer; iterator ditutup
+        saat consumer terakhir berhenti sebelum stream selesai.
+        """
+        with self._lock:
+            call = self._streams.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = _StreamCall(fn(), section)
+                self._streams[key] = call
+            call.consumers += 1
+
+        if not is_leader:
+            metrics.incr("coalesced_calls", section)
+        try:
+            yield from self._consume(key, call)
+        finally:
+            self._leave(key, call)
+
+    def _consume(self, key: str, call: _StreamCall) -> Iterator[Any]:
+        index = 0
+        while True:
+            # Berhenti menarik chunk jika client consumer ini sudah terputus
+            check_cancelled()
+            with call.condition:
+                while index >= len(call.chunks) and not call.done and call.pulling:
+                    call.condition.wait()
+                pending = call.chunks[index:]
+                finished = call.done
+                if not pending and not finished:
+                    call.pulling = True
+
+            if pending:
+                index += len(pending)
+                yield from pending
+                continue
+            if finished:
+                if call.error is not None:
+                    raise call.error
+                return
+            self._pull(key, call)
+
+    def _pull(self, key: str, call: _StreamCall):
+        chunk, error = _EXHAUSTED, None
+        try:
+            # Iterator bersama tidak boleh berhenti karena token consumer yang kebetulan menariknya
+            with uncancellable():
+                chunk = next(call.iterator, _EXHAUSTED)
+        except BaseException as e:
+            error = e
+
+        with call.condition:
+            call.pulling = False
+            if error is not None:
+                call.error = error
+                call.done = True
+            elif chunk is _EXHAUSTED:
+                call.done = True
+            else:
+                call.chunks.append(chunk)
+            call.condition.notify_all()
+            finished = call.done
+
+        if finished:
+            with self._lock:
+                if self._streams.get(key) is call:
+                    del self._streams[key]
+
+    def _leave(self, key: str, call: _StreamCall):
+        with self._lock:
+            call.consumers -= 1
+            abandoned = call.consumers == 0 and not call.done
+            if abandoned and self._streams.get(key) is call:
+                del self._streams[key]
+
+        if abandoned:
+            # Tidak ada consumer yang sedang menarik chunk, iterator aman ditutup dari thread ini
+            metrics.incr("coalesced_call_cancelled", call.section)
+            call.iterator.close()
@@ -0,0 +1,199 @@
+import json
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+_WHITESPACE = " \t\r\n"
+_STRUCTURAL = "{}[]:,\""
+
+class JsonEvent:
+    """Nilai JSON yang sudah lengkap selama streaming
+
+    `path` adalah lokasi nilai dari root, mis. ("kesimpulan_ringkasan",) untuk field top-level
+    atau ("response", "list", 2) untuk item ketiga array roadmap.
+    """
+
+    FIELD = "field"
+    ITEM = "item"
+
+    def __init__(self, path: Tuple[Any, ...], value: Any):
+        self.path = path
+        self.value = value
+
+    @property
+    def kind(self) -> str:
+        return self.ITEM if isinstance(self.path[-1], int) else self.FIELD
+
+    @property
+    def key(self) -> Any:
+        return self.path[-1]
+
+
+class _Frame:
+    __slots__ = ("is_object", "path", "key", "index", "expect_key")
+
+    def __init__(self, is_object: bool, path: Tuple[Any, ...]):
+        self.is_object = is_object
+        self.path = path
+        self.key: Optional[str] = None
+        self.index = 0
+        self.expect_key = is_object
+
+
+class _Capture:
+    __slots__ = ("path", "parts", "start")
+
+    def __init__(self, path: Optional[Tuple[Any, ...]], start: int):
+        # path None menandai capture key object, bukan nilai
+        self.path = path
+        self.parts: List[str] = []
+        self.start = start
+
+
+class IncrementalJsonParser:
+    """Parser JSON bertahap untuk output streaming Gemini
+
+    Chunk dimasukkan lewat `feed`; setiap field top-level (dan item array pada `item_paths`)
+    dikembalikan sebagai JsonEvent begitu nilainya tertutup, tanpa menunggu stream selesai.
+    Chunk disimpan sebagai list dan hanya teks nilai yang sedang di-capture yang di-join,
+    sehingga biaya total linear terhadap panjang output. Teks sebelum `{`/`[` pertama
+    (mis. pagar ```json) diabaikan.
+    """
+
+    def __init__(self, item_paths: Iterable[Sequence[Any]] = ()):
+        self.item_paths = {tuple(path) for path in item_paths}
+        self._chunks: List[str] = []
+        self._stack: List[_Frame] = []
+        self._captures: List[_Capture] = []
+        self._in_string = False
+        self._escape = False
+        self._primitive: Optional[Tuple[Any, ...]] = None
+        self._started = False
+        self._finished = False
+
+    @property
+    def text(self) -> str:
+        """Seluruh teks yang sudah diterima"""
+        return "".join(self._chunks)
+
+    @property
+    def finished(self) -> bool:
+        """True jika nilai root sudah tertutup"""
+        return self._finished
+
+    def _should_capture(self, path: Tuple[Any, ...]) -> bool:
+        return len(path) == 1 or path[:-1] in self.item_paths
+
+    def _begin_value(self, position: int) -> Tuple[Any, ...]:
+        frame = self._stack[-1]
+        path = frame.path + ((frame.key,) if frame.is_object else (frame.index,))
+        if self._should_capture(path):
+            self._captures.append(_Capture(path, position))
+        return path
+
+    def _end_value(self, path: Tuple[Any, ...], chunk: str, end: int, events: List[JsonEvent]):
+        frame = self._stack[-1]
+        if frame.is_object:
+            frame.key = None
+        else:
+            frame.index += 1
+
+        if self._captures and self._captures[-1].path == path:
+            capture = self._captures.pop()
+            capture.parts.append(chunk[capture.start:end])
+            events.append(JsonEvent(path, json.loads("".join(capture.parts))))
+
+    def feed(self, chunk: str) -> List[JsonEvent]:
+        """Proses satu chunk dan return nilai yang tertutup di dalamnya, sesuai urutan"""
+        events: List[JsonEvent] = []
+        if not chunk:
+            return events
+        self._chunks.append(chunk)
+        if self._finished:
+            return events
+
+        position = 0
+        length = len(chunk)
+        while position < length:
+            char = chunk[position]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    self._close_string(chunk, position + 1, events)
+                else:
+                    # Lompati isi string sampai kandidat kutip/escape berikutnya
+                    next_quote = chunk.find('"', position)
+                    next_escape = chunk.find("\\", position)
+                    candidates = [index for index in (next_quote, next_escape) if index != -1]
+                    if not candidates:
+                        break
+                    position = min(candidates)
+                    continue
+                position += 1
+                continue
+
+            if not self._started:
+                if char in "{[":
+                    self._started = True
+                    self._stack.append(_Frame(char == "{", ()))
+                position += 1
+                continue
+
+            if self._primitive is not None:
+                if char not in _WHITESPACE and char not in _STRUCTURAL:
+                    position += 1
+                    continue
+                path, self._primitive = self._primitive, None
+                self._end_value(path, chunk, position, events)
+
+            if char in _WHITESPACE:
+                position += 1
+                continue
+
+            frame = self._stack[-1]
+            if char == '"':
+                if frame.is_object and frame.expect_key:
+                    self._captures.append(_Capture(None, position))
+                else:
+                    self._begin_value(position)
+                self._in_string = True
+            elif char in "{[":
+                path = self._begin_value(position)
+                self._stack.append(_Frame(char == "{", path))
+            elif char in "}]":
+                closed = self._stack.pop()
+                if not self._stack:
+                    self._finished = True
+                    self._flush(chunk, position + 1)
+                    break
+                self._end_value(closed.path, chunk, position + 1, events)
+            elif char == ":":
+                frame.expect_key = False
+            elif char == ",":
+                frame.expect_key = frame.is_object
+            else:
+                self._primitive = self._begin_value(position)
+            position += 1
+
+        if not self._finished:
+            self._flush(chunk, length)
+        return events
+
+    def _close_string(self, chunk: str, end: int, events: List[JsonEvent]):
+        frame = self._stack[-1]
+        if frame.is_object and frame.expect_key:
+            capture = self._captures.pop()
+            capture.parts.append(chunk[capture.start:end])
+            frame.key = json.loads("".join(capture.parts))
+            return
+        path = frame.path + ((frame.key,) if frame.is_object else (frame.index,))
+        self._end_value(path, chunk, end, events)
+
+    def _flush(self, chunk: str, end: int):
+        # Simpan potongan capture yang belum tertutup; chunk berikutnya mulai dari index 0
+        for capture in self._captures:
+            capture.parts.append(chunk[capture.start:end])
+            capture.start = 0
@@ -0,0 +1,114 @@
+import logging
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+from app.service.generative.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class RequestTokenUsage:
+    """Akumulasi token Gemini (prompt, bagian prompt dari implicit cache & output) per section untuk satu HTTP request"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sections: Dict[str, Dict[str, int]] = {}
+
+    def add(self, section: str, prompt_tokens: int, output_tokens: int, cached_tokens: int = 0):
+        with self._lock:
+            usage = self.sections.setdefault(
+                section, {"prompt_tokens": 0, "output_tokens": 0, "cached_tokens": 0, "calls": 0}
+            )
+            usage["prompt_tokens"] += prompt_tokens
+            usage["output_tokens"] += output_tokens
+            usage["cached_tokens"] += cached_tokens
+            usage["calls"] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            sections = {section: dict(usage) for section, usage in self.sections.items()}
+        return {
+            "sections": sections,
+            "prompt_tokens": sum(usage["prompt_tokens"] for usage in sections.values()),
+            "output_tokens": sum(usage["output_tokens"] for usage in sections.values()),
+            "cached_tokens": sum(usage["cached_tokens"] for usage in sections.values())
+        }
+
+
+_current_usage: ContextVar[Optional[RequestTokenUsage]] = ContextVar("request_token_usage", default=None)
+
+def usage_from_response(response) -> Dict[str, int]:
+    """Ambil jumlah token dari usage_metadata response Gemini (0 jika tidak tersedia)
+
+    `prompt_tokens` sudah termasuk `cached_tokens` (token prefix yang dilayani implicit caching Gemini).
+    """
+    usage_metadata = getattr(response, "usage_metadata", None)
+    if usage_metadata is None:
+        return {"prompt_tokens": 0, "output_tokens": 0, "cached_tokens": 0}
+    return {
+        "prompt_tokens": int(getattr(usage_metadata, "prompt_token_count", 0) or 0),
+        "output_tokens": int(getattr(usage_metadata, "candidates_token_count", 0) or 0),
+        "cached_tokens": int(getattr(usage_metadata, "cached_content_token_count", 0) or 0)
+    }
+
+
+def record_token_usage(section: str, prompt_tokens: int, output_tokens: int, cached_tokens: int = 0):
+    """Catat token satu panggilan Gemini ke metrics global dan ke request yang sedang berjalan"""
+    metrics.incr("prompt_tokens", section, prompt_tokens)
+    metrics.incr("output_tokens", section, output_tokens)
+    metrics.observe("prompt_tokens_per_call", prompt_tokens, section)
+    if cached_tokens:
+        metrics.incr("cached_prompt_tokens", section, cached_tokens)
+    # Token input yang diproses penuh di luar implicit cache
+    metrics.observe("uncached_prompt_tokens_per_call", prompt_tokens - cached_tokens, section)
+
+    request_usage = _current_usage.get()
+    if request_usage is not None:
+        request_usage.add(section, prompt_tokens, output_tokens, cached_tokens)
+
+
+def current_token_usage() -> Optional[Dict[str, Any]]:
+    """Ringkasan token request yang sedang berjalan, None jika di luar request"""
+    request_usage = _current_usage.get()
+    return request_usage.summary() if request_usage is not None else None
+
+
+@contextmanager
+def track_token_usage() -> Iterator[RequestTokenUsage]:
+    """Kumpulkan token semua panggilan Gemini di dalam blok ini (mis. untuk benchmark/CLI)"""
+    request_usage = RequestTokenUsage()
+    token = _current_usage.set(request_usage)
+    try:
+        yield request_usage
+    finally:
+        _current_usage.reset(token)
+
+
+class TokenUsageMiddleware:
+    """ASGI middleware yang membuka akumulator token per request dan mencatat totalnya
+
+    Dibuat sebagai ASGI murni (bukan BaseHTTPMiddleware) supaya total baru dihitung
+    setelah body StreamingResponse selesai dikirim.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_token_usage() as request_usage:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                summary = request_usage.summary()
+                if summary["sections"]:
+                    metrics.observe("request_prompt_tokens", summary["prompt_tokens"])
+                    metrics.observe("request_output_tokens", summary["output_tokens"])
+                    logger.info(
+                        f"🔢 Token {scope.get('path')}: prompt={summary['prompt_tokens']}, "
+                        f"output={summary['output_tokens']}, cached={summary['cached_tokens']}, "
+                        f"per section={summary['sections']}"
+                    )
@@ -0,0 +1,130 @@
+import logging
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class VectorStore(ABC):
+    """Interface vector store untuk similarity cache - backend bisa ditukar lewat Settings"""
+
+    @abstractmethod
+    def upsert(self, point_id: str, vector: List[float], payload: Dict[str, Any]) -> None:
+        """Simpan atau timpa vector beserta payload-nya"""
+
+    @abstractmethod
+    def search(self, vector: List[float], limit: int = 1) -> List[Tuple[float, Dict[str, Any]]]:
+        """Cari vector terdekat, return list (cosine similarity, payload) terurut menurun"""
+
+
+class NumpyVectorStore(VectorStore):
+    """Backend in-process dengan brute-force cosine similarity menggunakan NumPy
+
+    Vector disimpan ter-normalisasi sehingga similarity cukup dihitung dengan satu matmul.
+    Entri tertua dibuang (FIFO) saat kapasitas penuh.
+    """
+
+    def __init__(self, dimension: int, max_entries: int = 5000):
+        self.dimension = dimension
+        self.max_entries = max_entries
+        self._ids: List[str] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._matrix = np.zeros((0, dimension), dtype=np.float32)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(array)
+        return array / norm if norm > 0 else array
+
+    def upsert(self, point_id: str, vector: List[float], payload: Dict[str, Any]) -> None:
+        normalized = self._normalize(vector)
+        with self._lock:
+            if point_id in self._ids:
+                idx = self._ids.index(point_id)
+                self._matrix[idx] = normalized
+                self._payloads[idx] = payload
+                return
+
+            self._ids.append(point_id)
+            self._payloads.append(payload)
+            self._matrix = np.vstack([self._matrix, normalized[np.newaxis, :]])
+
+            overflow = len(self._ids) - self.max_entries
+            if overflow > 0:
+                self._ids = self._ids[overflow:]
+                self._payloads = self._payloads[overflow:]
+                self._matrix = self._matrix[overflow:]
+
+    def search(self, vector: List[float], limit: int = 1) -> List[Tuple[float, Dict[str, Any]]]:
+        query = self._normalize(vector)
+        with self._lock:
+            if not self._ids:
+                return []
+            scores = self._matrix @ query
+            top = np.argsort(-scores)[:limit]
+            return [(float(scores[idx]), self._payloads[idx]) for idx in top]
+
+
+class QdrantVectorStore(VectorStore):
+    """Backend Qdrant (membutuhkan package opsional qdrant-client)"""
+
+    def __init__(self, url: str, collection_name: str, dimension: int):
+        try:
+            from qdrant_client import QdrantClient
+            from qdrant_client.http import models as qdrant_models
+        except ImportError as e:
+            raise ImportError(
+                "Backend vector store 'qdrant' membutuhkan package qdrant-client. "
+                "Install dengan: pip install 'farmhub-api[qdrant]'"
+            ) from e
+
+        self._models = qdrant_models
+        self.collection_name = collection_name
+        self.client = QdrantClient(url=url)
+
+        existing = {collection.name for collection in self.client.get_collections().collections}
+        if collection_name not in existing:
+            self.client.create_collection(
+                collection_name=collection_name,
+                vectors_config=qdrant_models.VectorParams(size=dimension, distance=qdrant_models.Distance.COSINE)
+            )
+            logger.info(f"✅ Qdrant collection dibuat: {collection_name}")
+
+    def upsert(self, point_id: str, vector: List[float], payload: Dict[str, Any]) -> None:
+        self.client.upsert(
+            collection_name=self.collection_name,
+            points=[self._models.PointStruct(
+                id=str(uuid.uuid5(uuid.NAMESPACE_URL, point_id)),
+                vector=list(vector),
+                payload=payload
+            )]
+        )
+
+    def search(self, vector: List[float], limit: int = 1) -> List[Tuple[float, Dict[str, Any]]]:
+        hits = self.client.search(
+            collection_name=self.collection_name,
+            query_vector=list(vector),
+            limit=limit
+        )
+        return [(float(hit.score), hit.payload or {}) for hit in hits]
+
+
+def create_vector_store(
+    backend: str,
+    dimension: int,
+    collection_name: str,
+    max_entries: int = 5000,
+    qdrant_url: Optional[str] = None
+) -> VectorStore:
+    """Factory vector store berdasarkan nama backend di Settings"""
+    if backend == "numpy":
+        return NumpyVectorStore(dimension=dimension, max_entries=max_entries)
+    if backend == "qdrant":
+        if not qdrant_url:
+            raise ValueError("vector_store_backend 'qdrant' membutuhkan qdrant_url")
+        return QdrantVectorStore(url=qdrant_url, collection_name=collection_name, dimension=dimension)
+    raise ValueError(f"vector_store_backend tidak dikenal: {backend}")
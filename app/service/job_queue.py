@@ -0,0 +1,224 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from sqlalchemy import and_, or_
+from sqlmodel import Session, select
+from app.config import get_settings
+from app.database import engine
+from app.models.analyze_job import AnalyzeJob, AnalyzeJobEvent, AnalyzeJobStatus
+from app.service.generative.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_EVENTS = ("complete", "error")
+
+Emit = Callable[[str, Dict[str, Any]], Awaitable[None]]
+JobHandler = Callable[[AnalyzeJob, Emit], Awaitable[Dict[str, Any]]]
+
+class AnalyzeJobQueue:
+    """Antrean job analyze di Postgres, tanpa broker eksternal
+
+    Worker di replica mana pun mengambil job dengan `SELECT ... FOR UPDATE SKIP LOCKED`,
+    sehingga satu job hanya diambil satu worker tanpa saling menunggu lock. Job RUNNING yang
+    heartbeat-nya berhenti lebih dari `stale_seconds` (worker mati) diambil ulang sampai
+    `max_attempts`. Event progress disimpan di tabel supaya subscriber di replica lain bisa membacanya.
+    """
+
+    def __init__(self, stale_seconds: float = 300, max_attempts: int = 3):
+        self.stale_seconds = stale_seconds
+        self.max_attempts = max_attempts
+
+    def enqueue(self, db: Session, ringkasan_id: str, user_id: str, mode: str, use_cache: bool) -> AnalyzeJob:
+        """Tambahkan job baru ke antrean dan commit"""
+        job = AnalyzeJob(ringkasan_id=ringkasan_id, user_id=user_id, mode=mode, use_cache=use_cache)
+        db.add(job)
+        db.flush()
+        db.add(AnalyzeJobEvent(job_id=job.id, event="queued", data={"status": AnalyzeJobStatus.QUEUED.value}))
+        db.commit()
+        db.refresh(job)
+        metrics.incr("analyze_jobs_enqueued", mode)
+        logger.info(f"✅ Job analyze {job.id} masuk antrean untuk ringkasan: {ringkasan_id}")
+        return job
+
+    def claim(self, worker_id: str) -> Optional[AnalyzeJob]:
+        """Ambil job tertua yang antre (atau yang worker-nya mati) dan tandai RUNNING"""
+        with Session(engine) as db:
+            while True:
+                stale_before = datetime.utcnow() - timedelta(seconds=self.stale_seconds)
+                statement = (
+                    select(AnalyzeJob)
+                    .where(or_(
+                        AnalyzeJob.status == AnalyzeJobStatus.QUEUED.value,
+                        and_(AnalyzeJob.status == AnalyzeJobStatus.RUNNING.value, AnalyzeJob.heartbeat_at < stale_before)
+                    ))
+                    .order_by(AnalyzeJob.created_at)
+                    .limit(1)
+                    .with_for_update(skip_locked=True)
+                )
+                job = db.exec(statement).first()
+                if job is None:
+                    return None
+
+                if job.status == AnalyzeJobStatus.RUNNING.value:
+                    logger.warning(f"⚠️ Job {job.id} ditinggal worker {job.locked_by}, diambil ulang")
+                    metrics.incr("analyze_jobs_reclaimed")
+                    if job.attempts >= self.max_attempts:
+                        self._mark_finished(db, job, AnalyzeJobStatus.FAILED, error="Job dihentikan setelah worker berulang kali berhenti")
+                        db.commit()
+                        continue
+
+                job.status = AnalyzeJobStatus.RUNNING.value
+                job.attempts += 1
+                job.locked_by = worker_id
+                job.heartbeat_at = datetime.utcnow()
+                db.add(job)
+                db.add(AnalyzeJobEvent(job_id=job.id, event="running", data={"status": job.status, "attempt": job.attempts}))
+                db.commit()
+                db.refresh(job)
+                metrics.observe("analyze_job_queue_wait_ms", (job.heartbeat_at - job.created_at).total_seconds() * 1000)
+                return job
+
+    def _owned(self, db: Session, job_id: str, worker_id: str) -> Optional[AnalyzeJob]:
+        job = db.get(AnalyzeJob, job_id, with_for_update=True)
+        if job is None or job.locked_by != worker_id or job.status != AnalyzeJobStatus.RUNNING.value:
+            # Job sudah diambil alih worker lain (heartbeat terlambat), hasil worker ini dibuang
+            return None
+        return job
+
+    def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Perbarui heartbeat; return False jika job bukan milik worker ini lagi"""
+        with Session(engine) as db:
+            job = self._owned(db, job_id, worker_id)
+            if job is None:
+                return False
+            job.heartbeat_at = datetime.utcnow()
+            db.add(job)
+            db.commit()
+            return True
+
+    def append_event(self, job_id: str, event: str, data: Dict[str, Any]):
+        """Simpan satu event progress job"""
+        with Session(engine) as db:
+            db.add(AnalyzeJobEvent(job_id=job_id, event=event, data=data))
+            db.commit()
+
+    def _mark_finished(self, db: Session, job: AnalyzeJob, status: AnalyzeJobStatus, result=None, error: str = None):
+        job.status = status.value
+        job.result = result
+        job.error = error
+        job.finished_at = datetime.utcnow()
+        db.add(job)
+        if status == AnalyzeJobStatus.SUCCEEDED:
+            db.add(AnalyzeJobEvent(job_id=job.id, event="complete", data={"status": job.status, "data": result}))
+        else:
+            db.add(AnalyzeJobEvent(job_id=job.id, event="error", data={"status": job.status, "message": error}))
+        metrics.incr(f"analyze_jobs_{status.value}", job.mode)
+
+    def finish(self, job_id: str, worker_id: str, status: AnalyzeJobStatus, result=None, error: str = None) -> bool:
+        """Tandai job selesai (SUCCEEDED/FAILED) jika masih dipegang worker ini"""
+        with Session(engine) as db:
+            job = self._owned(db, job_id, worker_id)
+            if job is None:
+                return False
+            self._mark_finished(db, job, status, result=result, error=error)
+            db.commit()
+            return True
+
+    def events_after(self, job_id: str, after_id: int = 0) -> List[AnalyzeJobEvent]:
+        """Event job dengan id lebih besar dari `after_id`, urut sesuai terjadinya"""
+        with Session(engine) as db:
+            statement = (
+                select(AnalyzeJobEvent)
+                .where(AnalyzeJobEvent.job_id == job_id, AnalyzeJobEvent.id > after_id)
+                .order_by(AnalyzeJobEvent.id)
+            )
+            return list(db.exec(statement).all())
+
+
+class JobWorkerPool:
+    """Sekumpulan worker asyncio di proses ini yang mengambil job dari AnalyzeJobQueue"""
+
+    def __init__(
+        self,
+        queue: AnalyzeJobQueue,
+        handler: JobHandler,
+        concurrency: int = 2,
+        poll_seconds: float = 1.0,
+        heartbeat_seconds: float = 30.0
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.heartbeat_seconds = heartbeat_seconds
+        self.worker_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        """Jalankan worker di event loop yang sedang berjalan"""
+        for index in range(self.concurrency):
+            self._tasks.append(asyncio.create_task(self._work(f"{self.worker_prefix}:{index}:{uuid.uuid4().hex[:6]}")))
+        logger.info(f"✅ {self.concurrency} worker job analyze berjalan")
+
+    async def stop(self):
+        """Hentikan worker; job yang sedang berjalan diambil ulang worker lain setelah heartbeat basi"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _work(self, worker_id: str):
+        while True:
+            try:
+                job = await asyncio.to_thread(self.queue.claim, worker_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Worker {worker_id} gagal mengambil job: {e}")
+                job = None
+            if job is None:
+                await asyncio.sleep(self.poll_seconds)
+                continue
+            await self._run(job, worker_id)
+
+    async def _heartbeat(self, job_id: str, worker_id: str):
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            if not await asyncio.to_thread(self.queue.heartbeat, job_id, worker_id):
+                return
+
+    async def _run(self, job: AnalyzeJob, worker_id: str):
+        logger.info(f"🔍 Worker {worker_id} menjalankan job {job.id}")
+
+        async def emit(event: str, data: Dict[str, Any]):
+            await asyncio.to_thread(self.queue.append_event, job.id, event, data)
+
+        heartbeat = asyncio.create_task(self._heartbeat(job.id, worker_id))
+        try:
+            result = await self.handler(job, emit)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Job {job.id} gagal: {e}")
+            await asyncio.to_thread(self.queue.finish, job.id, worker_id, AnalyzeJobStatus.FAILED, None, str(e))
+            return
+        finally:
+            heartbeat.cancel()
+
+        if await asyncio.to_thread(self.queue.finish, job.id, worker_id, AnalyzeJobStatus.SUCCEEDED, result):
+            logger.info(f"✅ Job {job.id} selesai")
+
+
+@lru_cache()
+def get_analyze_job_queue() -> AnalyzeJobQueue:
+    """Instance AnalyzeJobQueue tunggal"""
+    settings = get_settings()
+    return AnalyzeJobQueue(
+        stale_seconds=settings.analyze_job_stale_seconds,
+        max_attempts=settings.analyze_job_max_attempts
+    )
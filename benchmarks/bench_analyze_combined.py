@@ -0,0 +1,92 @@
+"""Benchmark mode analyze gabungan (satu generate) vs rantai tiga panggilan
+
+Setiap run membangkitkan informasi teknis, analisis financial dan roadmap untuk project
+yang berbeda, sekali lewat rantai informasi teknis -> analisis financial -> roadmap dan
+sekali lewat satu generate dengan schema gabungan. Melaporkan latency p50/p95 per
+analyze serta rata-rata token prompt, output dan total per analyze.
+
+- default (offline): backend model lokal (GEMINI_BACKEND=local). Token dihitung dari
+  estimasi ~4 karakter per token dan latency backend lokal tidak bergantung pada panjang
+  output, jadi angka latency hanya relevan pada mode --live.
+- --live: Gemini sungguhan (butuh APIKEY_GEMINI).
+
+Contoh:
+    python -m benchmarks.bench_analyze_combined
+    python -m benchmarks.bench_analyze_combined --live --runs 3
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+if "--live" not in sys.argv:
+    os.environ["GEMINI_BACKEND"] = "local"
+
+from app.service.generative.prompt_analisis_financial import generate_analisis_financial_async
+from app.service.generative.prompt_analyze_combined import generate_analyze_combined_async
+from app.service.generative.prompt_informasi_teknis import generate_informasi_teknis_async
+from app.service.generative.prompt_roadmap import generate_roadmap_async
+from app.service.generative.token_usage import track_token_usage
+from benchmarks.bench_local_backend import percentile
+from benchmarks.bench_prompt_compaction import SAMPLE_PROJECT
+
+async def run_chain(params: dict):
+    informasi_teknis = await generate_informasi_teknis_async(**params)
+    analisis_financial = await generate_analisis_financial_async(**params, informasi_teknis=informasi_teknis)
+    await generate_roadmap_async(**params, informasi_teknis=informasi_teknis, analisis_financial=analisis_financial)
+
+
+async def run_combined(params: dict):
+    await generate_analyze_combined_async(**params)
+
+
+async def measure(mode: str, runner, runs: int):
+    latencies = []
+    usages = []
+    for run in range(runs):
+        params = {**SAMPLE_PROJECT, "project_name": f"{SAMPLE_PROJECT['project_name']} {mode} #{run}", "use_cache": False}
+        with track_token_usage() as usage:
+            started = time.perf_counter()
+            await runner(params)
+            latencies.append((time.perf_counter() - started) * 1000)
+        usages.append(usage.summary())
+    return {
+        "p50": statistics.median(latencies),
+        "p95": percentile(latencies, 0.95),
+        "prompt": statistics.mean(usage["prompt_tokens"] for usage in usages),
+        "output": statistics.mean(usage["output_tokens"] for usage in usages),
+        "total": statistics.mean(usage["prompt_tokens"] + usage["output_tokens"] for usage in usages),
+    }
+
+
+async def run(runs: int):
+    chain = await measure("chain", run_chain, runs)
+    combined = await measure("combined", run_combined, runs)
+
+    print(f"{'mode':<10}{'p50 ms':>10}{'p95 ms':>10}{'prompt tok':>12}{'output tok':>12}{'total tok':>11}")
+    for mode, result in (("chain", chain), ("combined", combined)):
+        print(
+            f"{mode:<10}{result['p50']:>10.0f}{result['p95']:>10.0f}"
+            f"{result['prompt']:>12.0f}{result['output']:>12.0f}{result['total']:>11.0f}"
+        )
+    print(
+        f"{'saving':<10}{100 * (chain['p50'] - combined['p50']) / max(chain['p50'], 1):>9.1f}%{'':>10}"
+        f"{100 * (chain['prompt'] - combined['prompt']) / max(chain['prompt'], 1):>11.1f}%"
+        f"{100 * (chain['output'] - combined['output']) / max(chain['output'], 1):>11.1f}%"
+        f"{100 * (chain['total'] - combined['total']) / max(chain['total'], 1):>10.1f}%"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", action="store_true", help="Panggil Gemini sungguhan (butuh APIKEY_GEMINI)")
+    parser.add_argument("--runs", type=int, default=5, help="Jumlah analyze per mode")
+    args = parser.parse_args()
+    asyncio.run(run(args.runs))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Benchmark throughput request async: Session sync di event loop vs AsyncSession
+
+Mensimulasikan profil database route analyze: lookup user (get_current_user), ringkasan
+awal dan project, satu query lambat (pg_sleep, mewakili query yang tersendat), lalu
+menunggu Gemini (asyncio.sleep). Semua request berjalan di satu event loop seperti satu
+worker uvicorn.
+
+- sync  : Session sync dipanggil langsung di coroutine (perilaku lama); query lambat
+          menahan seluruh event loop sehingga request lain ikut menunggu.
+- async : AsyncSession dari app.database (perilaku baru); event loop tetap melayani
+          request lain selama query berjalan.
+
+Melaporkan throughput, latency p50/p95 dan lag event loop maksimum (jeda terlama yang
+dialami stream SSE lain di worker yang sama). Butuh database dari DATABASE_URL
+(mis. Postgres di Docker-compose.yml); query lambat hanya disimulasikan di Postgres.
+
+Contoh:
+    python -m benchmarks.bench_async_db
+    python -m benchmarks.bench_async_db --requests 200 --concurrency 50 --query-ms 100
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from sqlalchemy import text
+from sqlmodel import Session
+from app.database import async_engine, engine, new_async_session
+from app.models.project import Project
+from app.models.ringkasan_awal import RingkasanAwal
+from app.models.user import User
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def slow_query(dialect: str, query_ms: float):
+    if dialect == "postgresql" and query_ms > 0:
+        return text("SELECT pg_sleep(:seconds)").bindparams(seconds=query_ms / 1000)
+    return text("SELECT 1")
+
+
+async def request_sync(query_ms: float, gemini_ms: float):
+    with Session(engine) as db:
+        db.get(User, str(uuid.uuid4()))
+        db.get(RingkasanAwal, str(uuid.uuid4()))
+        db.get(Project, str(uuid.uuid4()))
+        db.exec(slow_query(engine.dialect.name, query_ms))
+    await asyncio.sleep(gemini_ms / 1000)
+
+
+async def request_async(query_ms: float, gemini_ms: float):
+    async with new_async_session() as db:
+        await db.get(User, str(uuid.uuid4()))
+        await db.get(RingkasanAwal, str(uuid.uuid4()))
+        await db.get(Project, str(uuid.uuid4()))
+        await db.exec(slow_query(async_engine.dialect.name, query_ms))
+    await asyncio.sleep(gemini_ms / 1000)
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Jeda terlama antara jadwal tick dan eksekusinya selama benchmark berjalan (ms)"""
+    worst = 0.0
+    while not stop.is_set():
+        expected = time.perf_counter() + interval
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - expected)
+    return worst * 1000
+
+
+async def run(mode: str, requests: int, concurrency: int, query_ms: float, gemini_ms: float):
+    handler = request_sync if mode == "sync" else request_async
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one():
+        nonlocal failures
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await handler(query_ms, gemini_ms)
+                latencies.append((time.perf_counter() - started) * 1000)
+            except Exception as e:
+                failures += 1
+                print(f"request gagal ({mode}): {e}")
+
+    stop = asyncio.Event()
+    lag_task = asyncio.ensure_future(measure_loop_lag(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    max_lag = await lag_task
+
+    print(
+        f"{mode:<8}{len(latencies) / elapsed:>12.1f}{statistics.median(latencies) if latencies else 0:>10.0f}"
+        f"{percentile(latencies, 0.95) if latencies else 0:>10.0f}{max_lag:>14.0f}{failures:>8}"
+    )
+
+
+async def main_async(args):
+    if engine.dialect.name != "postgresql":
+        print(f"database {engine.dialect.name}: query lambat (pg_sleep) tidak disimulasikan")
+    print(f"{args.requests} request, concurrency {args.concurrency}, query {args.query_ms:.0f} ms, gemini {args.gemini_ms:.0f} ms")
+    print(f"{'mode':<8}{'req/s':>12}{'p50 ms':>10}{'p95 ms':>10}{'max lag ms':>14}{'gagal':>8}")
+    for mode in ("sync", "async"):
+        await run(mode, args.requests, args.concurrency, args.query_ms, args.gemini_ms)
+    await async_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--query-ms", type=float, default=50.0, help="Durasi query lambat per request")
+    parser.add_argument("--gemini-ms", type=float, default=200.0, help="Durasi tunggu Gemini per request")
+    args = parser.parse_args()
+
+    # Log SQL dari echo=True akan menenggelamkan hasil benchmark
+    engine.echo = False
+    async_engine.sync_engine.echo = False
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
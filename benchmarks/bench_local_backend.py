@@ -0,0 +1,81 @@
+"""Load test pipeline analyze dengan backend model lokal (tanpa kuota Gemini)
+
+Menjalankan pipeline informasi teknis -> analisis financial -> roadmap lewat analyzer
+dan GeminiClient asli, dengan GEMINI_BACKEND=local. Melaporkan throughput, latency
+pipeline p50/p95/p99 dan counter error/retry. Latency dan error injection backend
+diatur lewat env LOCAL_BACKEND_* (lihat Settings).
+
+Contoh:
+    python -m benchmarks.bench_local_backend --requests 100 --concurrency 20
+    LOCAL_BACKEND_ERROR_RATE=0.05 python -m benchmarks.bench_local_backend
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ["GEMINI_BACKEND"] = "local"
+os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+
+from app.service.generative.metrics import metrics
+from app.service.generative.prompt_analisis_financial import generate_analisis_financial_async
+from app.service.generative.prompt_informasi_teknis import generate_informasi_teknis_async
+from app.service.generative.prompt_roadmap import generate_roadmap_async
+from benchmarks.bench_prompt_compaction import SAMPLE_PROJECT
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def run_pipeline(index: int) -> float:
+    params = {**SAMPLE_PROJECT, "project_name": f"{SAMPLE_PROJECT['project_name']} #{index}", "use_cache": False}
+    started = time.perf_counter()
+    informasi_teknis = await generate_informasi_teknis_async(**params)
+    analisis_financial = await generate_analisis_financial_async(**params, informasi_teknis=informasi_teknis)
+    await generate_roadmap_async(**params, informasi_teknis=informasi_teknis, analisis_financial=analisis_financial)
+    return (time.perf_counter() - started) * 1000
+
+
+async def run(requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one(index: int):
+        nonlocal failures
+        async with semaphore:
+            try:
+                latencies.append(await run_pipeline(index))
+            except Exception as e:
+                failures += 1
+                print(f"request {index} gagal: {e}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(index) for index in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    print(f"{requests} pipeline, concurrency {concurrency}, {elapsed:.1f}s")
+    print(f"throughput : {len(latencies) / elapsed:.2f} pipeline/s ({failures} gagal)")
+    if latencies:
+        print(
+            f"latency ms : p50={statistics.median(latencies):.0f} "
+            f"p95={percentile(latencies, 0.95):.0f} p99={percentile(latencies, 0.99):.0f}"
+        )
+    snapshot = metrics.snapshot()
+    for name in ("gemini_calls", "retries", "errors_retryable", "errors_safety", "rate_limited", "circuit_opened"):
+        if name in snapshot:
+            print(f"{name:<17}: {snapshot[name]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Benchmark prompt compaction analisis financial & roadmap
+
+Membandingkan prompt penuh dan prompt ringkas per section:
+- default (offline): ukuran prompt dan estimasi token (~4 karakter per token)
+- --live: generate ke Gemini tanpa cache, melaporkan token dari usage_metadata dan latency
+
+Contoh:
+    python -m benchmarks.bench_prompt_compaction
+    python -m benchmarks.bench_prompt_compaction --live --runs 3
+"""
+import argparse
+import statistics
+import time
+from app.service.generative.prompt_analisis_financial.prompt_builder import PromptBuilder as FinancialPromptBuilder
+from app.service.generative.prompt_analisis_financial.response_parser import ResponseParser as FinancialResponseParser
+from app.service.generative.prompt_roadmap.prompt_builder import PromptBuilder as RoadmapPromptBuilder
+from app.service.generative.prompt_roadmap.response_parser import ResponseParser as RoadmapResponseParser
+
+SAMPLE_PROJECT = {
+    "project_name": "Budidaya Lele Padang",
+    "jenis_ikan": "LELE",
+    "modal": 25_000_000,
+    "kabupaten_id": "Kota Padang",
+    "resiko": "SEDANG",
+    "skor_kelayakan": 78,
+    "potensi_pasar": "TINGGI",
+    "estimasi_balik_modal": 8,
+    "kesimpulan_ringkasan": (
+        "Budidaya lele di Kota Padang dengan modal Rp 25.000.000 memiliki kelayakan yang baik. "
+        "Permintaan pasar lokal tinggi dan stabil, terutama untuk rumah makan dan pasar tradisional. "
+        "Dengan manajemen pakan dan kualitas air yang baik, modal diperkirakan kembali dalam 8 bulan. "
+        "Risiko utama adalah fluktuasi harga pakan dan penyakit pada musim hujan."
+    ),
+    "lang": 100.35,
+    "lat": -0.95,
+}
+
+SAMPLE_INFORMASI_TEKNIS = {
+    "spesifikasiKolam": {"jenis": "Kolam Terpal", "ukuran": "3m x 4m x 1m", "volumeAir": "10.000 liter", "jumlahKolam": 4, "kedalamanAir": "80 cm"},
+    "kualitasAir": {"pH": "6.5 - 8.0", "suhu": "26 - 30 C", "oksigenTerlarut": "3 - 5 mg/L", "kejernihan": "30 - 40 cm"},
+    "spesifikasiBenih": {"jenis": "Lele Sangkuriang", "ukuran": "5 - 7 cm", "jumlah": 8000, "padatTebar": "200 ekor/m2"},
+    "spesifikasiPakan": {"jenis": "Pelet Terapung", "protein": "30% - 32%", "frekuensiPemberian": "3x sehari", "rasioPakan": "3% dari bobot biomass"},
+    "manajemenKesehatan": {"cekRutin": "2x seminggu", "vaksin": False, "penangananHama": "Karantina dan garam ikan", "pencegahanPenyakit": "Ganti air rutin"},
+    "teknologiPendukung": {"sensorPH": True, "otomatisasiPakan": False, "sistemMonitoring": "Manual Monitoring", "kameraKolam": False},
+}
+
+SAMPLE_ANALISIS_FINANCIAL = {
+    "analisisROI": {"investasiAwal": 24_000_000, "proyeksiKeuntunganPerSiklus": 9_500_000, "roi": "39.58%", "lamaSiklus": "3 bulan"},
+}
+
+def build_prompts(compact: bool):
+    return {
+        "analisis_financial": FinancialPromptBuilder.build_analisis_financial_prompt(
+            **SAMPLE_PROJECT, informasi_teknis=SAMPLE_INFORMASI_TEKNIS, compact=compact
+        ),
+        "roadmap": RoadmapPromptBuilder.build_roadmap_prompt(
+            **SAMPLE_PROJECT,
+            informasi_teknis=SAMPLE_INFORMASI_TEKNIS,
+            analisis_financial=SAMPLE_ANALISIS_FINANCIAL,
+            compact=compact
+        ),
+    }
+
+
+GENERATION_CONFIGS = {
+    "analisis_financial": FinancialResponseParser.GENERATION_CONFIG,
+    "roadmap": RoadmapResponseParser.GENERATION_CONFIG,
+}
+
+def estimate_tokens(prompt: str) -> int:
+    return max(1, len(prompt) // 4)
+
+
+def run_offline():
+    full, compact = build_prompts(False), build_prompts(True)
+    print(f"{'section':<20}{'full chars':>12}{'compact chars':>15}{'~full tok':>11}{'~compact tok':>14}{'saving':>9}")
+    for section in full:
+        full_tokens, compact_tokens = estimate_tokens(full[section]), estimate_tokens(compact[section])
+        saving = 100 * (full_tokens - compact_tokens) / full_tokens
+        print(f"{section:<20}{len(full[section]):>12}{len(compact[section]):>15}{full_tokens:>11}{compact_tokens:>14}{saving:>8.1f}%")
+
+
+def run_live(runs: int):
+    from app.service.generative.gemini_client import get_gemini_client
+
+    client = get_gemini_client()
+    variants = {"full": build_prompts(False), "compact": build_prompts(True)}
+    results = {}
+    for variant, prompts in variants.items():
+        for section, prompt in prompts.items():
+            latencies, prompt_tokens, output_tokens = [], [], []
+            for _ in range(runs):
+                started = time.monotonic()
+                result = client.generate_content(
+                    prompt, section=section, generation_config=GENERATION_CONFIGS[section], use_cache=False
+                )
+                latencies.append((time.monotonic() - started) * 1000)
+                prompt_tokens.append(result.usage["prompt_tokens"])
+                output_tokens.append(result.usage["output_tokens"])
+            results[(variant, section)] = (
+                statistics.mean(prompt_tokens), statistics.mean(output_tokens), statistics.median(latencies)
+            )
+
+    print(f"{'section':<20}{'variant':<10}{'prompt tok':>12}{'output tok':>12}{'p50 ms':>10}")
+    for section in variants["full"]:
+        for variant in variants:
+            prompt_tok, output_tok, latency = results[(variant, section)]
+            print(f"{section:<20}{variant:<10}{prompt_tok:>12.0f}{output_tok:>12.0f}{latency:>10.0f}")
+        full_prompt, _, full_latency = results[("full", section)]
+        compact_prompt, _, compact_latency = results[("compact", section)]
+        print(
+            f"{section:<20}{'saving':<10}{100 * (full_prompt - compact_prompt) / max(full_prompt, 1):>11.1f}%"
+            f"{'':>12}{100 * (full_latency - compact_latency) / max(full_latency, 1):>9.1f}%"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--live", action="store_true", help="Panggil Gemini sungguhan (butuh APIKEY_GEMINI)")
+    parser.add_argument("--runs", type=int, default=3, help="Jumlah pengulangan per variant pada mode --live")
+    args = parser.parse_args()
+
+    if args.live:
+        run_live(args.runs)
+    else:
+        run_offline()
+
+
+if __name__ == "__main__":
+    main()
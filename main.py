@@ -1,8 +1,12 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import get_settings
-from app.database import init_db
+from app.database import async_engine, init_db
 from app.routes import api_router
+from app.controllers.job_controller import run_analyze_job
+from app.service.job_queue import JobWorkerPool, get_analyze_job_queue
+from app.service.generative.gemini_client import get_gemini_client
+from app.service.generative.token_usage import TokenUsageMiddleware
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -23,16 +27,43 @@ app.add_middleware(
     allow_headers=["*"],  
 )
 
+app.add_middleware(TokenUsageMiddleware)
+
 @app.on_event("startup")
 def startup():
     logger.info("🚀 Starting application...")
     try:
         init_db()
-        logger.info("✅ Startup completed!")
     except Exception as e:
         logger.error(f"❌ Startup failed: {e}")
         raise
 
+    try:
+        # Probe model Gemini sekali di awal, gagal di sini tidak menghentikan startup
+        get_gemini_client().resolve_models()
+    except Exception as e:
+        logger.warning(f"⚠️ Model Gemini belum bisa di-resolve saat startup: {e}")
+
+    logger.info("✅ Startup completed!")
+
+job_workers = JobWorkerPool(
+    get_analyze_job_queue(),
+    run_analyze_job,
+    concurrency=settings.analyze_job_workers,
+    poll_seconds=settings.analyze_job_poll_seconds,
+    heartbeat_seconds=settings.analyze_job_heartbeat_seconds
+)
+
+@app.on_event("startup")
+async def start_job_workers():
+    # Worker job analyze berjalan di setiap replica; koordinasi lewat SKIP LOCKED di Postgres
+    job_workers.start()
+
+@app.on_event("shutdown")
+async def stop_job_workers():
+    await job_workers.stop()
+    await async_engine.dispose()
+
 app.include_router(api_router)
 
 @app.get("/")
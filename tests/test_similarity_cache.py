@@ -0,0 +1,51 @@
+from typing import Any, Dict, List, Tuple
+from app.service.generative.prompt_ringkasan_awal.similarity_cache import (
+    RingkasanSimilarityCache,
+    _kabupaten_slot,
+    embed_project_parameters
+)
+from app.service.generative.vector_store import VectorStore
+
+class InMemoryVectorStore(VectorStore):
+    """Vector store kecil untuk test: skor 1.0 untuk vector identik, 0.0 selain itu"""
+
+    def __init__(self):
+        self.points: Dict[str, Tuple[List[float], Dict[str, Any]]] = {}
+
+    def upsert(self, point_id: str, vector: List[float], payload: Dict[str, Any]) -> None:
+        self.points[point_id] = (vector, payload)
+
+    def search(self, vector: List[float], limit: int = 1) -> List[Tuple[float, Dict[str, Any]]]:
+        hits = [(1.0 if stored == vector else 0.0, payload) for stored, payload in self.points.values()]
+        return sorted(hits, key=lambda hit: hit[0], reverse=True)[:limit]
+
+
+RESULT = {
+    "skor_kelayakan": 80,
+    "potensi_pasar": "Tinggi",
+    "estimasi_balik_modal": 12,
+    "kesimpulan_ringkasan": "Budidaya lele di Padang layak dijalankan"
+}
+
+def test_colliding_kabupaten_share_embedding():
+    assert _kabupaten_slot("Padang") == _kabupaten_slot("Padang Pariaman")
+    assert embed_project_parameters("LELE", 50_000_000, "Padang", "MODERAT") == \
+        embed_project_parameters("LELE", 50_000_000, "Padang Pariaman", "MODERAT")
+
+
+def test_lookup_rejects_colliding_kabupaten():
+    cache = RingkasanSimilarityCache(InMemoryVectorStore(), threshold=0.97)
+    cache.store_result("Kolam A", "LELE", 50_000_000, "Padang", "MODERAT", RESULT)
+
+    assert cache.lookup("Kolam B", "LELE", 50_000_000, "Padang Pariaman", "MODERAT") is None
+    assert cache.lookup("Kolam B", "LELE", 50_000_000, " padang ", "MODERAT") is not None
+
+
+def test_colliding_kabupaten_do_not_overwrite_each_other():
+    cache = RingkasanSimilarityCache(InMemoryVectorStore(), threshold=0.97, personalize=False)
+    other = {**RESULT, "kesimpulan_ringkasan": "Budidaya lele di Padang Pariaman layak dijalankan"}
+    cache.store_result("Kolam A", "LELE", 50_000_000, "Padang", "MODERAT", RESULT)
+    cache.store_result("Kolam B", "LELE", 50_000_000, "Padang Pariaman", "MODERAT", other)
+
+    assert cache.lookup("Kolam C", "LELE", 50_000_000, "Padang", "MODERAT") == RESULT
+    assert cache.lookup("Kolam C", "LELE", 50_000_000, "Padang Pariaman", "MODERAT") == other